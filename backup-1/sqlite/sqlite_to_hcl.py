@@ -9,24 +9,17 @@ import os
 import sys
 from typing import List, Dict, Any, Optional, Tuple
 
-
-class SQLiteColumn:
-    """Represents a column from SQLite"""
-    def __init__(self, cid: int, name: str, type_: str, notnull: int, default: Optional[str], pk: int):
-        self.cid = cid
-        self.name = name
-        self.type = type_.lower() if type_ else "text"
-        self.notnull = bool(notnull)
-        self.default = default
-        self.pk = bool(pk)
-
-
-class SQLiteTable:
-    """Represents a table from SQLite"""
-    def __init__(self, name: str, columns: List[SQLiteColumn]):
-        self.name = name
-        self.columns = columns
-        self.primary_keys = [col.name for col in columns if col.pk]
+# The shared schema model lives with the other converters in backup-2/sqlite (already on the
+# path when imported through its sqlite_introspect)
+MODEL_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backup-2', 'sqlite'))
+if MODEL_DIR not in sys.path:
+    sys.path.insert(0, MODEL_DIR)
+from schema_ir import Column, Table, make_column, make_foreign_key, make_index, make_table
+from ddl_parser import tokenize
+from ddl_to_hcl import hcl_default, hcl_key_blocks, hcl_reference, hcl_string
+from sqlite_snapshot import connect_snapshot
+import instrumentation
+from instrumentation import phase
 
 
 class SQLiteToHCLConverter:
@@ -58,11 +51,14 @@ class SQLiteToHCLConverter:
             'binary': 'blob'
         }
     
-    def connect_to_database(self, db_path: str) -> sqlite3.Connection:
-        """Connect to SQLite database"""
+    def connect_to_database(self, db_path: str, snapshot: bool = False,
+                            immutable: bool = False) -> sqlite3.Connection:
+        """Connect to SQLite database (snapshot: read-only, mmap-backed, one read transaction)"""
         if not os.path.exists(db_path):
             raise FileNotFoundError(f"Database file not found: {db_path}")
         
+        if snapshot or immutable:
+            return connect_snapshot(db_path, immutable)
         return sqlite3.connect(db_path)
     
     def get_tables(self, conn: sqlite3.Connection) -> List[str]:
@@ -76,20 +72,141 @@ class SQLiteToHCLConverter:
         
         return [row[0] for row in cursor.fetchall()]
     
-    def get_table_info(self, conn: sqlite3.Connection, table_name: str) -> SQLiteTable:
+    def get_table_info(self, conn: sqlite3.Connection, table_name: str) -> Table:
         """Get detailed information about a table"""
         cursor = conn.cursor()
         
         # Get column information
-        cursor.execute(f"PRAGMA table_info({table_name})")
+        cursor.execute("SELECT cid, name, type, \"notnull\", dflt_value, pk FROM pragma_table_info(?)", (table_name,))
         columns_data = cursor.fetchall()
         
         columns = []
-        for col_data in columns_data:
-            column = SQLiteColumn(*col_data)
+        primary_keys = []
+        autoincrement = self.autoincrement_tables(conn, table_name)
+        for cid, name, type_, notnull, default, pk in columns_data:
+            column = make_column(
+                name=name,
+                type=type_,
+                nullable=not notnull,
+                primary_key=bool(pk),
+                auto_increment=bool(pk) and table_name in autoincrement,
+                default=default
+            )
             columns.append(column)
+            if pk:
+                primary_keys.append((pk, name))
         
-        return SQLiteTable(table_name, columns)
+        return make_table(table_name, columns, [name for _, name in sorted(primary_keys)])
+    
+    def autoincrement_tables(self, conn: sqlite3.Connection, table_name: Optional[str] = None) -> set:
+        """Tables declared with AUTOINCREMENT (only allowed on their INTEGER PRIMARY KEY), which no pragma reports"""
+        cursor = conn.execute("""
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'table' AND sql LIKE '%AUTOINCREMENT%' AND (?1 IS NULL OR name = ?1)
+        """, (table_name,))
+        # LIKE also matches names and comments: only the keyword counts
+        return {name for name, sql in cursor
+                if any(token.kind == 'word' and token.value.upper() == 'AUTOINCREMENT' for token in tokenize(sql))}
+    
+    def get_all_tables(self, conn: sqlite3.Connection) -> List[Table]:
+        """Get columns, indexes and foreign keys for every table with three set-based queries"""
+        cursor = conn.cursor()
+        
+        # Columns of all tables, joined through the pragma_table_info table-valued function
+        columns: Dict[str, List[Column]] = {}
+        primary_keys: Dict[str, List[Tuple[int, str]]] = {}
+        autoincrement = self.autoincrement_tables(conn)
+        cursor.execute("""
+            SELECT m.name, p.name, p.type, p."notnull", p.dflt_value, p.pk
+            FROM sqlite_master AS m, pragma_table_info(m.name) AS p
+            WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+            ORDER BY m.name, p.cid
+        """)
+        for table_name, name, type_, notnull, default, pk in cursor:
+            columns.setdefault(table_name, []).append(make_column(
+                name=name,
+                type=type_,
+                nullable=not notnull,
+                primary_key=bool(pk),
+                auto_increment=bool(pk) and table_name in autoincrement,
+                default=default
+            ))
+            primary_keys.setdefault(table_name, [])
+            if pk:
+                primary_keys[table_name].append((pk, name))
+        
+        # Explicit (origin c) and UNIQUE-constraint (origin u) indexes; the primary key index is implied
+        index_columns: Dict[Tuple[str, str], List[str]] = {}
+        index_unique: Dict[Tuple[str, str], bool] = {}
+        index_origin: Dict[Tuple[str, str], str] = {}
+        cursor.execute("""
+            SELECT m.name, il.name, il."unique", il.origin, ii.name
+            FROM sqlite_master AS m, pragma_index_list(m.name) AS il, pragma_index_info(il.name) AS ii
+            WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%' AND il.origin IN ('c', 'u')
+            ORDER BY m.name, il.name, ii.seqno
+        """)
+        for table_name, index_name, unique, origin, column_name in cursor:
+            key = (table_name, index_name)
+            index_unique[key] = bool(unique)
+            index_origin[key] = origin
+            if column_name is not None:  # expression index columns have no name
+                index_columns.setdefault(key, []).append(column_name)
+        # UNIQUE constraints are backed by sqlite_autoindex_<table>_<n>, a name SQLite reserves;
+        # they become unique indexes named <table>_<columns>_key instead
+        used_names = {index_name for (_, index_name), origin in index_origin.items() if origin == 'c'}
+        indexes: Dict[str, List] = {}
+        for (table_name, index_name), unique in index_unique.items():
+            if (table_name, index_name) not in index_columns:
+                continue  # expression-only indexes cannot be expressed as column lists
+            index_column_names = index_columns[(table_name, index_name)]
+            constraint = index_origin[(table_name, index_name)] == 'u'
+            if constraint:
+                base_name = f"{table_name}_{'_'.join(index_column_names)}_key"
+                index_name = base_name
+                suffix = 1
+                while index_name in used_names:
+                    suffix += 1
+                    index_name = f"{base_name}{suffix}"
+                used_names.add(index_name)
+            indexes.setdefault(table_name, []).append(make_index(index_name, index_column_names, unique, constraint))
+        
+        # Foreign keys, one row per referencing column
+        fk_rows: Dict[Tuple[str, int], List[Tuple]] = {}
+        cursor.execute("""
+            SELECT m.name, fk.id, fk."table", fk."from", fk."to", fk.on_update, fk.on_delete
+            FROM sqlite_master AS m, pragma_foreign_key_list(m.name) AS fk
+            WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+            ORDER BY m.name, fk.id, fk.seq
+        """)
+        for table_name, fk_id, ref_table, from_column, to_column, on_update, on_delete in cursor:
+            fk_rows.setdefault((table_name, fk_id), []).append(
+                (ref_table, from_column, to_column, on_update, on_delete)
+            )
+        foreign_keys: Dict[str, List] = {}
+        for (table_name, _), rows in fk_rows.items():
+            ref_table, _, _, on_update, on_delete = rows[0]
+            # A missing "to" column means the referenced table's primary key
+            ref_columns = [to_column for _, _, to_column, _, _ in rows]
+            if None in ref_columns:
+                ref_columns = [name for _, name in sorted(primary_keys.get(ref_table, []))]
+            foreign_keys.setdefault(table_name, []).append(make_foreign_key(
+                columns=[from_column for _, from_column, _, _, _ in rows],
+                ref_table=ref_table,
+                ref_columns=ref_columns,
+                on_update=on_update,
+                on_delete=on_delete
+            ))
+        
+        return [
+            make_table(
+                table_name,
+                table_columns,
+                [name for _, name in sorted(primary_keys[table_name])],
+                indexes=indexes.get(table_name, []),
+                foreign_keys=foreign_keys.get(table_name, [])
+            )
+            for table_name, table_columns in columns.items()
+        ]
     
     def map_sqlite_type_to_hcl(self, sqlite_type: str) -> str:
         """Map SQLite type to HCL type"""
@@ -107,9 +224,9 @@ class SQLiteToHCLConverter:
         
         return self.type_mapping.get(base_type, 'varchar')
     
-    def generate_hcl_schema(self, tables: List[SQLiteTable], schema_name: str = "main") -> str:
+    def generate_hcl_schema(self, tables: List[Table], schema_name: str = "main") -> str:
         """Generate HCL schema from SQLite tables"""
-        hcl_lines = [f'schema "{schema_name}" {{}}', '']
+        hcl_lines = [f'schema {hcl_string(schema_name)} {{}}', '']
         
         for table in tables:
             hcl_lines.extend(self._generate_table_hcl(table, schema_name))
@@ -117,10 +234,10 @@ class SQLiteToHCLConverter:
         
         return '\n'.join(hcl_lines)
     
-    def _generate_table_hcl(self, table: SQLiteTable, schema_name: str) -> List[str]:
+    def _generate_table_hcl(self, table: Table, schema_name: str) -> List[str]:
         """Generate HCL for a single table"""
-        lines = [f'table "{table.name}" {{']
-        lines.append(f'  schema = schema.{schema_name}')
+        lines = [f'table {hcl_string(table.name)} {{']
+        lines.append(f"  schema = {hcl_reference('schema', schema_name)}")
         lines.append('')
         
         # Add columns
@@ -128,78 +245,61 @@ class SQLiteToHCLConverter:
             lines.extend(self._generate_column_hcl(column))
             lines.append('')
         
-        # Add primary key if there are multiple primary key columns
-        if len(table.primary_keys) > 1:
-            lines.append('  primary_key {')
-            pk_columns = ', '.join(f'column.{pk}' for pk in table.primary_keys)
-            lines.append(f'    columns = [{pk_columns}]')
-            lines.append('  }')
-        elif len(table.primary_keys) == 1:
-            # Single primary key is already handled in column definition
-            lines.append('  primary_key {')
-            lines.append(f'    columns = [column.{table.primary_keys[0]}]')
-            lines.append('  }')
-        
+        # Primary key, foreign keys and indexes, rendered as ddl_to_hcl does
+        lines.extend(hcl_key_blocks(table))
         lines.append('}')
         return lines
     
-    def _generate_column_hcl(self, column: SQLiteColumn) -> List[str]:
+    def _generate_column_hcl(self, column: Column) -> List[str]:
         """Generate HCL for a single column"""
-        lines = [f'  column "{column.name}" {{']
+        lines = [f'  column {hcl_string(column.name)} {{']
         
         # Type
         hcl_type = self.map_sqlite_type_to_hcl(column.type)
         lines.append(f'    type = {hcl_type}')
         
         # Null constraint
-        null_value = "false" if column.notnull else "true"
+        null_value = "true" if column.nullable else "false"
         lines.append(f'    null = {null_value}')
         
         # Default value
         if column.default is not None:
-            # Handle different default value types
-            default_val = column.default
-            if default_val.upper() in ['NULL']:
-                lines.append('    default = null')
-            elif default_val.upper() in ['TRUE', 'FALSE']:
-                lines.append(f'    default = {default_val.lower()}')
-            elif default_val.isdigit() or (default_val.startswith('-') and default_val[1:].isdigit()):
-                lines.append(f'    default = {default_val}')
-            else:
-                # String default
-                lines.append(f'    default = "{default_val}"')
+            lines.append(f'    default = {hcl_default(column.default)}')
         
         lines.append('  }')
         return lines
     
-    def convert_database(self, db_path: str, output_path: str, schema_name: str = "main") -> None:
+    def convert_database(self, db_path: str, output_path: str, schema_name: str = "main",
+                         snapshot: bool = False, immutable: bool = False) -> None:
         """Convert SQLite database to HCL file"""
         # Connect to database
-        conn = self.connect_to_database(db_path)
+        with phase('introspect'):
+            conn = self.connect_to_database(db_path, snapshot, immutable)
         
         try:
-            # Get all tables
-            table_names = self.get_tables(conn)
+            # Get columns, indexes and foreign keys of all tables at once
+            with phase('introspect'):
+                tables = self.get_all_tables(conn)
+            instrumentation.count('tables', len(tables))
+            instrumentation.count('columns', sum(len(table.columns) for table in tables))
             
-            if not table_names:
+            if not tables:
                 print("No tables found in the database")
                 return
             
-            print(f"Found {len(table_names)} tables:")
-            
-            # Get detailed information for each table
-            tables = []
-            for table_name in table_names:
-                table = self.get_table_info(conn, table_name)
-                tables.append(table)
-                print(f"  - {table_name} ({len(table.columns)} columns)")
+            print(f"Found {len(tables)} tables:")
+            for table in tables:
+                print(f"  - {table.name} ({len(table.columns)} columns)")
             
             # Generate HCL schema
-            hcl_content = self.generate_hcl_schema(tables, schema_name)
+            with phase('render'):
+                hcl_content = self.generate_hcl_schema(tables, schema_name)
             
             # Write to output file
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(hcl_content)
+            with phase('write'):
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(hcl_content)
+            instrumentation.count('bytes_out', len(hcl_content))
             
             print(f"\nHCL schema generated successfully!")
             print(f"Output file: {output_path}")
@@ -210,6 +310,17 @@ class SQLiteToHCLConverter:
 
 def main():
     """Main function"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Convert SQLite database to Atlas HCL schema format")
+    parser.add_argument('--snapshot', action='store_true',
+                        help='Read-only, mmap-backed snapshot read (safe against a live writer under WAL)')
+    parser.add_argument('--immutable', action='store_true',
+                        help='Like --snapshot, for offline copies that nothing writes to (no locking)')
+    instrumentation.add_arguments(parser)
+    
+    args = parser.parse_args()
+    
     # Default paths based on the requirement
     db_path = "/Volumes/data/documents/data_structure/database/sqlite/db.sqlite"
     output_path = "/Volumes/data/documents/data_structure/database/sqlite/db.hcl"
@@ -221,8 +332,9 @@ def main():
         return 1
     
     try:
-        converter = SQLiteToHCLConverter()
-        converter.convert_database(db_path, output_path)
+        with instrumentation.instrumented('sqlite_to_hcl', args):
+            converter = SQLiteToHCLConverter()
+            converter.convert_database(db_path, output_path, snapshot=args.snapshot, immutable=args.immutable)
         return 0
         
     except Exception as e:
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Atlas Migrations
+Writes an Atlas-compatible versioned migration directory (one
+<version>_<name>.sql file per table, or one for the whole schema) plus its
+atlas.sum integrity file, in one process instead of one
+`atlas migrate diff` run (and in-memory dev database) per table
+
+atlas.sum follows Atlas' format: a running SHA-256 over every migration
+file name and content in version order, base64 encoded as h1:<hash>; the
+first line is the total, then one line per file with the hash so far.
+"""
+
+import base64
+import calendar
+import glob
+import hashlib
+import os
+import sys
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from schema_ir import Table
+from hcl_to_ddl import HCLToDDLConverter
+from pipeline import open_source
+import instrumentation
+from instrumentation import phase
+
+
+SUM_FILE = 'atlas.sum'
+
+# Version format of `atlas migrate diff` (UTC timestamp)
+VERSION_FORMAT = '%Y%m%d%H%M%S'
+
+# First line of a migration file that atlas.sum hashes by name only
+SUM_IGNORE_DIRECTIVE = '-- atlas:sum ignore'
+
+
+def atlas_sum(files: Sequence[Tuple[str, bytes]]) -> str:
+    """atlas.sum content for migration files given as (name, content) in version order"""
+    digest = hashlib.sha256()
+    lines = []
+    for name, content in files:
+        digest.update(name.encode('utf-8'))
+        if content.startswith(SUM_IGNORE_DIRECTIVE.encode('utf-8')):
+            continue
+        digest.update(content)
+        lines.append(f"{name} h1:{base64.b64encode(digest.digest()).decode('ascii')}\n")
+    return f"h1:{base64.b64encode(digest.digest()).decode('ascii')}\n" + ''.join(lines)
+
+
+def next_version(version: str) -> str:
+    """The version after version: one second later for timestamps, plus one for plain numbers"""
+    try:
+        return time.strftime(VERSION_FORMAT, time.gmtime(calendar.timegm(time.strptime(version, VERSION_FORMAT)) + 1))
+    except ValueError:
+        return str(int(version) + 1).zfill(len(version))
+
+
+class AtlasMigrationWriter:
+    """Appends versioned migrations to an Atlas migration directory and keeps atlas.sum valid"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.ddl = HCLToDDLConverter()
+
+    def migration_files(self) -> List[str]:
+        """Names of the migration files already in the directory, in version order"""
+        return sorted(os.path.basename(path) for path in glob.glob(os.path.join(self.directory, '*.sql')))
+
+    def render(self, tables: Sequence[Table]) -> str:
+        """Migration SQL creating tables (with their indexes), in Atlas' commented style"""
+        parts = []
+        for table in tables:
+            parts.append(f'-- Create "{table.name}" table\n' + '\n'.join(self.ddl._generate_table_ddl(table)))
+        return '\n'.join(parts) + '\n'
+
+    def write(self, tables: Sequence[Table], name: Optional[str] = None,
+              version: Optional[str] = None) -> List[str]:
+        """Write one migration per table (or one named name for all of them); returns the new file names"""
+        os.makedirs(self.directory, exist_ok=True)
+        existing = self.migration_files()
+        version = version or time.strftime(VERSION_FORMAT, time.gmtime())
+        # New versions must sort after every existing migration
+        latest = existing[-1].split('_', 1)[0] if existing else ''
+        if version <= latest:
+            version = next_version(latest)
+
+        groups = [(name, list(tables))] if name else [(table.name, [table]) for table in tables]
+        written = []
+        for group_name, group_tables in groups:
+            file_name = f"{version}_{group_name}.sql"
+            with phase('render'):
+                content = self.render(group_tables)
+            with phase('write'):
+                with open(os.path.join(self.directory, file_name), 'w', encoding='utf-8', newline='\n') as f:
+                    f.write(content)
+            instrumentation.count('bytes_out', len(content))
+            written.append(file_name)
+            version = next_version(version)
+
+        self.write_sum()
+        return written
+
+    def write_sum(self) -> str:
+        """Recompute atlas.sum over every migration file in the directory; returns its content"""
+        with phase('hash'):
+            files = []
+            for file_name in self.migration_files():
+                with open(os.path.join(self.directory, file_name), 'rb') as f:
+                    files.append((file_name, f.read()))
+            content = atlas_sum(files)
+        tmp_path = os.path.join(self.directory, f"{SUM_FILE}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(content)
+        os.replace(tmp_path, os.path.join(self.directory, SUM_FILE))
+        return content
+
+    def clean(self) -> int:
+        """Remove the migration files and atlas.sum; returns the number of files removed"""
+        removed = 0
+        for file_name in self.migration_files() + [SUM_FILE]:
+            path = os.path.join(self.directory, file_name)
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+        return removed
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Write an Atlas migration directory (with atlas.sum) from HCL schemas",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # One migration per table of db.hcl (what the per-table atlas migrate diff loop produced)
+  %(prog)s --input db.hcl --dir migrations
+
+  # Every .hcl file of a directory as one migration named initial, replacing the old migrations
+  %(prog)s --input ./sqlite --dir migrations --name initial --clean
+
+  # Only recompute atlas.sum after editing migrations by hand
+  %(prog)s --dir migrations --sum-only
+        """
+    )
+    parser.add_argument('--input', '-i', nargs='+', default=[],
+                        help='HCL (or DDL/SQLite) schema files or directories of .hcl files')
+    parser.add_argument('--dir', '-d', default='migrations', help='Migration directory (default: migrations)')
+    parser.add_argument('--name', '-n', help='Write a single migration with this name instead of one per table')
+    parser.add_argument('--version', help='Version of the first new migration (default: current UTC time)')
+    parser.add_argument('--clean', action='store_true', help='Remove existing migrations and atlas.sum first')
+    parser.add_argument('--sum-only', action='store_true', help='Only recompute atlas.sum')
+    instrumentation.add_arguments(parser)
+
+    args = parser.parse_args()
+
+    writer = AtlasMigrationWriter(args.dir)
+    if args.sum_only:
+        writer.write_sum()
+        print(f"✅ {os.path.abspath(os.path.join(args.dir, SUM_FILE))}")
+        return 0
+
+    paths = []
+    for source in args.input:
+        paths.extend(sorted(glob.glob(os.path.join(source, '*.hcl'))) if os.path.isdir(source) else [source])
+    if not paths:
+        print("❌ Error: No schema files given (use --input)")
+        return 1
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        print(f"❌ Error: Schema file not found: {missing[0]}")
+        return 1
+
+    print("🔄 Atlas Migration Writer")
+    print("=" * 30)
+    print(f"Directory: {os.path.abspath(args.dir)}")
+
+    try:
+        with instrumentation.instrumented('atlas_migrations', args):
+            tables: List[Table] = []
+            with phase('parse'):
+                for path in paths:
+                    tables.extend(open_source(path).load())
+            instrumentation.count('tables', len(tables))
+            if args.clean:
+                print(f"🧹 Removed {writer.clean()} files")
+            written = writer.write(tables, args.name, args.version)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    for file_name in written:
+        print(f"  ✅ {file_name}")
+    print(f"\n{len(tables)} tables in {len(written)} migrations, {SUM_FILE} updated")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
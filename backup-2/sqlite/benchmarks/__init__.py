@@ -0,0 +1,4 @@
+"""
+Benchmarks for the schema converters
+Run from the sqlite directory, e.g.: python3 -m benchmarks.hcl_parser_scaling
+"""
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Converter Benchmark Suite
+Times every converter (wall time, best of N) and measures its peak traced
+memory (tracemalloc, separate run) on synthetic schemas of several sizes.
+Results can be saved as a JSON baseline and compared against one, flagging
+regressions beyond a threshold. Before timing, the DDL and Sea-ORM outputs
+are replayed in SQLite (the synthetic schema has keyword and mixed-case
+names), so a converter that emits invalid SQL or Rust bindings fails the suite,
+and schema_diff must find no change between a database and its own DDL.
+"""
+
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+import schema_ir
+from db_to_ddl import SQLiteToDDLGenerator
+from ddl_parser import DDLParser
+from ddl_to_hcl import DDLToHCLConverter
+from ddl_to_seaorm import DDLToSeaORMGenerator
+from hcl_to_ddl import HCLParser, HCLToDDLConverter
+from pipeline import open_source
+from schema_diff import SchemaDiffer
+from sqlite_introspect import SQLiteToHCLConverter
+
+from benchmarks.synthetic_schema import write_schema
+
+
+DEFAULT_SCALES = (10, 100, 1000, 10000)
+
+# Wall-time differences below this are timer noise, never regressions
+MIN_SECONDS_DELTA = 0.005
+
+# Sea-ORM output: let bindings, raw SQL strings and plain execute_unprepared("...") strings
+SEAORM_LET_PATTERN = re.compile(r'^\s*let (\S+) = r#"', re.MULTILINE)
+SEAORM_RAW_SQL_PATTERN = re.compile(r'r#"(.*?)"#', re.DOTALL)
+SEAORM_PLAIN_SQL_PATTERN = re.compile(r'execute_unprepared\("((?:[^"\\]|\\.)*)"\)')
+RUST_IDENTIFIER_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+# What the synthetic schema lacks: UNIQUE and REFERENCES (inline and table-level), typeless
+# columns, AUTOINCREMENT and expression defaults; diffed against a database built from it
+SELF_DIFF_DDL = """
+CREATE TABLE parent (id INTEGER PRIMARY KEY AUTOINCREMENT, code TEXT UNIQUE NOT NULL,
+    created TEXT DEFAULT (datetime('now')), CHECK (code <> ''));
+CREATE TABLE pair (a, b INT, PRIMARY KEY (a, b));
+CREATE TABLE child (id INTEGER PRIMARY KEY, parent_id INTEGER NOT NULL REFERENCES parent ON DELETE CASCADE,
+    note TEXT UNIQUE, x INT, y INT, CONSTRAINT xy UNIQUE (x, y),
+    FOREIGN KEY (x, y) REFERENCES pair (a, b) ON UPDATE SET NULL DEFERRABLE INITIALLY DEFERRED);
+CREATE INDEX child_x ON child (x);
+"""
+
+
+def converter_cases(paths: Dict[str, str], output: str) -> List[Tuple[str, Callable[[], object]]]:
+    """(name, zero-argument conversion) for every converter, on the synthetic inputs"""
+    return [
+        ('SQLiteToDDLGenerator', lambda: SQLiteToDDLGenerator(paths['sqlite'], output).generate_ddl_file()),
+        ('SQLiteToHCLConverter', lambda: SQLiteToHCLConverter().convert_database(paths['sqlite'], output)),
+        ('DDLParser', lambda: DDLParser().parse_file(paths['ddl'])),
+        ('HCLParser', lambda: HCLParser().parse_file(paths['hcl'])),
+        ('DDLToHCLConverter', lambda: DDLToHCLConverter().convert_file(paths['ddl'], output)),
+        ('HCLToDDLConverter', lambda: HCLToDDLConverter().convert_file(paths['hcl'], output)),
+        ('DDLToSeaORMGenerator', lambda: DDLToSeaORMGenerator().convert_file(paths['ddl'], output)),
+    ]
+
+
+def _replay(sql: str) -> None:
+    """Run SQL in a scratch in-memory database (raises sqlite3.Error on invalid SQL)"""
+    conn = sqlite3.connect(':memory:')
+    try:
+        conn.executescript(sql)
+    finally:
+        conn.close()
+
+
+def verify_outputs(paths: Dict[str, str], output: str) -> List[str]:
+    """Problems with the emitted DDL and Sea-ORM code (SQL SQLite rejects, invalid Rust let bindings)
+    and changes schema_diff finds between a database and its own DDL"""
+    problems = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        ddl_cases = [
+            ('SQLiteToDDLGenerator', lambda: SQLiteToDDLGenerator(paths['sqlite'], output).generate_ddl_file()),
+            ('HCLToDDLConverter', lambda: HCLToDDLConverter().convert_file(paths['hcl'], output)),
+        ]
+        for name, convert in ddl_cases:
+            convert()
+            with open(output, 'r', encoding='utf-8') as f:
+                try:
+                    _replay(f.read())
+                except sqlite3.Error as e:
+                    problems.append(f"{name}: DDL does not replay: {e}")
+
+        for batched in (False, True):
+            name = f"DDLToSeaORMGenerator{' (batched)' if batched else ''}"
+            DDLToSeaORMGenerator(batched, indexes=True).convert_file(paths['ddl'], output)
+            with open(output, 'r', encoding='utf-8') as f:
+                code = f.read()
+            bad = [binding for binding in SEAORM_LET_PATTERN.findall(code)
+                   if not RUST_IDENTIFIER_PATTERN.fullmatch(binding)]
+            if bad:
+                problems.append(f"{name}: invalid Rust bindings: {', '.join(bad[:3])}")
+            # up() then down(): every raw string, then the plain strings (only down() uses them)
+            up, _, down = code.partition('async fn down')
+            statements = SEAORM_RAW_SQL_PATTERN.findall(up) + SEAORM_RAW_SQL_PATTERN.findall(down)
+            statements += [re.sub(r'\\(.)', r'\1', sql) for sql in SEAORM_PLAIN_SQL_PATTERN.findall(down)]
+            try:
+                _replay('\n'.join(statements))
+            except sqlite3.Error as e:
+                problems.append(f"{name}: migration SQL does not replay: {e}")
+
+    # A database diffed against its own DDL: the synthetic schema, then SELF_DIFF_DDL
+    work_dir = os.path.dirname(output)
+    ddl_file = os.path.join(work_dir, 'self_diff.sql')
+    db_path = os.path.join(work_dir, 'self_diff.sqlite')
+    with open(ddl_file, 'w', encoding='utf-8') as f:
+        f.write(SELF_DIFF_DDL)
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(SELF_DIFF_DDL)
+    finally:
+        conn.close()
+    for source, ddl in ((paths['sqlite'], paths['ddl']), (db_path, ddl_file)):
+        problems.extend(f"schema_diff {os.path.basename(source)} against its DDL: {change}"
+                        for change in self_diff(source, ddl))
+    return problems
+
+
+def self_diff(db_path: str, ddl_file: str) -> List[str]:
+    """Changes schema_diff finds between a database and the DDL it was built from (there should be none)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        diffs = SchemaDiffer().diff(open_source(db_path).load(), open_source(ddl_file).load())
+    return [f"{table_diff.action} {table_diff.name} ({', '.join(table_diff.details)})" for table_diff in diffs]
+
+
+def measure(convert: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Best wall time of repeat quiet runs (collector paused, as timeit does), then peak traced MB of one more run"""
+    best = float('inf')
+    for _ in range(repeat):
+        schema_ir.clear_pools()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                convert()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+    schema_ir.clear_pools()
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            convert()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': round(best, 6), 'peak_mb': round(peak / (1024 * 1024), 3)}
+
+
+def run_suite(scales: List[int], columns: int = 8, repeat: int = 5) -> Dict[str, Any]:
+    """Results keyed by converter, then by table count"""
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    problems: List[str] = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        output = os.path.join(work_dir, 'output')
+        for table_count in scales:
+            paths = write_schema(work_dir, table_count, columns)
+            print(f"📐 {table_count} tables x {columns} columns "
+                  f"(DDL {os.path.getsize(paths['ddl']) / 1024:.0f} KB, "
+                  f"HCL {os.path.getsize(paths['hcl']) / 1024:.0f} KB)")
+            for problem in verify_outputs(paths, output):
+                problems.append(f"{table_count} tables: {problem}")
+                print(f"  ❌ {problem}")
+            for name, convert in converter_cases(paths, output):
+                result = measure(convert, repeat)
+                results.setdefault(name, {})[str(table_count)] = result
+                print(f"  {name:<22} {result['seconds']:>9.4f} s {result['peak_mb']:>9.2f} MB")
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'machine': platform.machine(),
+        },
+        'columns': columns,
+        'repeat': repeat,
+        'results': results,
+        'problems': problems,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Regressions: a converter/scale whose time or peak grew by more than threshold percent"""
+    regressions = []
+    for name, scales in current['results'].items():
+        for scale, result in scales.items():
+            before = baseline['results'].get(name, {}).get(scale)
+            if before is None:
+                continue
+            for metric, unit in (('seconds', 's'), ('peak_mb', 'MB')):
+                old, new = before[metric], result[metric]
+                if metric == 'seconds' and new - old < MIN_SECONDS_DELTA:
+                    continue
+                if old and (new - old) / old * 100.0 > threshold:
+                    regressions.append(f"{name} @ {scale} tables: {metric} {old:.4f} -> {new:.4f} {unit} "
+                                       f"(+{(new - old) / old * 100.0:.1f}%)")
+    return regressions
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark every converter on synthetic schemas",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Record a baseline
+  python3 -m benchmarks.converter_suite --save baseline.json
+
+  # Check a change against it (exit code 1 on a regression beyond 10%%)
+  python3 -m benchmarks.converter_suite --compare baseline.json --threshold 10
+
+  # Up to 50,000 tables
+  python3 -m benchmarks.converter_suite --scales 10,100,1000,10000,50000
+        """
+    )
+    parser.add_argument('--scales', default=','.join(str(scale) for scale in DEFAULT_SCALES),
+                        help='Comma-separated table counts (default: 10,100,1000,10000)')
+    parser.add_argument('--columns', type=int, default=8, help='Columns per table (default: 8)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case, best kept (default: 5)')
+    parser.add_argument('--save', help='Write the results as a JSON baseline to this path')
+    parser.add_argument('--compare', help='Compare against this JSON baseline')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Regression threshold in percent (default: 10)')
+
+    args = parser.parse_args()
+    scales = [int(scale) for scale in args.scales.split(',') if scale]
+
+    print("⏱️  Converter benchmark suite")
+    print("=" * 50)
+    current = run_suite(scales, args.columns, args.repeat)
+    if current['problems']:
+        print(f"\n❌ {len(current['problems'])} converter output problem(s), see above")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(f"\n📄 Baseline written to {os.path.abspath(args.save)}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        print()
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:g}%:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print(f"✅ No regressions beyond {args.threshold:g}% against {args.compare}")
+    return 1 if current['problems'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+HCL Parser Scaling Benchmark
+Generates synthetic HCL schemas of growing size and times HCLParser on each,
+to check that parse time grows linearly with input size
+"""
+
+import sys
+import time
+from typing import List
+
+from hcl_to_ddl import HCLParser
+
+
+def generate_hcl(target_bytes: int, columns_per_table: int = 12, distinct_columns: bool = False) -> str:
+    """Generate a synthetic HCL schema of roughly target_bytes (distinct_columns: no column shared between tables)"""
+    parts: List[str] = ['schema "main" {}', '']
+    size = 0
+    table_number = 0
+    while size < target_bytes:
+        lines = [f'table "table_{table_number}" {{', '  schema = schema.main']
+        column = f'column_{table_number}_' if distinct_columns else 'column_'
+        for i in range(columns_per_table):
+            lines.append(f'  column "{column}{i}" {{')
+            # Trailing comments on the first two columns, which must not end up in the values
+            lines.append('    type = varchar(8)' if i % 3 else '    type = int' + (' # key' if i == 0 else ''))
+            lines.append(f'    null = {"true" if i % 2 else "false"}' + (' // optional' if i == 1 else ''))
+            if i % 4 == 1:
+                lines.append('    default = "value"')
+            lines.append('  }')
+        lines.append('  primary_key {')
+        lines.append(f'    columns = [column.{column}0]')
+        lines.append('  }')
+        lines.append(f'  index "table_{table_number}_column_1" {{')
+        lines.append(f'    columns = [column.{column}1]')
+        lines.append('  }')
+        lines.append('}')
+        block = '\n'.join(lines) + '\n'
+        parts.append(block)
+        size += len(block)
+        table_number += 1
+    return '\n'.join(parts)
+
+
+def run(max_mb: int = 100) -> int:
+    """Time the parser at doubling sizes up to max_mb and report throughput"""
+    sizes = []
+    mb = 1
+    while mb < max_mb:
+        sizes.append(mb)
+        mb *= 2
+    sizes.append(max_mb)
+
+    print("📈 HCLParser scaling benchmark")
+    print("=" * 50)
+
+    columns = HCLParser().parse_content(generate_hcl(1))[0].columns
+    if (columns[0].type, columns[0].nullable, columns[1].type, columns[1].nullable) != \
+            ('INTEGER', False, 'VARCHAR(8)', True):
+        print(f"❌ Commented attributes parsed wrong: {columns[:2]}")
+        return 1
+    print(f"{'size (MB)':>10} {'tables':>10} {'seconds':>10} {'MB/s':>10}")
+
+    rates = []
+    for mb in sizes:
+        content = generate_hcl(mb * 1024 * 1024)
+        start = time.perf_counter()
+        tables = HCLParser().parse_content(content)
+        elapsed = time.perf_counter() - start
+        rate = len(content) / (1024 * 1024) / elapsed
+        rates.append(rate)
+        print(f"{mb:>10} {len(tables):>10} {elapsed:>10.2f} {rate:>10.2f}")
+        del content, tables
+
+    # Linear scaling means throughput stays flat as the input grows
+    ratio = rates[-1] / rates[0]
+    print()
+    print(f"Throughput ratio largest/smallest: {ratio:.2f} (1.0 = perfectly linear)")
+    return 0 if ratio > 0.5 else 1
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark HCLParser scaling on synthetic schemas")
+    parser.add_argument('--max-mb', type=int, default=100, help='Largest input size in MB (default: 100)')
+
+    args = parser.parse_args()
+    return run(args.max_mb)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Sea-ORM Migration Timing Benchmark
+Replays the SQL of generated Sea-ORM migrations against a cold (freshly
+created) database, one sqlite3 executescript per execute_unprepared call, and compares
+the per-table output with the batched single-transaction output
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+from ddl_to_seaorm import DDLToSeaORMGenerator
+from sqlite_introspect import SQLiteToHCLConverter
+
+from benchmarks.sqlite_introspection import create_database
+
+
+# The argument of execute_unprepared: a named raw string, or an inline string literal
+EXECUTE = re.compile(r'let (\w+) = r#"(.*?)"#;|execute_unprepared\((\w+|"[^"]*")\)', re.DOTALL)
+
+
+def executes(migration_code: str) -> Tuple[List[str], List[str]]:
+    """SQL of every execute_unprepared call in up() and in down(), in order"""
+    def scripts(body: str) -> List[str]:
+        variables = {}
+        found = []
+        for name, raw, argument in EXECUTE.findall(body):
+            if name:
+                variables[name] = raw
+            elif argument.startswith('"'):
+                found.append(argument[1:-1])
+            else:
+                found.append(variables[argument])
+        return found
+
+    up, down = migration_code.split('async fn down', 1)
+    return scripts(up), scripts(down)
+
+
+def replay(db_path: str, scripts: List[str], journal_mode: str, transaction: bool = False) -> float:
+    """Run each script in autocommit mode, as execute_unprepared does, or in the one transaction
+    of a batched body's begin()/commit(); returns seconds"""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        # sqlx opens SQLite with synchronous=FULL
+        conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        conn.execute("PRAGMA synchronous=FULL")
+        if transaction:
+            # executescript() commits before it runs, so the transaction has to be part of the script
+            scripts = ['BEGIN;\n' + '\n'.join(scripts) + '\nCOMMIT;']
+        start = time.perf_counter()
+        for script in scripts:
+            conn.executescript(script)
+        return time.perf_counter() - start
+    finally:
+        conn.close()
+
+
+def run(table_count: int = 500, journal_mode: str = 'wal', repeat: int = 3) -> int:
+    """Time up() and down() of the per-table and batched migrations on cold databases"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source_path = os.path.join(tmp_dir, 'source.sqlite')
+        create_database(source_path, table_count)
+        converter = SQLiteToHCLConverter()
+        conn = converter.connect_to_database(source_path)
+        try:
+            tables = converter.get_all_tables(conn)
+        finally:
+            conn.close()
+
+        print(f"⏱️  Sea-ORM migration timing: {table_count} tables, journal_mode={journal_mode}, synchronous=FULL")
+        print("=" * 78)
+        print(f"{'mode':<12} {'up executes':>12} {'up s':>8} {'down executes':>14} {'down s':>8}")
+
+        results = {}
+        for mode, batched in (('per-table', False), ('batched', True)):
+            up, down = executes(DDLToSeaORMGenerator(batched, indexes=True).generate_migration(tables))
+            best_up = best_down = float('inf')
+            for attempt in range(repeat):
+                db_path = os.path.join(tmp_dir, f'{mode}_{attempt}.sqlite')
+                best_up = min(best_up, replay(db_path, up, journal_mode, batched))
+                best_down = min(best_down, replay(db_path, down, journal_mode, batched))
+                check = sqlite3.connect(db_path)
+                remaining = check.execute("SELECT count(*) FROM sqlite_master").fetchone()[0]
+                check.close()
+                if remaining:
+                    print(f"❌ {mode}: {remaining} schema objects left after down()")
+                    return 1
+            results[mode] = best_up + best_down
+            print(f"{mode:<12} {len(up):>12} {best_up:>8.3f} {len(down):>14} {best_down:>8.3f}")
+
+    print()
+    print(f"✅ Batched migration is {results['per-table'] / results['batched']:.1f}x faster (up + down)")
+    return 0
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Time per-table and batched Sea-ORM migrations on a cold database")
+    parser.add_argument('--tables', type=int, default=500, help='Number of synthetic tables (default: 500)')
+    parser.add_argument('--journal-mode', default='wal', help='SQLite journal mode (default: wal, as sqlx)')
+    parser.add_argument('--repeat', type=int, default=3, help='Fresh databases per mode, best time kept (default: 3)')
+
+    args = parser.parse_args()
+    return run(args.tables, args.journal_mode, args.repeat)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
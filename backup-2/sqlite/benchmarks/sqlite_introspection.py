@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+SQLite Introspection Benchmark
+Compares the per-table PRAGMA loop with the batched table-valued PRAGMA
+queries of SQLiteToHCLConverter on a synthetic database
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from sqlite_introspect import SQLiteToHCLConverter
+
+
+def create_database(db_path: str, table_count: int, columns_per_table: int = 8) -> None:
+    """Create a database with table_count tables, each with an index and a foreign key"""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        with conn:
+            for t in range(table_count):
+                columns = ', '.join(
+                    f'"column_{i}" {"INTEGER" if i % 2 else "TEXT"} NOT NULL DEFAULT {i if i % 2 else repr("")}'
+                    for i in range(columns_per_table)
+                )
+                reference = f', parent_id INTEGER REFERENCES "table_{t - 1}"(id)' if t else ''
+                conn.execute(f'CREATE TABLE "table_{t}" (id INTEGER PRIMARY KEY{reference}, {columns})')
+                conn.execute(f'CREATE INDEX "table_{t}_column_1" ON "table_{t}" ("column_1")')
+    finally:
+        conn.close()
+
+
+def per_table_introspection(converter: SQLiteToHCLConverter, conn: sqlite3.Connection) -> list:
+    """The statement-per-table approach: table_info, index_list, index_info and foreign_key_list"""
+    tables = []
+    cursor = conn.cursor()
+    for name in converter.get_tables(conn):
+        tables.append(converter.get_table_info(conn, name))
+        for index in cursor.execute(f'PRAGMA index_list("{name}")').fetchall():
+            cursor.execute(f'PRAGMA index_info("{index[1]}")').fetchall()
+        cursor.execute(f'PRAGMA foreign_key_list("{name}")').fetchall()
+    return tables
+
+
+def run(table_count: int = 5000) -> int:
+    """Time both introspection strategies and check they agree on the columns"""
+    converter = SQLiteToHCLConverter()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'bench.sqlite')
+        print(f"🔧 Creating database with {table_count} tables...")
+        create_database(db_path, table_count)
+
+        conn = converter.connect_to_database(db_path)
+        try:
+            start = time.perf_counter()
+            looped = per_table_introspection(converter, conn)
+            loop_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            batched = converter.get_all_tables(conn)
+            batch_time = time.perf_counter() - start
+        finally:
+            conn.close()
+
+    same_columns = [t.columns for t in looped] == [t.columns for t in batched]
+    indexes = sum(len(t.indexes) for t in batched)
+    foreign_keys = sum(len(t.foreign_keys) for t in batched)
+
+    print()
+    print("📈 SQLite introspection benchmark")
+    print("=" * 50)
+    print(f"Tables: {len(batched)}, indexes: {indexes}, foreign keys: {foreign_keys}")
+    print(f"Per-table PRAGMA loop:    {loop_time:8.3f}s")
+    print(f"Batched pragma_* queries: {batch_time:8.3f}s")
+    print(f"Speedup: {loop_time / batch_time:.1f}x")
+    print(f"Columns identical: {'yes' if same_columns else 'NO'}")
+    return 0 if same_columns else 1
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark per-table vs batched SQLite introspection")
+    parser.add_argument('--tables', type=int, default=5000, help='Number of tables (default: 5000)')
+
+    args = parser.parse_args()
+    return run(args.tables)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Streaming Memory Benchmark
+Converts a synthetic schema with each converter in whole-file and streaming
+mode and compares peak traced memory (tracemalloc), to check that streaming
+memory stays bounded by the largest table rather than the schema size. No
+two tables share a column, so nothing kept across tables stays hidden behind
+hash-consing.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+import schema_ir
+from ddl_to_hcl import DDLToHCLConverter
+from ddl_to_seaorm import DDLToSeaORMGenerator
+from hcl_to_ddl import HCLToDDLConverter
+
+from benchmarks.hcl_parser_scaling import generate_hcl
+
+
+def measure(convert: Callable[[], object]) -> Tuple[float, float]:
+    """Run one conversion quietly; returns (seconds, peak traced MB)"""
+    schema_ir.clear_pools()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            convert()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+def run(mb: int = 8) -> int:
+    """Compare whole-file and streaming peaks for every file converter, streaming at two input sizes"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        output = os.path.join(work_dir, 'output')
+        inputs = {}
+        for size_mb in (mb // 2 or 1, mb):
+            hcl_file = os.path.join(work_dir, f'schema_{size_mb}.hcl')
+            ddl_file = os.path.join(work_dir, f'schema_{size_mb}.sql')
+            with open(hcl_file, 'w', encoding='utf-8') as f:
+                f.write(generate_hcl(size_mb * 1024 * 1024, distinct_columns=True))
+            with contextlib.redirect_stdout(io.StringIO()):
+                HCLToDDLConverter().convert_file_streaming(hcl_file, ddl_file)
+            inputs[size_mb] = {'hcl': hcl_file, 'ddl': ddl_file}
+
+        hcl_converter = HCLToDDLConverter()
+        ddl_converter = DDLToHCLConverter()
+        seaorm_generator = DDLToSeaORMGenerator()
+        cases = [
+            ('hcl -> ddl', 'hcl', hcl_converter.convert_file, hcl_converter.convert_file_streaming),
+            ('ddl -> hcl', 'ddl', ddl_converter.convert_file, ddl_converter.convert_file_streaming),
+            ('ddl -> sea-orm', 'ddl', seaorm_generator.convert_file, seaorm_generator.convert_file_streaming),
+        ]
+        small, large = sorted(inputs)
+
+        print("🧮 Streaming memory benchmark")
+        print("=" * 78)
+        print(f"{'converter':<16} {'input MB':>9} {'whole MB':>10} {'stream MB':>10} "
+              f"{'half-size stream MB':>20} {'whole s':>8}")
+
+        failed = False
+        for name, kind, whole, stream in cases:
+            large_file = inputs[large][kind]
+            size = os.path.getsize(large_file) / (1024 * 1024)
+            whole_seconds, whole_peak = measure(lambda: whole(large_file, output))
+            _, stream_peak = measure(lambda: stream(large_file, output))
+            _, small_stream_peak = measure(lambda: stream(inputs[small][kind], output))
+            print(f"{name:<16} {size:>9.1f} {whole_peak:>10.1f} {stream_peak:>10.1f} "
+                  f"{small_stream_peak:>20.1f} {whole_seconds:>8.2f}")
+            # Bounded: doubling the input must not (nearly) double the streaming peak
+            failed |= stream_peak > small_stream_peak * 1.5
+
+    print()
+    print("✅ Streaming peaks stay flat as the input doubles" if not failed
+          else "❌ A streaming peak grew with the input size")
+    return 1 if failed else 0
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare peak memory of whole-file and streaming conversion")
+    parser.add_argument('--mb', type=int, default=8, help='Largest synthetic HCL input size in MB (default: 8)')
+
+    args = parser.parse_args()
+    return run(args.mb)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
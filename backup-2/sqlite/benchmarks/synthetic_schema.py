@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Synthetic Schema Generator
+Builds one deterministic schema of N tables x M columns (mixed types,
+defaults, composite keys, quoted names) and writes it as SQL DDL, Atlas HCL
+and a SQLite database, so every converter can be benchmarked on the same input
+"""
+
+import os
+import sqlite3
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class ColumnSpec(NamedTuple):
+    """One generated column, with its SQL and HCL spellings"""
+    name: str
+    sql_type: str
+    hcl_type: str
+    nullable: bool
+    sql_default: Optional[str]
+    hcl_default: Optional[str]
+
+
+class TableSpec(NamedTuple):
+    """One generated table"""
+    name: str
+    columns: List[ColumnSpec]
+    primary_keys: List[str]
+    index_columns: List[str]
+
+
+# (SQL type, HCL type, SQL default, HCL default), cycled through the columns
+COLUMN_TYPES: List[Tuple[str, str, Optional[str], Optional[str]]] = [
+    ('INTEGER', 'int', '0', '0'),
+    ('VARCHAR(64)', 'varchar(64)', "'none'", '"none"'),
+    ('TEXT', 'text', None, None),
+    ('BOOLEAN', 'bool', 'TRUE', 'true'),
+    ('REAL', 'float', '0.5', '0.5'),
+    ('DATETIME', 'datetime', None, None),
+    ('BLOB', 'blob', None, None),
+    ('DECIMAL', 'decimal', None, None),
+]
+
+# Column names that are SQL keywords or mixed case, so they must be quoted in DDL
+# (used as they are once per table, then with the column index appended to stay unique)
+QUOTED_COLUMN_NAMES = ['order', 'Group', 'select', 'Value']
+
+
+def table_specs(table_count: int, columns_per_table: int = 8) -> List[TableSpec]:
+    """The schema: every 4th table has a composite key, every 5th a mixed-case (quoted) name"""
+    tables = []
+    for t in range(table_count):
+        name = f'Table_{t}' if t % 5 == 0 else f'table_{t}'
+        columns = []
+        composite = t % 4 == 0
+        if not composite:
+            columns.append(ColumnSpec('id', 'INTEGER', 'int', False, None, None))
+        for i in range(columns_per_table - len(columns)):
+            sql_type, hcl_type, sql_default, hcl_default = COLUMN_TYPES[(t + i) % len(COLUMN_TYPES)]
+            if i % 3 == 2:
+                column_name = QUOTED_COLUMN_NAMES[i // 3 % len(QUOTED_COLUMN_NAMES)]
+                if i // 3 >= len(QUOTED_COLUMN_NAMES):
+                    column_name = f'{column_name}_{i}'
+            else:
+                column_name = f'column_{i}'
+            if composite and i < 2:
+                # Key columns: NOT NULL integers without defaults
+                sql_type, hcl_type, sql_default, hcl_default = 'INTEGER', 'int', None, None
+            nullable = not composite or i >= 2
+            if i % 2:
+                sql_default = hcl_default = None
+            columns.append(ColumnSpec(column_name, sql_type, hcl_type, nullable and i % 4 != 1,
+                                      sql_default, hcl_default))
+        primary_keys = [columns[0].name, columns[1].name] if composite else ['id']
+        index_columns = [columns[-1].name]
+        tables.append(TableSpec(name, columns, primary_keys, index_columns))
+    return tables
+
+
+def _quote(name: str) -> str:
+    """Double-quote an identifier when it is a keyword or not all lower case"""
+    if name in QUOTED_COLUMN_NAMES or name != name.lower():
+        return '"' + name.replace('"', '""') + '"'
+    return name
+
+
+def render_ddl(tables: List[TableSpec]) -> str:
+    """SQL DDL: CREATE TABLE plus one CREATE INDEX per table"""
+    statements = []
+    for table in tables:
+        lines = []
+        for column in table.columns:
+            definition = f'    {_quote(column.name)} {column.sql_type}'
+            if table.primary_keys == [column.name]:
+                definition += ' PRIMARY KEY'
+            if not column.nullable:
+                definition += ' NOT NULL'
+            if column.sql_default is not None:
+                definition += f' DEFAULT {column.sql_default}'
+            lines.append(definition)
+        if len(table.primary_keys) > 1:
+            lines.append(f"    PRIMARY KEY ({', '.join(_quote(name) for name in table.primary_keys)})")
+        statements.append(f"CREATE TABLE {_quote(table.name)} (\n" + ',\n'.join(lines) + '\n);')
+        index_name = f'{table.name}_{table.index_columns[0]}_idx'.lower()
+        statements.append(f"CREATE INDEX {index_name} ON {_quote(table.name)} "
+                          f"({', '.join(_quote(name) for name in table.index_columns)});")
+    return '\n\n'.join(statements) + '\n'
+
+
+def render_hcl(tables: List[TableSpec], schema_name: str = 'main') -> str:
+    """Atlas HCL with the same tables, keys and indexes"""
+    parts = [f'schema "{schema_name}" {{}}', '']
+    for table in tables:
+        lines = [f'table "{table.name}" {{', f'  schema = schema.{schema_name}', '']
+        for column in table.columns:
+            lines.append(f'  column "{column.name}" {{')
+            lines.append(f'    type = {column.hcl_type}')
+            lines.append(f'    null = {"true" if column.nullable else "false"}')
+            if column.hcl_default is not None:
+                lines.append(f'    default = {column.hcl_default}')
+            lines.append('  }')
+            lines.append('')
+        lines.append('  primary_key {')
+        lines.append(f"    columns = [{', '.join(f'column.{name}' for name in table.primary_keys)}]")
+        lines.append('  }')
+        lines.append(f'  index "{table.name}_{table.index_columns[0]}_idx" {{'.lower())
+        lines.append(f"    columns = [{', '.join(f'column.{name}' for name in table.index_columns)}]")
+        lines.append('  }')
+        lines.append('}')
+        parts.append('\n'.join(lines))
+        parts.append('')
+    return '\n'.join(parts)
+
+
+def write_schema(directory: str, table_count: int, columns_per_table: int = 8) -> Dict[str, str]:
+    """Write schema.sql, schema.hcl and schema.sqlite into directory; returns their paths by format"""
+    tables = table_specs(table_count, columns_per_table)
+    ddl = render_ddl(tables)
+    paths = {
+        'ddl': os.path.join(directory, 'schema.sql'),
+        'hcl': os.path.join(directory, 'schema.hcl'),
+        'sqlite': os.path.join(directory, 'schema.sqlite'),
+    }
+    with open(paths['ddl'], 'w', encoding='utf-8') as f:
+        f.write(ddl)
+    with open(paths['hcl'], 'w', encoding='utf-8') as f:
+        f.write(render_hcl(tables))
+
+    if os.path.exists(paths['sqlite']):
+        os.remove(paths['sqlite'])
+    conn = sqlite3.connect(paths['sqlite'])
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(f"BEGIN;\n{ddl}\nCOMMIT;")
+    finally:
+        conn.close()
+    return paths
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a synthetic schema as DDL, HCL and a SQLite database")
+    parser.add_argument('--tables', type=int, default=100, help='Number of tables (default: 100)')
+    parser.add_argument('--columns', type=int, default=8, help='Columns per table (default: 8)')
+    parser.add_argument('--output-dir', '-o', default='.', help='Directory for schema.sql/.hcl/.sqlite')
+
+    args = parser.parse_args()
+    os.makedirs(args.output_dir, exist_ok=True)
+    for kind, path in write_schema(args.output_dir, args.tables, args.columns).items():
+        print(f"  ✅ {kind:<6} {os.path.abspath(path)} ({os.path.getsize(path)} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Conversion Server
+Long-lived conversion process: reads newline-delimited JSON requests from
+stdin or a Unix socket and answers each with one JSON line, so per-table
+shell loops pay interpreter startup, imports and regex compilation once
+instead of once per table. Requests are handled concurrently; responses
+carry the request id and may arrive out of order.
+
+Request:  {"id": 1, "op": "ddl_to_hcl", "input": "CREATE TABLE t (id INTEGER PRIMARY KEY);"}
+Response: {"id": 1, "ok": true, "output": "schema \"main\" {}...", "tables": 1, "ms": 0.21}
+Error:    {"id": 1, "ok": false, "error": "..."}
+
+Operations:
+  ddl_to_hcl     input (DDL text), dialect (sqlite or postgres), schema (default: main)
+  hcl_to_ddl     input (HCL text)
+  ddl_to_seaorm  input (DDL text), dialect, migration_name, batched, indexes
+  introspect     database (path), to: ddl | hcl | seaorm | json (default: ddl), plus the options above
+  ping           answers {"ok": true}
+"""
+
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, TextIO
+
+from schema_ir import Table, release_table
+from pipeline import DDL_DIALECTS, DDLSink, DDLSource, HCLSink, HCLSource, JSONSink, SeaORMSink, Sink, SQLiteSource
+
+
+class RequestError(Exception):
+    """A request that cannot be served (reported to the client, the server keeps running)"""
+
+
+def _text(request: Dict[str, Any], key: str) -> str:
+    value = request.get(key)
+    if not isinstance(value, str):
+        raise RequestError(f"'{key}' must be a string")
+    return value
+
+
+def _sink(request: Dict[str, Any], target: str) -> Sink:
+    """Sink for a target format, configured from the request options"""
+    if target == 'ddl':
+        return DDLSink()
+    if target == 'hcl':
+        return HCLSink(request.get('schema', 'main'))
+    if target == 'seaorm':
+        return SeaORMSink(request.get('migration_name', 'Migration'),
+                          bool(request.get('batched')), bool(request.get('indexes')))
+    if target == 'json':
+        return JSONSink()
+    raise RequestError(f"Unknown target format: {target}")
+
+
+def _settle(futures: List[Future]) -> List[Future]:
+    """Futures still running (the finished ones are checked so their errors still surface)"""
+    running = []
+    for future in futures:
+        if future.done():
+            future.result()
+        else:
+            running.append(future)
+    return running
+
+
+class ConversionServer:
+    """Dispatches JSON requests to the converters on a shared thread pool"""
+
+    def __init__(self, workers: int = 0):
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        self.operations: Dict[str, Callable[[Dict[str, Any]], List[Table]]] = {
+            'ddl_to_hcl': self._parse_ddl,
+            'hcl_to_ddl': lambda request: HCLSource(_text(request, 'input')).load(),
+            'ddl_to_seaorm': self._parse_ddl,
+            'introspect': self._introspect,
+        }
+        self.targets = {'ddl_to_hcl': 'hcl', 'hcl_to_ddl': 'ddl', 'ddl_to_seaorm': 'seaorm'}
+        self.served = 0
+
+    def _parse_ddl(self, request: Dict[str, Any]) -> List[Table]:
+        dialect = request.get('dialect', 'sqlite')
+        if dialect not in DDL_DIALECTS:
+            raise RequestError(f"Unknown dialect: {dialect} (expected one of: {', '.join(DDL_DIALECTS)})")
+        return DDLSource(_text(request, 'input'), dialect).load()
+
+    def _introspect(self, request: Dict[str, Any]) -> List[Table]:
+        database = _text(request, 'database')
+        if not os.path.exists(database):
+            raise RequestError(f"Database file not found: {database}")
+        return SQLiteSource(database, bool(request.get('immutable'))).load()
+
+    def handle(self, request: Any) -> Dict[str, Any]:
+        """Serve one decoded request; never raises"""
+        request_id = request.get('id') if isinstance(request, dict) else None
+        start = time.perf_counter()
+        try:
+            if not isinstance(request, dict):
+                raise RequestError("Request must be a JSON object")
+            op = request.get('op')
+            if op == 'ping':
+                response = {'id': request_id, 'ok': True}
+            elif op in self.operations:
+                sink = _sink(request, self.targets.get(op) or request.get('to', 'ddl'))
+                tables = self.operations[op](request)
+                try:
+                    response = {'id': request_id, 'ok': True, 'output': sink.render(tables), 'tables': len(tables)}
+                finally:
+                    # Requests are independent: keep the hash-consing pools from growing with every one served
+                    for table in tables:
+                        release_table(table)
+            else:
+                raise RequestError(f"Unknown op: {op} (expected one of: {', '.join(sorted(self.operations))}, ping)")
+        except RequestError as e:
+            response = {'id': request_id, 'ok': False, 'error': str(e)}
+        except Exception as e:
+            response = {'id': request_id, 'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        response['ms'] = round((time.perf_counter() - start) * 1000, 3)
+        self.served += 1
+        return response
+
+    def serve_stream(self, reader: Iterable[str], writer: TextIO) -> int:
+        """Answer every request line of reader on writer until EOF; returns the request count"""
+        write_lock = threading.Lock()
+        pending: List[Future] = []
+        settle_at = self.workers * 4
+        served = 0
+
+        def answer(line: str) -> None:
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {'id': None, 'ok': False, 'error': f"Invalid JSON: {e}"}
+            else:
+                response = self.handle(request)
+            text = json.dumps(response) + '\n'
+            with write_lock:
+                writer.write(text)
+                writer.flush()
+
+        for line in reader:
+            if line.strip():
+                pending.append(self.executor.submit(answer, line))
+                served += 1
+                if len(pending) >= settle_at:
+                    # Drop answered requests so a long-lived connection holds only the in-flight ones
+                    pending = _settle(pending)
+                    settle_at = max(self.workers * 4, len(pending) * 2)
+        for future in pending:
+            future.result()
+        return served
+
+    def serve_socket(self, socket_path: str) -> None:
+        """Serve connections on a Unix socket until interrupted"""
+        server_self = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                lines = (line.decode('utf-8') for line in self.rfile)
+                server_self.serve_stream(lines, _SocketWriter(self.wfile))
+
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        with socketserver.ThreadingUnixStreamServer(socket_path, Handler) as server:
+            server.daemon_threads = True
+            try:
+                server.serve_forever()
+            finally:
+                os.remove(socket_path)
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+
+class _SocketWriter:
+    """Text writer over a socket's binary stream"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text: str) -> None:
+        self.stream.write(text.encode('utf-8'))
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Serve schema conversions over newline-delimited JSON (stdin or a Unix socket)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # One process for a whole batch of requests on stdin
+  %(prog)s < requests.ndjson > responses.ndjson
+
+  # Long-running server, then one request per table from a shell loop
+  %(prog)s --socket /tmp/convert.sock &
+  jq -nc --arg ddl "$create_sql" '{id: 1, op: "ddl_to_hcl", input: $ddl}' | nc -U -q1 /tmp/convert.sock
+        """
+    )
+    parser.add_argument('--socket', help='Listen on this Unix socket instead of stdin/stdout')
+    parser.add_argument('--workers', '-w', type=int, default=0,
+                        help='Concurrent requests (default: CPU count, at most 8)')
+
+    args = parser.parse_args()
+
+    server = ConversionServer(args.workers)
+    try:
+        if args.socket:
+            print(f"🔌 Listening on {os.path.abspath(args.socket)} with {server.workers} workers", file=sys.stderr)
+            server.serve_socket(args.socket)
+        else:
+            server.serve_stream(sys.stdin, sys.stdout)
+    except KeyboardInterrupt:
+        print(f"\n👋 Stopped after {server.served} requests", file=sys.stderr)
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+SQLite Data Copy
+Carries the rows of an existing database into a database rebuilt from a new
+schema (e.g. a fresh db.sql). Both files are ATTACHed to one connection and
+each table is copied with a single INSERT INTO ... SELECT, so rows never pass
+through Python; the column mapping comes from the two introspected schemas
+"""
+
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from schema_ir import Column, Table, sql_default, sql_identifier
+from sqlite_snapshot import connect_snapshot, snapshot_uri
+import instrumentation
+from instrumentation import phase
+from sqlite_introspect import SQLiteToHCLConverter
+
+
+def fallback_value(column: Column) -> str:
+    """Literal for an added NOT NULL column without a default, by SQLite type affinity"""
+    sql_type = column.type.upper()
+    if 'INT' in sql_type or 'BOOL' in sql_type:
+        return '0'
+    if any(word in sql_type for word in ('REAL', 'FLOA', 'DOUB', 'NUM', 'DEC')):
+        return '0'
+    if 'BLOB' in sql_type:
+        return "X''"
+    return "''"
+
+
+class SQLiteDataCopier:
+    """Copies rows from an old database into a new one inside SQLite"""
+
+    def __init__(self, old_db: str, new_db: str, cache_size_mb: int = 256):
+        self.old_db = old_db
+        self.new_db = new_db
+        self.cache_size_mb = cache_size_mb
+        self.warnings: List[str] = []
+        # Whether create_database() built the target (a failed copy then deletes it)
+        self.created = False
+
+    def create_database(self, ddl_file: str) -> None:
+        """Build the new database from a DDL file (it must not exist yet)"""
+        if os.path.exists(self.new_db):
+            raise FileExistsError(f"Database file already exists: {self.new_db}")
+        with open(ddl_file, 'r', encoding='utf-8') as f:
+            ddl = f.read()
+        conn = sqlite3.connect(self.new_db)
+        try:
+            conn.executescript(ddl)
+        finally:
+            conn.close()
+        self.created = True
+
+    def read_schema(self, db_path: str) -> Dict[str, Table]:
+        """Tables of a database keyed by lower-case name (SQLite names are case-insensitive)"""
+        conn = connect_snapshot(db_path)
+        try:
+            tables = SQLiteToHCLConverter().get_all_tables(conn)
+        finally:
+            conn.close()
+        return {table.name.lower(): table for table in tables}
+
+    def plan(self, old_tables: Dict[str, Table], new_tables: Dict[str, Table]) -> List[Tuple[str, str, str]]:
+        """Build one (table, INSERT ... SELECT, summary) per table present in both schemas"""
+        statements = []
+        for key, new_table in sorted(new_tables.items()):
+            old_table = old_tables.get(key)
+            if old_table is None:
+                continue
+
+            old_columns = {column.name.lower(): column for column in old_table.columns}
+            targets = []
+            sources = []
+            added = []
+            for column in new_table.columns:
+                old_column = old_columns.pop(column.name.lower(), None)
+                if old_column is not None:
+                    targets.append(sql_identifier(column.name))
+                    if not column.nullable and old_column.nullable and not column.primary_key:
+                        # NOT NULL in the new schema only: old NULLs get the default (or a fallback)
+                        fill = sql_default(column.default) if column.default is not None else fallback_value(column)
+                        sources.append(f"COALESCE({sql_identifier(old_column.name)}, {fill})")
+                        self.warnings.append(f"{new_table.name}.{column.name}: now NOT NULL, "
+                                             f"NULLs filled with {fill}")
+                    else:
+                        sources.append(sql_identifier(old_column.name))
+                elif not column.nullable and column.default is None and not column.primary_key:
+                    # Leaving it out would fail the NOT NULL constraint
+                    targets.append(sql_identifier(column.name))
+                    sources.append(fallback_value(column))
+                    self.warnings.append(f"{new_table.name}.{column.name}: NOT NULL without default, "
+                                         f"filled with {fallback_value(column)}")
+                    added.append(column.name)
+                else:
+                    # Omitted from the INSERT, so the column DEFAULT (or NULL) applies
+                    added.append(column.name)
+
+            if not targets:
+                continue
+
+            sql = (f"INSERT INTO main.{sql_identifier(new_table.name)} ({', '.join(targets)}) "
+                   f"SELECT {', '.join(sources)} FROM old.{sql_identifier(old_table.name)}")
+            summary = []
+            if added:
+                summary.append(f"added {', '.join(added)}")
+            if old_columns:
+                summary.append(f"dropped {', '.join(column.name for column in old_columns.values())}")
+            statements.append((new_table.name, sql, '; '.join(summary)))
+        return statements
+
+    def copy(self) -> List[Dict[str, Any]]:
+        """Copy every table present in both databases in one transaction; returns per-table results"""
+        for path in (self.old_db, self.new_db):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Database file not found: {path}")
+
+        old_tables = self.read_schema(self.old_db)
+        new_tables = self.read_schema(self.new_db)
+        statements = self.plan(old_tables, new_tables)
+        for key in sorted(set(old_tables) - set(new_tables)):
+            self.warnings.append(f"{old_tables[key].name}: not in the new schema, rows not copied")
+
+        conn = sqlite3.connect(self.new_db, isolation_level=None, uri=True)
+        results = []
+        try:
+            if self.created:
+                # A target built by this run is a rebuild: no rollback journal, no fsync (deleted on failure)
+                conn.execute("PRAGMA journal_mode=OFF")
+                conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(f"PRAGMA cache_size=-{self.cache_size_mb * 1024}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA foreign_keys=OFF")
+            conn.execute("ATTACH DATABASE ? AS old", (snapshot_uri(self.old_db),))
+
+            conn.execute("BEGIN")
+            for table_name, sql, summary in statements:
+                start = time.perf_counter()
+                rows = conn.execute(sql).rowcount
+                results.append({
+                    'table': table_name,
+                    'rows': rows,
+                    'seconds': time.perf_counter() - start,
+                    'changes': summary,
+                })
+            self._copy_sequences(conn, [table_name for table_name, _, _ in statements])
+            conn.execute("COMMIT")
+        except Exception:
+            if self.created:
+                conn.close()
+                os.remove(self.new_db)
+                self.warnings.append(f"{self.new_db}: copy failed, partially copied database deleted")
+            elif conn.in_transaction:
+                # An existing target keeps its journal, so the rollback restores it
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return results
+
+    def _copy_sequences(self, conn: sqlite3.Connection, table_names: List[str]) -> None:
+        """Keep AUTOINCREMENT counters, which may be ahead of the copied max(rowid)"""
+        has_sequence = "SELECT 1 FROM {}.sqlite_master WHERE name = 'sqlite_sequence'"
+        if not (conn.execute(has_sequence.format('main')).fetchone() and
+                conn.execute(has_sequence.format('old')).fetchone()):
+            return
+        for table_name in table_names:
+            # The copied ids never exceed the old counter, so the old counter wins
+            conn.execute("""
+                DELETE FROM main.sqlite_sequence WHERE name = ?1 COLLATE NOCASE
+                  AND EXISTS (SELECT 1 FROM old.sqlite_sequence WHERE name = ?1 COLLATE NOCASE)
+            """, (table_name,))
+            conn.execute("""
+                INSERT INTO main.sqlite_sequence (name, seq)
+                SELECT ?1, seq FROM old.sqlite_sequence WHERE name = ?1 COLLATE NOCASE
+            """, (table_name,))
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(
+        description="Copy rows from an old SQLite database into one built from a new schema",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Columns are matched by name: added columns get their DEFAULT, dropped columns
+are skipped, tables missing from the new schema are reported. NULLs in a
+column the new schema makes NOT NULL get its DEFAULT (or 0 / '' by type).
+A target created with --ddl is deleted if the copy fails; an existing one is
+rolled back.
+
+Examples:
+  # Rebuild from the new db.sql and carry the rows across
+  %(prog)s --old db.sqlite --new db.new.sqlite --ddl db.sql
+
+  # Copy into an already created database
+  %(prog)s --old db.sqlite --new db.new.sqlite
+        """
+    )
+    parser.add_argument('--old', required=True, help='Existing database with the rows')
+    parser.add_argument('--new', required=True, help='Database with the new schema')
+    parser.add_argument('--ddl', help='Create --new from this DDL file first')
+    parser.add_argument('--cache-size', type=int, default=256, help='Page cache size in MB (default: 256)')
+
+    instrumentation.add_arguments(parser)
+
+    args = parser.parse_args()
+
+    print("🔄 SQLite Data Copy")
+    print("=" * 40)
+    print(f"From: {os.path.abspath(args.old)}")
+    print(f"To: {os.path.abspath(args.new)}")
+    print()
+
+    try:
+        copier = SQLiteDataCopier(args.old, args.new, args.cache_size)
+        with instrumentation.instrumented('data_copy', args):
+            if args.ddl:
+                with phase('create'):
+                    copier.create_database(args.ddl)
+                print(f"📋 Created {args.new} from {args.ddl}")
+            start = time.perf_counter()
+            with phase('copy'):
+                results = copier.copy()
+            elapsed = time.perf_counter() - start
+            instrumentation.count('tables', len(results))
+            instrumentation.count('rows', sum(result['rows'] for result in results))
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        for warning in copier.warnings:
+            print(f"⚠️  {warning}")
+        return 1
+
+    for result in results:
+        changes = f"  ({result['changes']})" if result['changes'] else ''
+        print(f"  {result['seconds']:7.2f}s  {result['rows']:>10} rows  {result['table']}{changes}")
+    for warning in copier.warnings:
+        print(f"⚠️  {warning}")
+
+    rows = sum(result['rows'] for result in results)
+    print()
+    print(f"✅ Copied {rows} rows in {len(results)} tables in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,26 +2,42 @@
 """
 SQLite to DDL Generator
 Based on sql_single.sh approach using SELECT sql FROM sqlite_master
-Generates single DDL file with CREATE TABLE statements (no DROP tables)
+Generates single DDL file with CREATE TABLE statements (no DROP tables),
+optionally followed by indexes, views and triggers (--all-objects)
 """
 
 import sqlite3
 import os
 import sys
+from typing import Dict, Iterator, TextIO, Tuple
+
+import instrumentation
+from instrumentation import phase
+from sqlite_snapshot import connect_snapshot
+
+
+# Schema object types in the order they must be created
+OBJECT_TYPES = ('table', 'index', 'view', 'trigger')
+OBJECT_LABELS = {'table': 'tables', 'index': 'indexes', 'view': 'views', 'trigger': 'triggers'}
 
 
 class SQLiteToDDLGenerator:
     """Simple SQLite to DDL generator based on sql_single.sh approach"""
     
-    def __init__(self, db_path: str, output_path: str):
+    def __init__(self, db_path: str, output_path: str, snapshot: bool = False, immutable: bool = False):
         self.db_path = db_path
         self.output_path = output_path
+        # Snapshot mode: read-only, mmap-backed, one read transaction (immutable for offline copies)
+        self.snapshot = snapshot or immutable
+        self.immutable = immutable
     
     def connect_to_database(self) -> sqlite3.Connection:
         """Connect to SQLite database"""
         if not os.path.exists(self.db_path):
             raise FileNotFoundError(f"Database file not found: {self.db_path}")
         
+        if self.snapshot:
+            return connect_snapshot(self.db_path, self.immutable)
         return sqlite3.connect(self.db_path)
     
     def get_user_tables(self, conn: sqlite3.Connection) -> list[str]:
@@ -42,54 +58,75 @@ class SQLiteToDDLGenerator:
         result = cursor.fetchone()
         return result[0] if result else ""
     
-    def generate_ddl_file(self) -> None:
-        """Generate single DDL file with CREATE TABLE statements only"""
+    def iter_schema_objects(self, conn: sqlite3.Connection,
+                            object_types: Tuple[str, ...] = OBJECT_TYPES) -> Iterator[Tuple[str, str, str]]:
+        """Stream (type, name, sql) for schema objects in dependency order with one query"""
+        placeholders = ', '.join('?' for _ in object_types)
+        cursor = conn.cursor()
+        # Tables and indexes by name; views and triggers in creation order
+        # (rowid) so objects referencing earlier views come after them
+        cursor.execute(f"""
+            SELECT type, name, sql FROM sqlite_master
+            WHERE type IN ({placeholders}) AND sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+            ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 WHEN 'view' THEN 2 ELSE 3 END,
+                     CASE WHEN type IN ('table', 'index') THEN name END,
+                     rowid
+        """, object_types)
+        
+        # Iterate the cursor instead of fetchall() so memory stays flat
+        for object_type, name, sql in cursor:
+            yield object_type, name, sql
+    
+    def write_ddl(self, conn: sqlite3.Connection, f: TextIO, object_types: Tuple[str, ...] = ('table',),
+                  verbose: bool = True) -> Dict[str, int]:
+        """Stream the DDL for the given object types to an open text file; returns counts per type"""
+        counts = {object_type: 0 for object_type in object_types}
+        
+        # Add header comment
+        f.write("-- SQL DDL generated from SQLite database\n")
+        f.write("-- Using SELECT sql FROM sqlite_master approach\n")
+        if object_types == ('table',):
+            f.write("-- Contains CREATE TABLE statements only (no DROP tables)\n")
+        else:
+            f.write(f"-- Contains CREATE statements for: {', '.join(object_types)} (no DROP statements)\n")
+        f.write("\n")
+        
+        separator = ""
+        with phase('introspect'):
+            for object_type, name, create_sql in self.iter_schema_objects(conn, object_types):
+                with phase('write'):
+                    f.write(f"{separator}{create_sql};\n")
+                separator = "\n"
+                counts[object_type] += 1
+                if verbose:
+                    print(f"  - {object_type} {name}")
+        
+        instrumentation.count('tables', counts.get('table', 0))
+        return counts
+    
+    def generate_ddl_file(self, object_types: Tuple[str, ...] = ('table',)) -> None:
+        """Generate single DDL file, streaming statements straight from sqlite_master"""
         # Connect to database
-        conn = self.connect_to_database()
+        with phase('introspect'):
+            conn = self.connect_to_database()
         
         try:
-            # Get all user tables
-            tables = self.get_user_tables(conn)
+            with open(self.output_path, 'w', encoding='utf-8') as f:
+                counts = self.write_ddl(conn, f, object_types)
+            instrumentation.count('bytes_out', os.path.getsize(self.output_path))
             
-            if not tables:
+            if not any(counts.values()):
                 print("No user tables found in the database")
                 return
             
-            print(f"Found {len(tables)} tables:")
-            for table in tables:
-                print(f"  - {table}")
-            
-            # Generate DDL content
-            ddl_lines = []
-            
-            # Add header comment
-            ddl_lines.append("-- SQL DDL generated from SQLite database")
-            ddl_lines.append("-- Using SELECT sql FROM sqlite_master approach")
-            ddl_lines.append("-- Contains CREATE TABLE statements only (no DROP tables)")
-            ddl_lines.append("")
-            
-            # Add CREATE TABLE statements for each table
-            for table_name in tables:
-                # Skip empty table names
-                if not table_name.strip():
-                    continue
-                
-                # Get CREATE TABLE statement
-                create_sql = self.get_create_statement(conn, table_name)
-                
-                if create_sql:
-                    ddl_lines.append(f"{create_sql};")
-                    ddl_lines.append("")
-                else:
-                    print(f"Warning: Could not get CREATE statement for table '{table_name}'")
-            
-            # Write to output file
-            with open(self.output_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(ddl_lines))
-            
+            summary = ', '.join(f"{count} {OBJECT_LABELS[object_type]}" for object_type, count in counts.items())
+            print(f"\nFound {summary}")
             print(f"\n✅ DDL file generated successfully!")
             print(f"Output file: {self.output_path}")
-            print("📋 Contents: CREATE TABLE statements only (no DROP tables)")
+            if object_types == ('table',):
+                print("📋 Contents: CREATE TABLE statements only (no DROP tables)")
+            else:
+                print("📋 Contents: tables, then indexes, views and triggers (no DROP statements)")
             
         finally:
             conn.close()
@@ -113,10 +150,23 @@ Examples:
   
   # Custom database and output file
   %(prog)s --input /path/to/database.sqlite --output /path/to/output.sql
+  
+  # Tables, indexes, views and triggers in one pass
+  %(prog)s --all-objects
+  
+  # Live database on the device, without taking write-blocking locks
+  %(prog)s --snapshot
         """
     )
     parser.add_argument('--input', '-i', help='Input SQLite database file path (default: db.sqlite)')
     parser.add_argument('--output', '-o', help='Output DDL file path (default: db.sql)')
+    parser.add_argument('--all-objects', '-a', action='store_true',
+                        help='Also export indexes, views and triggers (default: tables only)')
+    parser.add_argument('--snapshot', action='store_true',
+                        help='Read-only, mmap-backed snapshot read (safe against a live writer under WAL)')
+    parser.add_argument('--immutable', action='store_true',
+                        help='Like --snapshot, for offline copies that nothing writes to (no locking)')
+    instrumentation.add_arguments(parser)
     
     args = parser.parse_args()
     
@@ -150,8 +200,9 @@ Examples:
         return 1
     
     try:
-        generator = SQLiteToDDLGenerator(db_path, output_path)
-        generator.generate_ddl_file()
+        with instrumentation.instrumented('db_to_ddl', args):
+            generator = SQLiteToDDLGenerator(db_path, output_path, args.snapshot, args.immutable)
+            generator.generate_ddl_file(OBJECT_TYPES if args.all_objects else ('table',))
         return 0
         
     except Exception as e:
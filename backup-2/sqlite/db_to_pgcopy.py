@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+SQLite Database to PostgreSQL COPY Exporter
+Streams every table of a SQLite database into PostgreSQL COPY ... FROM stdin
+files (one per table, or per rowid range of a large table) in parallel,
+plus a load.sql that loads them in foreign key order and resets the
+GENERATED BY DEFAULT AS IDENTITY sequences
+
+Each worker reads its own read-only snapshot, so the files are only
+consistent with each other if nothing writes to the database during the
+export: stop the writers (or export an offline copy). A commit seen during
+the export fails it rather than leaving a silently mixed set of files.
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from schema_ir import Table
+from sqlite_snapshot import connect_snapshot, snapshot_uri
+import instrumentation
+from instrumentation import phase
+from sqlite_introspect import SQLiteToHCLConverter
+
+
+# Characters that must be backslash-escaped in COPY text format
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+NEEDS_ESCAPE = re.compile(r'[\\\t\n\r]')
+
+
+def copy_value(value: Any) -> str:
+    """Render a SQLite value as a COPY text field"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return value.translate(COPY_ESCAPES)
+    if isinstance(value, bytes):
+        # bytea hex input; the backslash itself is escaped in COPY text
+        return '\\\\x' + value.hex()
+    return str(value)
+
+
+def copy_boolean(value: Any) -> str:
+    """SQLite stores BOOLEAN as 0/1; PostgreSQL expects f/t"""
+    if isinstance(value, (int, float)):
+        return 't' if value else 'f'
+    return copy_value(value)
+
+
+def copy_timestamp(value: Any) -> str:
+    """TEXT timestamps pass through; numeric ones are Unix epoch seconds"""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    return copy_value(value)
+
+
+def copy_date(value: Any) -> str:
+    """TEXT dates pass through; numeric ones are Unix epoch seconds"""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc).strftime('%Y-%m-%d')
+    return copy_value(value)
+
+
+def value_converter(column_type: str) -> Callable[[Any], str]:
+    """Pick the COPY field converter for a declared SQLite column type"""
+    sql_type = column_type.upper()
+    if 'BOOL' in sql_type:
+        return copy_boolean
+    if 'TIMESTAMP' in sql_type or 'DATETIME' in sql_type:
+        return copy_timestamp
+    if sql_type == 'DATE':
+        return copy_date
+    return copy_value
+
+
+def convert_column(values: Tuple[Any, ...], convert: Callable[[Any], str]) -> Sequence[str]:
+    """Convert one column of a fetched batch; all-text columns are checked with a single scan"""
+    try:
+        joined = '\0'.join(values)
+    except TypeError:
+        # Not all text (numbers, NULLs, blobs): convert value by value
+        return [convert(value) for value in values]
+    if NEEDS_ESCAPE.search(joined) is None:
+        return values
+    return [value.translate(COPY_ESCAPES) for value in values]
+
+
+def quote_identifier(name: str) -> str:
+    """Double-quote a PostgreSQL identifier"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_literal(text: str) -> str:
+    """Single-quote a PostgreSQL string literal"""
+    return "'" + text.replace("'", "''") + "'"
+
+
+def export_part(db_path: str, table_name: str, columns: List[Tuple[str, str]], target: str,
+                rowid_range: Optional[Tuple[int, int]], output_path: str, batch_size: int) -> Dict[str, Any]:
+    """Write one table (or one rowid range of it) as a COPY file; runs inside a worker process"""
+    start = time.perf_counter()
+    result: Dict[str, Any] = {'table': table_name, 'path': output_path, 'rows': 0}
+
+    column_list = ', '.join(quote_identifier(name) for name, _ in columns)
+    select = f"SELECT {column_list} FROM {quote_identifier(table_name)}"
+    params: Tuple[int, ...] = ()
+    if rowid_range is not None:
+        select += " WHERE rowid BETWEEN ? AND ?"
+        params = rowid_range
+    converters = [value_converter(column_type) for _, column_type in columns]
+
+    conn = connect_snapshot(db_path)
+    try:
+        cursor = conn.execute(select, params)
+        with open(output_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(f"COPY {target} ({column_list}) FROM stdin;\n")
+            rows = 0
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                # Column-wise conversion keeps the per-value Python work to non-text columns
+                converted = [convert_column(values, convert) for values, convert in zip(zip(*batch), converters)]
+                f.write('\n'.join(map('\t'.join, zip(*converted))))
+                f.write('\n')
+                rows += len(batch)
+            f.write("\\.\n")
+        result['rows'] = rows
+    finally:
+        conn.close()
+
+    result['bytes'] = os.path.getsize(output_path)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+class SQLiteToPGCopyExporter:
+    """Exports SQLite table data as PostgreSQL COPY files"""
+
+    def __init__(self, db_path: str, output_dir: str, pg_schema: str = "public", workers: int = 0,
+                 batch_size: int = 10000, part_rows: int = 1000000):
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self.pg_schema = pg_schema
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.part_rows = part_rows
+
+    def connect_to_database(self) -> sqlite3.Connection:
+        """Connect to SQLite database"""
+        return connect_snapshot(self.db_path)
+
+    def target_name(self, table_name: str) -> str:
+        """Schema-qualified PostgreSQL table name, e.g. public."log" """
+        return f'{self.pg_schema}.{quote_identifier(table_name)}'
+
+    def load_order(self, tables: List[Table]) -> List[Table]:
+        """Referenced tables before the tables that reference them (name order otherwise)"""
+        by_name = {table.name: table for table in tables}
+        ordered: List[Table] = []
+        state: Dict[str, int] = {}
+
+        def visit(table: Table) -> None:
+            # 1 = in progress (a cycle is simply broken), 2 = done
+            if state.get(table.name):
+                return
+            state[table.name] = 1
+            for foreign_key in table.foreign_keys:
+                referenced = by_name.get(foreign_key.ref_table)
+                if referenced is not None and referenced is not table:
+                    visit(referenced)
+            state[table.name] = 2
+            ordered.append(table)
+
+        for table in sorted(tables, key=lambda t: t.name):
+            visit(table)
+        return ordered
+
+    def rowid_ranges(self, conn: sqlite3.Connection, table_name: str) -> List[Optional[Tuple[int, int]]]:
+        """Split a table into rowid ranges of about part_rows rows (one unbounded part if it has no rowid)"""
+        try:
+            low, high = conn.execute(f"SELECT min(rowid), max(rowid) FROM {quote_identifier(table_name)}").fetchone()
+        except sqlite3.OperationalError:
+            # WITHOUT ROWID table
+            return [None]
+        if low is None or high - low < self.part_rows:
+            return [None]
+        return [(start, min(start + self.part_rows - 1, high)) for start in range(low, high + 1, self.part_rows)]
+
+    def identity_columns(self, table: Table) -> List[str]:
+        """INTEGER PRIMARY KEY (rowid alias) columns, created as identity columns in PostgreSQL"""
+        if len(table.primary_keys) != 1:
+            return []
+        for column in table.columns:
+            if column.name == table.primary_keys[0] and column.type.upper() == 'INTEGER':
+                return [column.name]
+        return []
+
+    def generate_sequence_reset(self, tables: List[Table]) -> str:
+        """SQL that moves every identity sequence past the imported ids"""
+        lines = ["-- Reset identity sequences after the COPY import"]
+        for table in tables:
+            target = self.target_name(table.name)
+            for column in self.identity_columns(table):
+                # The table argument is parsed as a (quoted) name; the column argument is taken
+                # literally, so it is the plain column name, only escaped as a string literal
+                lines.append(
+                    f"SELECT setval(pg_get_serial_sequence({quote_literal(target)}, {quote_literal(column)}), "
+                    f"COALESCE((SELECT MAX({quote_identifier(column)}) FROM {target}), 0) + 1, false);"
+                )
+        return '\n'.join(lines) + '\n'
+
+    def export(self, table_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Export all (or the named) tables in parallel; returns per-file results in load order"""
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # Outside any read transaction: its data_version changes with every commit of another connection
+        watch = sqlite3.connect(snapshot_uri(self.db_path), uri=True)
+        data_version = watch.execute("PRAGMA data_version").fetchone()[0]
+        try:
+            conn = self.connect_to_database()
+            try:
+                tables = SQLiteToHCLConverter().get_all_tables(conn)
+                if table_names:
+                    missing = set(table_names) - {table.name for table in tables}
+                    if missing:
+                        raise ValueError(f"Tables not found: {', '.join(sorted(missing))}")
+                    tables = [table for table in tables if table.name in table_names]
+                tables = self.load_order(tables)
+
+                # One task per table, or per rowid range of a large table
+                tasks = []
+                for table in tables:
+                    columns = [(column.name, column.type) for column in table.columns]
+                    safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', table.name)
+                    ranges = self.rowid_ranges(conn, table.name)
+                    for part, rowid_range in enumerate(ranges):
+                        file_name = f"{safe_name}.sql" if len(ranges) == 1 else f"{safe_name}.{part:04d}.sql"
+                        tasks.append((self.db_path, table.name, columns, self.target_name(table.name),
+                                      rowid_range, os.path.join(self.output_dir, file_name), self.batch_size))
+            finally:
+                conn.close()
+
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(export_part, *task) for task in tasks]
+                results = [future.result() for future in futures]
+            # The workers read separate snapshots, which only agree if nothing was committed meanwhile
+            if watch.execute("PRAGMA data_version").fetchone()[0] != data_version:
+                raise RuntimeError(f"{self.db_path} was written to during the export, so the COPY files may "
+                                   f"not match each other; stop the writers or export an offline copy")
+        finally:
+            watch.close()
+
+        with open(os.path.join(self.output_dir, 'reset_sequences.sql'), 'w', encoding='utf-8') as f:
+            f.write(self.generate_sequence_reset(tables))
+
+        with open(os.path.join(self.output_dir, 'load.sql'), 'w', encoding='utf-8') as f:
+            f.write("\\set ON_ERROR_STOP on\n")
+            for result in results:
+                f.write(f"\\ir {os.path.basename(result['path'])}\n")
+            f.write("\\ir reset_sequences.sql\n")
+
+        return results
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(
+        description="Export SQLite table data as PostgreSQL COPY files",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Load the schema first (see the readme), then the data:
+  PGPASSWORD='123456' psql -U postgres -h 192.168.64.7 -d raspberrypi -f postgresql.sql
+  cd pgcopy && PGPASSWORD='123456' psql -U postgres -h 192.168.64.7 -d raspberrypi -f load.sql
+
+The database must not be written to during the export (every worker reads
+its own snapshot); an export that sees a commit fails.
+
+Examples:
+  # All tables of db.sqlite into ./pgcopy
+  %(prog)s
+
+  # Only the log table, 8 workers, 500k rows per file
+  %(prog)s --table log --workers 8 --part-rows 500000
+        """
+    )
+    parser.add_argument('--database', '-d', help='SQLite database file path (default: db.sqlite)')
+    parser.add_argument('--output', '-o', help='Output directory (default: pgcopy)')
+    parser.add_argument('--schema', '-s', default='public', help='Target PostgreSQL schema (default: public)')
+    parser.add_argument('--table', '-t', action='append', help='Export only this table (repeatable)')
+    parser.add_argument('--workers', '-w', type=int, default=0, help='Worker processes (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Rows per fetchmany (default: 10000)')
+    parser.add_argument('--part-rows', type=int, default=1000000,
+                        help='Split larger tables into files of this many rowids (default: 1000000)')
+
+    instrumentation.add_arguments(parser)
+
+    args = parser.parse_args()
+
+    # Get the directory where this script is located
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    db_path = args.database or os.path.join(script_dir, "db.sqlite")
+    output_dir = args.output or os.path.join(script_dir, "pgcopy")
+
+    print("🔄 SQLite to PostgreSQL COPY Export")
+    print("=" * 40)
+    print(f"Database: {os.path.abspath(db_path)}")
+    print(f"Output: {os.path.abspath(output_dir)}")
+    print()
+
+    try:
+        exporter = SQLiteToPGCopyExporter(db_path, output_dir, args.schema, args.workers,
+                                          args.batch_size, args.part_rows)
+        with instrumentation.instrumented('db_to_pgcopy', args):
+            start = time.perf_counter()
+            with phase('export'):
+                results = exporter.export(args.table)
+            elapsed = time.perf_counter() - start
+            instrumentation.count('files', len(results))
+            instrumentation.count('rows', sum(result['rows'] for result in results))
+            instrumentation.count('bytes_out', sum(result['bytes'] for result in results))
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    for result in results:
+        print(f"  {result['seconds']:7.2f}s  {result['rows']:>10} rows  {os.path.basename(result['path'])}")
+
+    rows = sum(result['rows'] for result in results)
+    size = sum(result['bytes'] for result in results) / (1024 * 1024)
+    print()
+    print(f"✅ Exported {rows} rows ({size:.1f} MB) in {elapsed:.2f}s "
+          f"({size / elapsed if elapsed else 0:.1f} MB/s, {exporter.workers} workers)")
+    print(f"Load with: psql -f {os.path.join(output_dir, 'load.sql')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,716 @@
+#!/usr/bin/env python3
+"""
+DDL Parser
+Single-pass tokenizer and parser for SQL DDL files
+Shared by ddl_to_hcl.py and ddl_to_seaorm.py
+
+CREATE INDEX statements are attached to their table. Whole-file parsing
+sees every index; streaming only sees the ones right after their table
+(as hcl_to_ddl.py writes them) and counts the rest in unattached_indexes.
+"""
+
+import mmap
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from schema_ir import (Column, Index, Table, make_column, make_foreign_key, make_index, make_table, release_table,
+                       with_indexes)
+
+
+class Token(NamedTuple):
+    """A single lexical token: kind, value (identifiers unquoted) and source offset"""
+    kind: str
+    value: str
+    pos: int
+
+
+# One alternation per token kind, tried in order at the current offset.
+# Every branch consumes at least one character, so the scan is linear.
+TOKEN_PATTERN = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>'[^']*(?:''[^']*)*')
+  | (?P<dquoted>"[^"]*(?:""[^"]*)*")
+  | (?P<bquoted>`[^`]*(?:``[^`]*)*`)
+  | (?P<bracketed>\[[^\]]*\])
+  | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<punct>[(),;.])
+  | (?P<op>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Words that end a column type and start the column constraints
+COLUMN_CONSTRAINT_WORDS = {
+    'CONSTRAINT', 'PRIMARY', 'NOT', 'NULL', 'UNIQUE', 'CHECK', 'DEFAULT',
+    'COLLATE', 'REFERENCES', 'GENERATED', 'AS', 'AUTOINCREMENT',
+}
+
+# Words that start a table-level constraint instead of a column definition
+TABLE_CONSTRAINT_WORDS = {'CONSTRAINT', 'PRIMARY', 'UNIQUE', 'CHECK', 'FOREIGN'}
+
+# Opening quotes that lex as 'op' only when their closing quote has not been read yet
+UNTERMINATED_QUOTES = ('\'', '"', '`', '[')
+
+# Characters read per chunk when streaming a DDL file
+STREAM_CHUNK_SIZE = 1 << 20
+
+# Whitespace and comments between statements of a dump, matched on bytes
+DUMP_GAP_PATTERN = re.compile(rb"(?:\s+|--[^\n]*|/\*.*?(?:\*/|\Z))*", re.DOTALL)
+
+# One data (non-CREATE) statement of a dump up to its top-level ';' (group 1: the statement
+# without it), quoted strings and identifiers included, then the whitespace and comments
+# after it. Unrolled so that it never backtracks, even on a truncated statement.
+DUMP_DATA_PATTERN = re.compile(rb"""
+    (?![Cc][Rr][Ee][Aa][Tt][Ee]\b)
+    ([^;'"]*(?:(?:'[^']*'|"[^"]*")[^;'"]*)*);
+    (?:\s+|--[^\n]*|/\*.*?(?:\*/|\Z))*
+""", re.VERBOSE | re.DOTALL)
+
+# Bytes decoded at first for a schema statement of a dump (doubled while it does not fit)
+DUMP_WINDOW_SIZE = 1 << 16
+
+# Bytes of a dump scanned between releases of the pages already read
+DUMP_RELEASE_SIZE = 1 << 24
+
+
+def tokenize(content: str) -> Iterator[Token]:
+    """Yield tokens from DDL content in one pass, skipping whitespace and comments"""
+    match = TOKEN_PATTERN.match
+    pos = 0
+    end = len(content)
+    while pos < end:
+        m = match(content, pos)
+        kind = m.lastgroup
+        pos = m.end()
+        if kind == 'ws' or kind == 'comment':
+            continue
+        text = m.group()
+        if kind == 'dquoted':
+            yield Token('ident', text[1:-1].replace('""', '"'), m.start())
+        elif kind == 'bquoted':
+            yield Token('ident', text[1:-1].replace('``', '`'), m.start())
+        elif kind == 'bracketed':
+            yield Token('ident', text[1:-1], m.start())
+        else:
+            yield Token(kind, text, m.start())
+
+
+def _is_word(token: Token, *words: str) -> bool:
+    """Check whether a token is one of the given (case-insensitive) keywords"""
+    return token.kind == 'word' and token.value.upper() in words
+
+
+def _is_punct(token: Token, value: str) -> bool:
+    """Check whether a token is the given punctuation character"""
+    return token.kind == 'punct' and token.value == value
+
+
+def _skip_group(tokens: List[Token], i: int) -> int:
+    """Index after the parenthesised group opening at tokens[i]"""
+    depth = 0
+    while i < len(tokens):
+        if _is_punct(tokens[i], '('):
+            depth += 1
+        elif _is_punct(tokens[i], ')'):
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _column_list(tokens: List[Token], i: int) -> Tuple[List[str], int]:
+    """Names of the parenthesised column list at tokens[i] (COLLATE/ASC/DESC ignored) and the index after it"""
+    if i >= len(tokens) or not _is_punct(tokens[i], '('):
+        return [], i
+    names = []
+    end = _skip_group(tokens, i)
+    expect_name = True
+    for token in tokens[i + 1:end - 1]:
+        if _is_punct(token, ','):
+            expect_name = True
+        elif expect_name and token.kind in ('word', 'ident', 'string'):
+            names.append(token.value.strip("'") if token.kind == 'string' else token.value)
+            expect_name = False
+    return names, end
+
+
+def _render(tokens: List[Token]) -> str:
+    """Render a short token run back to SQL text (used for types and default expressions)"""
+    parts = []
+    previous = None
+    for token in tokens:
+        text = f'"{token.value}"' if token.kind == 'ident' else token.value
+        if previous is not None and text not in ('(', ')', ',', '.') and previous not in ('(', '.'):
+            parts.append(' ')
+        parts.append(text)
+        previous = text
+    return ''.join(parts)
+
+
+class DDLParser:
+    """Parser for SQL DDL files"""
+
+    def __init__(self):
+        self.tables: List[Table] = []
+        # Primary key of every table parsed so far by lower-case name (for REFERENCES without columns)
+        self.primary_keys: Dict[str, List[str]] = {}
+        # CREATE INDEX statements the last streaming parse could not attach to their table
+        self.unattached_indexes = 0
+
+    def parse_file(self, file_path: str) -> List[Table]:
+        """Parse DDL file and extract table definitions"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        return self.parse_content(content)
+
+    def parse_content(self, content: str) -> List[Table]:
+        """Parse DDL content and extract table definitions"""
+        self.tables = self._parse_statements(self.split_statements(content))
+        return self.tables
+
+    def collect_indexes(self, statements: Iterable[List[Token]]) -> Dict[str, List[Index]]:
+        """CREATE INDEX statements by lower-case table name"""
+        indexes: Dict[str, List[Index]] = {}
+        for statement in statements:
+            index = self.parse_index(statement)
+            if index is not None:
+                indexes.setdefault(index[0].lower(), []).append(index[1])
+        return indexes
+
+    def _parse_statements(self, statements: Iterable[List[Token]]) -> List[Table]:
+        """Tables of the statements, with every CREATE INDEX attached wherever it appears"""
+        tables: List[Table] = []
+        indexes: Dict[str, List[Index]] = {}
+        for statement in statements:
+            index = self.parse_index(statement)
+            if index is not None:
+                indexes.setdefault(index[0].lower(), []).append(index[1])
+                continue
+            table = self.parse_statement(statement)
+            if table:
+                tables.append(table)
+        return [with_indexes(table, indexes[table.name.lower()]) if table.name.lower() in indexes else table
+                for table in tables]
+
+    def iter_file(self, file_path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Table]:
+        """Yield tables one at a time, reading the file in chunks (memory bounded by the largest statement)"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            yield from self._stream_tables(self.stream_statements(f, chunk_size))
+
+    def _stream_tables(self, statements: Iterable[List[Token]]) -> Iterator[Table]:
+        """Yield each table once the statements right after it (its CREATE INDEX) have been read"""
+        self.unattached_indexes = 0
+        pending: Optional[Table] = None
+        for statement in statements:
+            index = self.parse_index(statement)
+            if index is not None:
+                if pending is not None and index[0].lower() == pending.name.lower():
+                    pending = with_indexes(pending, [index[1]])
+                else:
+                    self.unattached_indexes += 1
+                continue
+            table = self.parse_statement(statement)
+            if table:
+                if pending is not None:
+                    yield pending
+                    # Nothing of the table is reused, so the pools stay bounded by one table
+                    release_table(pending)
+                pending = table
+        if pending is not None:
+            yield pending
+            release_table(pending)
+
+    def parse_dump(self, file_path: str) -> List[Table]:
+        """Parse the schema of a sqlite3 .dump file, skipping its data (see dump_statements)"""
+        self.tables = self._parse_statements(self.dump_statements(file_path))
+        return self.tables
+
+    def iter_dump(self, file_path: str) -> Iterator[Table]:
+        """Yield the tables of a sqlite3 .dump file one at a time (.dump writes CREATE INDEX at the end, unattached)"""
+        yield from self._stream_tables(self.dump_statements(file_path))
+
+    def dump_statements(self, file_path: str) -> Iterator[List[Token]]:
+        """Yield the tokens of each CREATE statement of a memory-mapped dump
+
+        Every other statement (INSERT, PRAGMA, BEGIN/COMMIT, ...) is skipped on
+        the raw bytes up to its closing ';' without being decoded or copied, so
+        memory stays bounded by the largest CREATE statement, not the dump size.
+        """
+        if os.path.getsize(file_path) == 0:
+            return
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if hasattr(data, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                data.madvise(mmap.MADV_SEQUENTIAL)
+            size = len(data)
+            skip = DUMP_DATA_PATTERN.match
+            pos = DUMP_GAP_PATTERN.match(data, 0).end()
+            released = 0
+            while pos < size:
+                m = skip(data, pos)
+                if m is not None:
+                    pos = m.end()
+                elif data[pos:pos + 6].upper() == b'CREATE':
+                    statement, pos = self._dump_schema_statement(data, pos)
+                    if statement:
+                        yield statement
+                    pos = DUMP_GAP_PATTERN.match(data, pos).end()
+                else:
+                    # A data statement cut off by the end of the dump
+                    break
+                # Drop the pages behind us, so resident memory stays flat however large the dump is
+                if pos - released >= DUMP_RELEASE_SIZE and hasattr(mmap, 'MADV_DONTNEED'):
+                    boundary = pos - pos % mmap.PAGESIZE
+                    data.madvise(mmap.MADV_DONTNEED, released, boundary - released)
+                    released = boundary
+
+    def _dump_schema_statement(self, data: mmap.mmap, pos: int) -> Tuple[List[Token], int]:
+        """Tokens of the statement starting at byte offset pos, and the byte offset after it"""
+        window = DUMP_WINDOW_SIZE
+        while True:
+            end = min(pos + window, len(data))
+            chunk = data[pos:end]
+            try:
+                text = chunk.decode('utf-8')
+            except UnicodeDecodeError as e:
+                # A character cut in half by the window end; anything else is a real encoding error
+                if end == len(data) or e.start < len(chunk) - 3:
+                    raise
+                text = chunk[:e.start].decode('utf-8')
+            for statement, offset in self._split(text, end == len(data)):
+                return statement, pos + len(text[:offset].encode('utf-8'))
+            if end == len(data):
+                return [], end
+            window *= 2
+
+    def stream_statements(self, f: TextIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[Token]]:
+        """Yield the tokens of each statement read from a file object chunk by chunk"""
+        buffer = ''
+        read_size = chunk_size
+        final = False
+        while not final:
+            chunk = f.read(read_size)
+            final = not chunk
+            buffer += chunk
+
+            consumed = 0
+            for statement, end in self._split(buffer, final):
+                yield statement
+                consumed = end
+            buffer = buffer[consumed:]
+
+            # A statement longer than the buffer: read more at once instead of rescanning it per chunk
+            read_size = chunk_size if consumed else read_size * 2
+
+    def split_statements(self, content: str) -> Iterator[List[Token]]:
+        """Yield the tokens of each statement, split at top-level ';' (trigger bodies kept whole)"""
+        for statement, _ in self._split(content, True):
+            yield statement
+
+    def split_text(self, content: str) -> Iterator[str]:
+        """Yield the source text of each statement, without leading comments and the closing ';'"""
+        for statement, end in self._split(content, True):
+            yield content[statement[0].pos:end].rstrip().rstrip(';').rstrip()
+
+    def _split(self, content: str, final: bool) -> Iterator[Tuple[List[Token], int]]:
+        """Yield (statement tokens, end offset); unless final, stop before a statement cut off by the end of content"""
+        statement: List[Token] = []
+        depth = 0
+        # BEGIN/CASE ... END nesting, only tracked inside CREATE TRIGGER
+        block_depth = 0
+        in_trigger = False
+
+        for token in tokenize(content):
+            if token.kind == 'punct':
+                if token.value == '(':
+                    depth += 1
+                elif token.value == ')':
+                    depth -= 1
+                elif token.value == ';' and depth <= 0 and block_depth == 0:
+                    if statement:
+                        yield statement, token.pos + 1
+                    statement = []
+                    depth = 0
+                    in_trigger = False
+                    continue
+            elif token.kind == 'word':
+                word = token.value.upper()
+                if word == 'TRIGGER' and len(statement) < 3 and _is_word(statement[0], 'CREATE'):
+                    in_trigger = True
+                elif in_trigger and word in ('BEGIN', 'CASE'):
+                    block_depth += 1
+                elif in_trigger and word == 'END':
+                    block_depth -= 1
+            elif token.kind == 'op' and not final and token.value in UNTERMINATED_QUOTES:
+                # The rest of the buffer is inside a quote; wait for more input
+                return
+            statement.append(token)
+
+        if statement and final:
+            yield statement, len(content)
+
+    def is_create_table(self, statement: List[Token]) -> bool:
+        """Check whether a statement is CREATE [TEMP] TABLE"""
+        return (len(statement) > 2 and _is_word(statement[0], 'CREATE') and
+                (_is_word(statement[1], 'TABLE') or
+                 _is_word(statement[1], 'TEMP', 'TEMPORARY') and _is_word(statement[2], 'TABLE')))
+
+    def statement_text(self, statement: List[Token]) -> str:
+        """Normalized statement text: token kinds and values, independent of whitespace and comments"""
+        return '\x1f'.join(token.kind[0] + token.value for token in statement)
+
+    def parse_statement(self, statement: List[Token]) -> Optional[Table]:
+        """Parse one statement; returns a table for CREATE TABLE, None otherwise"""
+        if not self.is_create_table(statement):
+            return None
+        tokens = iter(statement)
+        next(tokens)
+        return self._parse_create(tokens)
+
+    def parse_index(self, statement: List[Token]) -> Optional[Tuple[str, Index]]:
+        """(table name, index) for CREATE [UNIQUE] INDEX on plain columns, None otherwise
+
+        Partial (WHERE) and expression indexes are skipped: the model holds column lists only.
+        """
+        if len(statement) < 3 or not _is_word(statement[0], 'CREATE'):
+            return None
+        i = 1
+        unique = _is_word(statement[i], 'UNIQUE')
+        if unique:
+            i += 1
+        if not _is_word(statement[i], 'INDEX'):
+            return None
+        i += 1
+
+        # Index name, optionally after IF NOT EXISTS and schema qualified, then ON table
+        names: List[str] = []
+        while i < len(statement) and not _is_word(statement[i], 'ON'):
+            token = statement[i]
+            if token.kind in ('word', 'ident') and not (_is_word(token, 'IF', 'NOT', 'EXISTS') and not names):
+                names.append(token.value)
+            i += 1
+        if not names or i + 2 >= len(statement) or statement[i + 1].kind not in ('word', 'ident'):
+            return None
+        table_name = statement[i + 1].value
+        i += 2
+        if not _is_punct(statement[i], '('):
+            return None
+
+        # Indexed columns: a name, optionally followed by COLLATE x and ASC/DESC
+        columns: List[str] = []
+        element: List[Token] = []
+        depth = 0
+        for i, token in enumerate(statement[i:], i):
+            if _is_punct(token, '('):
+                depth += 1
+                if depth == 1:
+                    continue
+            elif _is_punct(token, ')'):
+                depth -= 1
+            if depth == 0 or (depth == 1 and _is_punct(token, ',')):
+                if not element or element[0].kind not in ('word', 'ident'):
+                    return None
+                if len(element) > 1 and not (_is_word(element[1], 'COLLATE', 'ASC', 'DESC')):
+                    return None
+                columns.append(element[0].value)
+                element = []
+                if depth == 0:
+                    break
+            else:
+                element.append(token)
+        else:
+            return None
+
+        if any(_is_word(token, 'WHERE') for token in statement[i + 1:]):
+            return None
+        return table_name, make_index(names[-1], columns, unique)
+
+    def _skip_statement(self, tokens: Iterator[Token]) -> None:
+        """Consume tokens up to and including the next top-level ';'"""
+        depth = 0
+        for token in tokens:
+            if token.kind != 'punct':
+                continue
+            if token.value == '(':
+                depth += 1
+            elif token.value == ')':
+                depth -= 1
+            elif token.value == ';' and depth <= 0:
+                return
+
+    def table_name(self, statement: List[Token]) -> Optional[str]:
+        """Name of the table a CREATE TABLE statement creates, without parsing its body"""
+        if not self.is_create_table(statement):
+            return None
+        return self._read_table_name(iter(statement[2 if _is_word(statement[1], 'TABLE') else 3:]))[0]
+
+    def _read_table_name(self, tokens: Iterator[Token]) -> Tuple[Optional[str], Optional[Token]]:
+        """Table name, optionally after IF NOT EXISTS and schema qualified, and the token after it"""
+        table_name = None
+        for token in tokens:
+            if _is_word(token, 'IF', 'NOT', 'EXISTS') and table_name is None:
+                continue
+            if _is_punct(token, '.'):
+                table_name = None
+                continue
+            if token.kind in ('word', 'ident', 'string'):
+                table_name = token.value.strip("'") if token.kind == 'string' else token.value
+                continue
+            return table_name, token
+        return table_name, None
+
+    def _parse_create(self, tokens: Iterator[Token]) -> Optional[Table]:
+        """Parse a CREATE statement; returns a table for CREATE TABLE, None otherwise"""
+        token = next(tokens, None)
+        if token is not None and _is_word(token, 'TEMP', 'TEMPORARY'):
+            token = next(tokens, None)
+        if token is None or not _is_word(token, 'TABLE'):
+            if token is not None and not _is_punct(token, ';'):
+                self._skip_statement(tokens)
+            return None
+
+        table_name, token = self._read_table_name(tokens)
+        if token is None:
+            return None
+
+        # CREATE TABLE ... AS SELECT and other forms without a column list
+        if table_name is None or not _is_punct(token, '('):
+            if not _is_punct(token, ';'):
+                self._skip_statement(tokens)
+            return None
+
+        # Split the body into column/constraint definitions at top-level commas
+        definitions: List[List[Token]] = []
+        current: List[Token] = []
+        depth = 0
+        for token in tokens:
+            if token.kind == 'punct':
+                if token.value == '(':
+                    depth += 1
+                elif token.value == ')':
+                    if depth == 0:
+                        break
+                    depth -= 1
+                elif token.value == ',' and depth == 0:
+                    definitions.append(current)
+                    current = []
+                    continue
+            current.append(token)
+        if current:
+            definitions.append(current)
+
+        # Table options (WITHOUT ROWID, STRICT) up to the end of the statement
+        self._skip_statement(tokens)
+
+        return self._parse_table(table_name, definitions)
+
+    def _parse_table(self, table_name: str, definitions: List[List[Token]]) -> Optional[Table]:
+        """Parse individual table content"""
+        columns = []
+        primary_keys = []
+        unique: List[List[str]] = []
+        references: List[Tuple[List[str], str, List[str], str, str]] = []
+
+        for definition in definitions:
+            if not definition:
+                continue
+
+            # Check if it's a table constraint (PRIMARY KEY, UNIQUE, FOREIGN KEY, ...)
+            if _is_word(definition[0], *TABLE_CONSTRAINT_WORDS):
+                self._parse_table_constraint(definition, primary_keys, unique, references)
+                continue
+
+            # Parse column definition
+            column = self._parse_column(definition, unique, references)
+            if column:
+                columns.append(column)
+                if column.primary_key:
+                    primary_keys.append(column.name)
+
+        # REFERENCES without a column list means the referenced table's primary key
+        self.primary_keys[table_name.lower()] = primary_keys
+        foreign_keys = [
+            make_foreign_key(fk_columns, ref_table,
+                             ref_columns or self.primary_keys.get(ref_table.lower(), ()), on_update, on_delete)
+            for fk_columns, ref_table, ref_columns, on_update, on_delete in references
+        ]
+
+        return make_table(
+            name=table_name,
+            columns=columns,
+            primary_keys=primary_keys,
+            indexes=self._unique_indexes(table_name, unique),
+            foreign_keys=foreign_keys
+        )
+
+    def _parse_table_constraint(self, definition: List[Token], primary_keys: List[str], unique: List[List[str]],
+                                references: List[Tuple[List[str], str, List[str], str, str]]) -> None:
+        """[CONSTRAINT name] PRIMARY KEY (...) | UNIQUE (...) | FOREIGN KEY (...) REFERENCES ... | CHECK (...)"""
+        i = 2 if _is_word(definition[0], 'CONSTRAINT') else 0
+        if i >= len(definition):
+            return
+        token = definition[i]
+        if _is_word(token, 'PRIMARY'):
+            primary_keys.extend(self._parse_primary_key_constraint(definition))
+        elif _is_word(token, 'UNIQUE'):
+            columns, _ = _column_list(definition, i + 1)
+            if columns:
+                unique.append(columns)
+        elif _is_word(token, 'FOREIGN'):
+            columns, j = _column_list(definition, i + 2)
+            if columns and j < len(definition) and _is_word(definition[j], 'REFERENCES'):
+                self._parse_references(definition, j + 1, columns, references)
+
+    def _parse_references(self, definition: List[Token], i: int, columns: List[str],
+                          references: List[Tuple[List[str], str, List[str], str, str]]) -> int:
+        """REFERENCES table [(columns)] [ON DELETE|UPDATE action] [MATCH name] [[NOT] DEFERRABLE ...];
+        returns the index after it"""
+        if i >= len(definition) or definition[i].kind not in ('word', 'ident', 'string'):
+            return i
+        ref_table = definition[i].value.strip("'") if definition[i].kind == 'string' else definition[i].value
+        ref_columns, i = _column_list(definition, i + 1)
+        on_update = on_delete = 'NO ACTION'
+        while i < len(definition):
+            token = definition[i]
+            if _is_word(token, 'ON') and i + 2 < len(definition):
+                event = definition[i + 1].value.upper()
+                action = definition[i + 2].value.upper()
+                i += 3
+                if action in ('SET', 'NO') and i < len(definition):
+                    action += ' ' + definition[i].value.upper()
+                    i += 1
+                if event == 'DELETE':
+                    on_delete = action
+                elif event == 'UPDATE':
+                    on_update = action
+            elif _is_word(token, 'MATCH'):
+                i += 2
+            elif _is_word(token, 'NOT', 'DEFERRABLE', 'INITIALLY', 'DEFERRED', 'IMMEDIATE'):
+                if _is_word(token, 'NOT') and i + 1 < len(definition) and _is_word(definition[i + 1], 'NULL'):
+                    break
+                i += 1
+            else:
+                break
+        references.append((columns, ref_table, ref_columns, on_update, on_delete))
+        return i
+
+    def _unique_indexes(self, table_name: str, unique: List[List[str]]) -> List[Index]:
+        """UNIQUE constraints as unique indexes named <table>_<columns>_key, as sqlite_to_hcl.py names
+        SQLite's autoindexes for them (the CONSTRAINT name is not kept by SQLite either)"""
+        indexes = []
+        used_names = set()
+        for columns in unique:
+            base_name = f"{table_name}_{'_'.join(columns)}_key"
+            index_name = base_name
+            suffix = 1
+            while index_name in used_names:
+                suffix += 1
+                index_name = f"{base_name}{suffix}"
+            used_names.add(index_name)
+            indexes.append(make_index(index_name, columns, True, constraint=True))
+        return indexes
+
+    def _parse_primary_key_constraint(self, definition: List[Token]) -> List[str]:
+        """Extract column names from a table-level PRIMARY KEY (...) constraint"""
+        for i, token in enumerate(definition[:-1]):
+            if _is_word(token, 'PRIMARY') and _is_word(definition[i + 1], 'KEY'):
+                return _column_list(definition, i + 2)[0]
+        return []
+
+    def _parse_column(self, definition: List[Token], unique: List[List[str]],
+                      references: List[Tuple[List[str], str, List[str], str, str]]) -> Optional[Column]:
+        """Parse individual column definition; inline UNIQUE and REFERENCES go to unique and references"""
+        if not definition or definition[0].kind not in ('word', 'ident', 'string'):
+            return None
+
+        column_name = definition[0].value
+
+        # Column type: words plus an optional parenthesised size, up to the first constraint
+        i = 1
+        type_tokens = []
+        while i < len(definition):
+            token = definition[i]
+            if token.kind == 'word' and token.value.upper() not in COLUMN_CONSTRAINT_WORDS:
+                type_tokens.append(token)
+                i += 1
+            elif _is_punct(token, '(') and type_tokens:
+                depth = 0
+                while i < len(definition):
+                    token = definition[i]
+                    type_tokens.append(token)
+                    i += 1
+                    if _is_punct(token, '('):
+                        depth += 1
+                    elif _is_punct(token, ')'):
+                        depth -= 1
+                        if depth == 0:
+                            break
+            else:
+                break
+
+        # Columns without a type are valid in SQLite (BLOB affinity)
+        column_type = _render(type_tokens) if type_tokens else ''
+
+        # Parse constraints
+        nullable = True
+        primary_key = False
+        auto_increment = False
+        default = None
+
+        while i < len(definition):
+            token = definition[i]
+            i += 1
+            if _is_word(token, 'NOT') and i < len(definition) and _is_word(definition[i], 'NULL'):
+                nullable = False
+                i += 1
+            elif _is_word(token, 'PRIMARY'):
+                primary_key = True
+            elif _is_word(token, 'AUTOINCREMENT'):
+                auto_increment = True
+            elif _is_word(token, 'DEFAULT') and i < len(definition):
+                default, i = self._parse_default(definition, i)
+            elif _is_word(token, 'UNIQUE'):
+                unique.append([column_name])
+            elif _is_word(token, 'REFERENCES'):
+                i = self._parse_references(definition, i, [column_name], references)
+            elif _is_punct(token, '('):
+                # CHECK (...), GENERATED ... AS (...): nothing inside is a column constraint
+                i = _skip_group(definition, i - 1)
+
+        return make_column(
+            name=column_name,
+            type=column_type,
+            nullable=nullable,
+            primary_key=primary_key,
+            auto_increment=auto_increment,
+            default=default
+        )
+
+    def _parse_default(self, definition: List[Token], i: int) -> tuple:
+        """Parse a DEFAULT value starting at index i; returns (value, next index)"""
+        token = definition[i]
+
+        # Signed numeric literal
+        if token.kind == 'op' and token.value in '+-' and i + 1 < len(definition):
+            return token.value + definition[i + 1].value, i + 2
+
+        # Parenthesised expression: keep it verbatim
+        if _is_punct(token, '('):
+            depth = 0
+            start = i
+            while i < len(definition):
+                if _is_punct(definition[i], '('):
+                    depth += 1
+                elif _is_punct(definition[i], ')'):
+                    depth -= 1
+                    if depth == 0:
+                        break
+                i += 1
+            return _render(definition[start:i + 1]), i + 1
+
+        if token.kind == 'ident':
+            return f'"{token.value}"', i + 1
+
+        return token.value, i + 1
@@ -7,154 +7,89 @@ Converts SQL DDL files to Atlas HCL schema format
 import re
 import os
 import sys
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, Iterable, List, Any, Optional, TextIO, Tuple
 
+import ddl_parser
+import schema_ir
+from ddl_parser import DDLParser
+from schema_ir import Column, Table, default_expression, default_text, is_numeric_default, with_indexes
+from schema_cache import FragmentCache, cached_fragment, converter_version
+import instrumentation
+from instrumentation import phase
 
-@dataclass
-class DDLColumn:
-    """Represents a column from DDL"""
-    name: str
-    type: str
-    nullable: bool = True
-    primary_key: bool = False
-    auto_increment: bool = False
-    default: Optional[str] = None
 
+# HCL escapes of a string literal; ${ and %{ would otherwise start a template
+HCL_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r', '\t': '\\t', '${': '$${', '%{': '%%{'}
+_HCL_ESCAPE_PATTERN = re.compile(r'[\\"\n\r\t]|[$%]\{')
 
-@dataclass
-class DDLTable:
-    """Represents a table from DDL"""
-    name: str
-    columns: List[DDLColumn]
-    primary_keys: List[str]
+# Names usable as a traversal step (column.name); others are indexed (column["my col"])
+_HCL_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_-]*')
 
 
-class DDLParser:
-    """Parser for SQL DDL files"""
-    
-    def __init__(self):
-        self.tables: List[DDLTable] = []
-    
-    def parse_file(self, file_path: str) -> List[DDLTable]:
-        """Parse DDL file and extract table definitions"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        return self.parse_content(content)
-    
-    def parse_content(self, content: str) -> List[DDLTable]:
-        """Parse DDL content and extract table definitions"""
-        self.tables = []
-        
-        # Remove comments
-        content = re.sub(r'--.*?\n', '\n', content)
-        
-        # Find all CREATE TABLE statements
-        table_pattern = r'CREATE\s+TABLE\s+(\w+)\s*\((.*?)\);'
-        table_matches = re.finditer(table_pattern, content, re.DOTALL | re.IGNORECASE)
-        
-        for table_match in table_matches:
-            table_name = table_match.group(1)
-            table_content = table_match.group(2)
-            
-            table = self._parse_table(table_name, table_content)
-            if table:
-                self.tables.append(table)
-        
-        return self.tables
+def hcl_string(text: str) -> str:
+    """Double-quoted HCL string literal"""
+    return '"' + _HCL_ESCAPE_PATTERN.sub(lambda m: HCL_ESCAPES[m.group()], text) + '"'
+
+
+def hcl_reference(kind: str, name: str) -> str:
+    """Reference to a named schema object: column.name, or column["my col"] for other names"""
+    return f'{kind}.{name}' if _HCL_IDENTIFIER.fullmatch(name) else f'{kind}[{hcl_string(name)}]'
+
+
+def hcl_columns(names: Iterable[str]) -> str:
+    """List of column references"""
+    return '[' + ', '.join(hcl_reference('column', name) for name in names) + ']'
+
+
+def hcl_default(default: str) -> str:
+    """A stored default as an HCL expression: bool/null/number bare, computed ones as sql("..."), the rest a string"""
+    if default.upper() in ('TRUE', 'FALSE', 'NULL'):
+        return default.lower()
+    if is_numeric_default(default):
+        return default
+    expression = default_expression(default)
+    if expression is not None:
+        # Computed default (now(), CURRENT_TIMESTAMP, ...) as a raw SQL expression
+        return f'sql({hcl_string(expression)})'
+    return hcl_string(default_text(default))
+
+
+def hcl_key_blocks(table: Table) -> List[str]:
+    """primary_key, foreign_key and index blocks of a table (shared with sqlite_to_hcl)"""
+    lines = []
+    if table.primary_keys:
+        lines.append('  primary_key {')
+        lines.append(f'    columns = {hcl_columns(table.primary_keys)}')
+        lines.append('  }')
     
-    def _parse_table(self, table_name: str, table_content: str) -> Optional[DDLTable]:
-        """Parse individual table content"""
-        columns = []
-        primary_keys = []
-        
-        # Split by comma, but be careful with nested parentheses
-        lines = []
-        current_line = ""
-        paren_count = 0
-        
-        for char in table_content:
-            if char == '(':
-                paren_count += 1
-            elif char == ')':
-                paren_count -= 1
-            elif char == ',' and paren_count == 0:
-                lines.append(current_line.strip())
-                current_line = ""
-                continue
-            current_line += char
-        
-        if current_line.strip():
-            lines.append(current_line.strip())
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check if it's a PRIMARY KEY constraint
-            if line.upper().startswith('PRIMARY KEY'):
-                pk_match = re.search(r'PRIMARY\s+KEY\s*\(([^)]+)\)', line, re.IGNORECASE)
-                if pk_match:
-                    pk_columns = [col.strip() for col in pk_match.group(1).split(',')]
-                    primary_keys.extend(pk_columns)
-                continue
-            
-            # Parse column definition
-            column = self._parse_column(line)
-            if column:
-                columns.append(column)
-                if column.primary_key:
-                    primary_keys.append(column.name)
-        
-        return DDLTable(
-            name=table_name,
-            columns=columns,
-            primary_keys=primary_keys
-        )
+    # Foreign keys
+    for foreign_key in table.foreign_keys:
+        fk_name = f"{table.name}_{'_'.join(foreign_key.columns)}_fkey"
+        ref_table = hcl_reference('table', foreign_key.ref_table)
+        ref_columns = ', '.join(f"{ref_table}.{hcl_reference('column', col)}" for col in foreign_key.ref_columns)
+        lines.append(f'  foreign_key {hcl_string(fk_name)} {{')
+        lines.append(f'    columns     = {hcl_columns(foreign_key.columns)}')
+        lines.append(f'    ref_columns = [{ref_columns}]')
+        lines.append(f"    on_update   = {foreign_key.on_update.replace(' ', '_')}")
+        lines.append(f"    on_delete   = {foreign_key.on_delete.replace(' ', '_')}")
+        lines.append('  }')
     
-    def _parse_column(self, column_def: str) -> Optional[DDLColumn]:
-        """Parse individual column definition"""
-        # Remove extra whitespace and quotes
-        column_def = re.sub(r'\s+', ' ', column_def.strip())
-        column_def = column_def.replace('"', '')
-        
-        # Split column definition into parts
-        parts = column_def.split()
-        if len(parts) < 2:
-            return None
-        
-        column_name = parts[0]
-        column_type = parts[1]
-        
-        # Parse constraints
-        constraints = ' '.join(parts[2:]).upper()
-        
-        nullable = 'NOT NULL' not in constraints
-        primary_key = 'PRIMARY KEY' in constraints
-        auto_increment = 'AUTOINCREMENT' in constraints
-        
-        # Extract default value
-        default = None
-        default_match = re.search(r'DEFAULT\s+([^,\s]+)', constraints)
-        if default_match:
-            default = default_match.group(1)
-        
-        return DDLColumn(
-            name=column_name,
-            type=column_type,
-            nullable=nullable,
-            primary_key=primary_key,
-            auto_increment=auto_increment,
-            default=default
-        )
+    # Secondary indexes
+    for index in table.indexes:
+        lines.append(f'  index {hcl_string(index.name)} {{')
+        if index.unique:
+            lines.append('    unique  = true')
+        lines.append(f'    columns = {hcl_columns(index.columns)}')
+        lines.append('  }')
+    return lines
 
 
 class DDLToHCLConverter:
     """Converts DDL tables to HCL schema format"""
     
     def __init__(self):
+        # Fragment cache used by the last convert_file call (None when caching is off)
+        self.last_cache: Optional[FragmentCache] = None
         self.type_mapping = {
             'INTEGER': 'int',
             'VARCHAR': 'varchar',
@@ -174,9 +109,9 @@ class DDLToHCLConverter:
             'BLOB': 'blob'
         }
     
-    def generate_hcl_schema(self, tables: List[DDLTable], schema_name: str = "main") -> str:
+    def generate_hcl_schema(self, tables: List[Table], schema_name: str = "main") -> str:
         """Generate HCL schema from DDL tables"""
-        hcl_lines = [f'schema "{schema_name}" {{}}', '']
+        hcl_lines = [f'schema {hcl_string(schema_name)} {{}}', '']
         
         for table in tables:
             hcl_lines.extend(self._generate_table_hcl(table, schema_name))
@@ -184,10 +119,26 @@ class DDLToHCLConverter:
         
         return '\n'.join(hcl_lines)
     
-    def _generate_table_hcl(self, table: DDLTable, schema_name: str) -> List[str]:
+    def write_hcl_schema(self, tables: Iterable[Table], f: TextIO, schema_name: str = "main") -> int:
+        """Write the same HCL as generate_hcl_schema() table by table to a file object; returns the table count"""
+        f.write(f'schema {hcl_string(schema_name)} {{}}\n')
+        count = 0
+        for table in tables:
+            with phase('render'):
+                text = '\n' + '\n'.join(self._generate_table_hcl(table, schema_name)) + '\n'
+            with phase('write'):
+                f.write(text)
+            count += 1
+            instrumentation.count('columns', len(table.columns))
+        instrumentation.count('tables', count)
+        return count
+    
+    def _generate_table_hcl(self, table: Table, schema_name: str) -> List[str]:
         """Generate HCL for a single table"""
-        lines = [f'table "{table.name}" {{']
-        lines.append(f'  schema = schema.{schema_name}')
+        lines = [f'table {hcl_string(table.name)} {{']
+        lines.append(f"  schema = {hcl_reference('schema', schema_name)}")
+        if table.comment is not None:
+            lines.append(f'  comment = {hcl_string(table.comment)}')
         lines.append('')
         
         # Add columns
@@ -195,25 +146,18 @@ class DDLToHCLConverter:
             lines.extend(self._generate_column_hcl(column))
             lines.append('')
         
-        # Add primary key if there are any primary key columns
-        if table.primary_keys:
-            lines.append('  primary_key {')
-            if len(table.primary_keys) == 1:
-                lines.append(f'    columns = [column.{table.primary_keys[0]}]')
-            else:
-                pk_columns = ', '.join(f'column.{pk}' for pk in table.primary_keys)
-                lines.append(f'    columns = [{pk_columns}]')
-            lines.append('  }')
-        
+        # Primary key, foreign keys and secondary indexes
+        lines.extend(hcl_key_blocks(table))
         lines.append('}')
         return lines
     
-    def _generate_column_hcl(self, column: DDLColumn) -> List[str]:
+    def _generate_column_hcl(self, column: Column) -> List[str]:
         """Generate HCL for a single column"""
-        lines = [f'  column "{column.name}" {{']
+        lines = [f'  column {hcl_string(column.name)} {{']
         
         # Map DDL type to HCL type
-        hcl_type = self.type_mapping.get(column.type.upper(), column.type.lower())
+        # A column without a type has BLOB affinity
+        hcl_type = self.type_mapping.get(column.type.upper(), column.type.lower()) or 'blob'
         
         # Handle varchar with length
         if column.type.upper().startswith('VARCHAR'):
@@ -243,43 +187,103 @@ class DDLToHCLConverter:
         
         # Default value
         if column.default is not None:
-            if column.default.upper() in ['TRUE', 'FALSE']:
-                lines.append(f'    default = {column.default.lower()}')
-            elif column.default.isdigit() or (column.default.startswith('-') and column.default[1:].isdigit()):
-                lines.append(f'    default = {column.default}')
-            elif column.default.upper() == 'NULL':
-                lines.append('    default = null')
-            else:
-                # String default (remove quotes if present)
-                default_val = column.default.strip("'\"")
-                lines.append(f'    default = "{default_val}"')
+            lines.append(f'    default = {hcl_default(column.default)}')
+        
+        if column.comment is not None:
+            lines.append(f'    comment = {hcl_string(column.comment)}')
         
         lines.append('  }')
         return lines
     
-    def convert_file(self, ddl_file: str, output_file: str, schema_name: str = "main") -> None:
-        """Convert DDL file to HCL file"""
-        # Parse DDL file
+    def convert_file(self, ddl_file: str, output_file: str, schema_name: str = "main",
+                     cache_dir: Optional[str] = None) -> None:
+        """Convert DDL file to HCL file, reusing cached fragments for unchanged tables"""
+        cache = None
+        if cache_dir:
+            version = converter_version(sys.modules[__name__], ddl_parser, schema_ir)
+            cache = FragmentCache(cache_dir, 'ddl_to_hcl', version, ddl_file)
+        
+        # Parse DDL file statement by statement; only changed tables are parsed and rendered
         parser = DDLParser()
-        tables = parser.parse_file(ddl_file)
+        with phase('read'):
+            with open(ddl_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+        instrumentation.count('bytes_in', len(content))
+        
+        entries = []
+        with phase('parse'):
+            # CREATE INDEX may follow its table anywhere, so indexes are collected before any table is rendered
+            statements = list(parser.split_statements(content))
+            indexes = parser.collect_indexes(statements)
+            for statement in statements:
+                if not parser.is_create_table(statement):
+                    continue
+                table_indexes = indexes.get((parser.table_name(statement) or '').lower(), [])
+            
+                def render(statement=statement, table_indexes=table_indexes):
+                    table = parser.parse_statement(statement)
+                    if table is None:
+                        return None
+                    if table_indexes:
+                        table = with_indexes(table, table_indexes)
+                    with phase('render'):
+                        fragment = '\n'.join(self._generate_table_hcl(table, schema_name))
+                    return {'name': table.name, 'columns': len(table.columns), 'fragment': fragment}
+            
+                entry = cached_fragment(cache, (schema_name, parser.statement_text(statement),
+                                                repr(table_indexes)), render)
+                if entry:
+                    entries.append(entry)
         
-        if not tables:
+        if not entries:
             print("No tables found in DDL file")
             return
         
-        print(f"Found {len(tables)} tables:")
-        for table in tables:
-            print(f"  - {table.name} ({len(table.columns)} columns)")
+        print(f"Found {len(entries)} tables:")
+        for entry in entries:
+            print(f"  - {entry['name']} ({entry['columns']} columns)")
+        
+        instrumentation.count('tables', len(entries))
+        instrumentation.count('columns', sum(entry['columns'] for entry in entries))
         
-        # Generate HCL schema
-        hcl_content = self.generate_hcl_schema(tables, schema_name)
+        # Splice the HCL schema together from the per-table fragments
+        with phase('render'):
+            hcl_lines = [f'schema {hcl_string(schema_name)} {{}}', '']
+            for entry in entries:
+                hcl_lines.append(entry['fragment'])
+                hcl_lines.append('')
+            hcl_content = '\n'.join(hcl_lines)
         
         # Write to output file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(hcl_content)
+        with phase('write'):
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(hcl_content)
+        instrumentation.count('bytes_out', len(hcl_content))
+        
+        self.last_cache = cache
+        if cache:
+            cache.save()
+            print(f"\n♻️  {cache.summary()}")
         
         print(f"\nHCL schema generated successfully!")
         print(f"Output file: {output_file}")
+    
+    def convert_file_streaming(self, ddl_file: str, output_file: str, schema_name: str = "main",
+                               dump: bool = False) -> int:
+        """Convert DDL file to HCL file one table at a time without holding the schema in memory"""
+        parser = DDLParser()
+        with open(output_file, 'w', encoding='utf-8') as f, phase('parse'):
+            tables = parser.iter_dump(ddl_file) if dump else parser.iter_file(ddl_file)
+            count = self.write_hcl_schema(tables, f, schema_name)
+        instrumentation.count('bytes_out', os.path.getsize(output_file))
+        
+        print(f"Streamed {count} tables")
+        if parser.unattached_indexes:
+            print(f"Warning: {parser.unattached_indexes} CREATE INDEX statements not directly after their table "
+                  f"were skipped (convert without --stream/--dump to keep them)")
+        print(f"\nHCL schema generated successfully!")
+        print(f"Output file: {output_file}")
+        return count
 
 
 def main():
@@ -300,11 +304,20 @@ Examples:
   
   # Different schema name
   %(prog)s --schema production
+  
+  # Only re-render tables that changed since the last run
+  %(prog)s --cache-dir .schema_cache
         """
     )
     parser.add_argument('--input', '-i', help='Input SQL DDL file path (default: db.sql)')
     parser.add_argument('--output', '-o', help='Output HCL file path (default: db.hcl)')
     parser.add_argument('--schema', '-s', default='main', help='Schema name (default: main)')
+    parser.add_argument('--cache-dir', '-c', help='Reuse rendered tables from this cache directory')
+    parser.add_argument('--stream', action='store_true',
+                        help='Convert table by table with bounded memory (ignores --cache-dir)')
+    parser.add_argument('--dump', action='store_true',
+                        help='Input is a full sqlite3 .dump: memory-map it and skip the data (implies --stream)')
+    instrumentation.add_arguments(parser)
     
     args = parser.parse_args()
     
@@ -339,7 +352,11 @@ Examples:
     
     try:
         converter = DDLToHCLConverter()
-        converter.convert_file(ddl_file, output_file, args.schema)
+        with instrumentation.instrumented('ddl_to_hcl', args):
+            if args.stream or args.dump:
+                converter.convert_file_streaming(ddl_file, output_file, args.schema, dump=args.dump)
+            else:
+                converter.convert_file(ddl_file, output_file, args.schema, args.cache_dir)
         return 0
         
     except Exception as e:
@@ -4,153 +4,30 @@ DDL to Sea-ORM Migration Generator
 Converts SQL DDL files to Sea-ORM migration format
 """
 
-import re
 import os
 import sys
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, Iterable, List, Any, Optional, TextIO, Tuple
 
-
-@dataclass
-class DDLColumn:
-    """Represents a column from DDL"""
-    name: str
-    type: str
-    nullable: bool = True
-    primary_key: bool = False
-    auto_increment: bool = False
-    default: Optional[str] = None
-
-
-@dataclass
-class DDLTable:
-    """Represents a table from DDL"""
-    name: str
-    columns: List[DDLColumn]
-    primary_keys: List[str]
-
-
-class DDLParser:
-    """Parser for SQL DDL files"""
-    
-    def __init__(self):
-        self.tables: List[DDLTable] = []
-    
-    def parse_file(self, file_path: str) -> List[DDLTable]:
-        """Parse DDL file and extract table definitions"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        return self.parse_content(content)
-    
-    def parse_content(self, content: str) -> List[DDLTable]:
-        """Parse DDL content and extract table definitions"""
-        self.tables = []
-        
-        # Remove comments
-        content = re.sub(r'--.*?\n', '\n', content)
-        
-        # Find all CREATE TABLE statements
-        table_pattern = r'CREATE\s+TABLE\s+(\w+)\s*\((.*?)\);'
-        table_matches = re.finditer(table_pattern, content, re.DOTALL | re.IGNORECASE)
-        
-        for table_match in table_matches:
-            table_name = table_match.group(1)
-            table_content = table_match.group(2)
-            
-            table = self._parse_table(table_name, table_content)
-            if table:
-                self.tables.append(table)
-        
-        return self.tables
-    
-    def _parse_table(self, table_name: str, table_content: str) -> Optional[DDLTable]:
-        """Parse individual table content"""
-        columns = []
-        primary_keys = []
-        
-        # Split by comma, but be careful with nested parentheses
-        lines = []
-        current_line = ""
-        paren_count = 0
-        
-        for char in table_content:
-            if char == '(':
-                paren_count += 1
-            elif char == ')':
-                paren_count -= 1
-            elif char == ',' and paren_count == 0:
-                lines.append(current_line.strip())
-                current_line = ""
-                continue
-            current_line += char
-        
-        if current_line.strip():
-            lines.append(current_line.strip())
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check if it's a PRIMARY KEY constraint
-            if line.upper().startswith('PRIMARY KEY'):
-                pk_match = re.search(r'PRIMARY\s+KEY\s*\(([^)]+)\)', line, re.IGNORECASE)
-                if pk_match:
-                    pk_columns = [col.strip() for col in pk_match.group(1).split(',')]
-                    primary_keys.extend(pk_columns)
-                continue
-            
-            # Parse column definition
-            column = self._parse_column(line)
-            if column:
-                columns.append(column)
-                if column.primary_key:
-                    primary_keys.append(column.name)
-        
-        return DDLTable(
-            name=table_name,
-            columns=columns,
-            primary_keys=primary_keys
-        )
-    
-    def _parse_column(self, column_def: str) -> Optional[DDLColumn]:
-        """Parse individual column definition"""
-        # Split column definition into parts
-        parts = column_def.split()
-        if len(parts) < 2:
-            return None
-        
-        column_name = parts[0]
-        column_type = parts[1]
-        
-        # Parse constraints
-        constraints = ' '.join(parts[2:]).upper()
-        
-        nullable = 'NOT NULL' not in constraints
-        primary_key = 'PRIMARY KEY' in constraints
-        auto_increment = 'AUTOINCREMENT' in constraints
-        
-        # Extract default value
-        default = None
-        default_match = re.search(r'DEFAULT\s+([^,\s]+)', constraints)
-        if default_match:
-            default = default_match.group(1)
-        
-        return DDLColumn(
-            name=column_name,
-            type=column_type,
-            nullable=nullable,
-            primary_key=primary_key,
-            auto_increment=auto_increment,
-            default=default
-        )
+import ddl_parser
+import schema_ir
+from ddl_parser import DDLParser
+from schema_ir import (Column, Table, autoincrement_key, rust_identifier, sql_default, sql_identifier, sql_identifiers,
+                       with_indexes)
+from schema_cache import FragmentCache, cached_fragment, converter_version
+import instrumentation
+from instrumentation import phase
 
 
 class DDLToSeaORMGenerator:
     """Generates Sea-ORM migration code from DDL tables"""
     
-    def __init__(self):
+    def __init__(self, batched: bool = False, indexes: bool = False):
+        # batched: whole up()/down() as one multi-statement execute in a transaction of the migration's connection
+        self.batched = batched
+        # indexes: CREATE INDEX statements after all tables are created
+        self.indexes = indexes
+        # Fragment cache used by the last convert_file call (None when caching is off)
+        self.last_cache: Optional[FragmentCache] = None
         self.type_mapping = {
             'INTEGER': 'INTEGER',
             'VARCHAR': 'VARCHAR',
@@ -169,128 +46,316 @@ class DDLToSeaORMGenerator:
             'BLOB': 'BLOB'
         }
     
-    def generate_migration(self, tables: List[DDLTable], migration_name: str = "Migration") -> str:
+    def generate_migration(self, tables: List[Table], migration_name: str = "Migration") -> str:
         """Generate Sea-ORM migration code"""
-        
-        # Generate the migration structure
-        migration_code = f"""use sea_orm_migration::prelude::*;
-
+        return self._render_migration(
+            self._generate_up_migrations(tables),
+            self._generate_down_migrations(tables),
+            migration_name,
+            *self._section_comments()
+        )
+    
+    def _mode(self) -> str:
+        """Render options, as part of the fragment cache key"""
+        return f"batched={self.batched},indexes={self.indexes}"
+    
+    def _section_comments(self) -> Tuple[str, str]:
+        """up()/down() comments for the current mode"""
+        if self.batched:
+            return "Create all tables in one transaction", "Drop all tables in reverse order in one transaction"
+        return "Create all tables", "Drop all tables in reverse order"
+    
+    def _render_migration(self, up_sql: str, down_sql: str, migration_name: str,
+                          up_comment: str = "Create all tables",
+                          down_comment: str = "Drop all tables in reverse order") -> str:
+        """Wrap rendered up/down bodies in the migration structure"""
+        # The transaction API of batched bodies is not in the prelude
+        imports = "use sea_orm_migration::prelude::*;\n" + (
+            "use sea_orm_migration::sea_orm::TransactionTrait;\n" if self.batched else "")
+        migration_code = f"""{imports}
 #[derive(DeriveMigrationName)]
 pub struct {migration_name};
 
 #[async_trait::async_trait]
 impl MigrationTrait for {migration_name} {{
     async fn up(&self, manager: &SchemaManager) -> Result<(), DbErr> {{
-        // Create all tables
-{self._generate_up_migrations(tables)}
+        // {up_comment}
+{up_sql}
         Ok(())
     }}
 
     async fn down(&self, manager: &SchemaManager) -> Result<(), DbErr> {{
-        // Drop all tables in reverse order
-{self._generate_down_migrations(tables)}
+        // {down_comment}
+{down_sql}
         Ok(())
     }}
 }}"""
         
         return migration_code
     
-    def _generate_up_migrations(self, tables: List[DDLTable]) -> str:
+    def write_migration(self, tables: Iterable[Table], f: TextIO, migration_name: str = "Migration") -> int:
+        """Write the same code as generate_migration() table by table to a file object; returns the table count"""
+        up_marker, down_marker = '\0up\0', '\0down\0'
+        prefix, rest = self._render_migration(
+            up_marker, down_marker, migration_name, *self._section_comments()
+        ).split(up_marker)
+        middle, suffix = rest.split(down_marker)
+        
+        # Only the small DROP and CREATE INDEX statements are kept, for the end of up() and for down()
+        downs = []
+        index_statements = []
+        f.write(prefix + self._body_head())
+        for table in tables:
+            with phase('render'):
+                up = ('\n' if downs else '') + self._table_up_fragment(table)
+                downs.append(self._table_down_fragment(table))
+                index_statements.extend(self._generate_index_statements(table))
+            with phase('write'):
+                f.write(up)
+            instrumentation.count('columns', len(table.columns))
+        with phase('write'):
+            f.write(self._up_tail(index_statements))
+            f.write(middle)
+            f.write(self._body_head() + '\n'.join(reversed(downs)) + self._down_tail())
+            f.write(suffix)
+        instrumentation.count('tables', len(downs))
+        return len(downs)
+    
+    def _generate_up_migrations(self, tables: List[Table]) -> str:
         """Generate UP migration SQL for all tables"""
-        migrations = []
+        index_statements = [statement for table in tables for statement in self._generate_index_statements(table)]
+        return (self._body_head() +
+                '\n'.join(self._table_up_fragment(table) for table in tables) +
+                self._up_tail(index_statements))
+    
+    def _table_up_fragment(self, table: Table) -> str:
+        """A table's part of the up() body: its own execute, or its CREATE TABLE inside the batch"""
+        return self._generate_create_table(table) if self.batched else self._generate_table_up(table)
+    
+    def _table_down_fragment(self, table: Table) -> str:
+        """A table's part of the down() body: its own execute, or its DROP TABLE inside the batch"""
+        return f'            DROP TABLE IF EXISTS {sql_identifier(table.name)};' if self.batched else self._generate_table_down(table)
+    
+    def _body_head(self) -> str:
+        """Opening of a batched body: a transaction (nested as a savepoint if the migrator runs in one) and the SQL"""
+        return '        let txn = manager.get_connection().begin().await?;\n        let sql = r#"\n' if self.batched else ''
+    
+    def _up_tail(self, index_statements: List[str]) -> str:
+        """Index creation after all tables, and the end of a batched body"""
+        index_lines = [f'            {statement}' for statement in index_statements]
+        if self.batched:
+            return self._batch_end(index_lines)
+        if not index_lines:
+            return ''
+        return '\n'.join([
+            '',
+            '        let sql_indexes = r#"',
+            *index_lines,
+            '        "#;',
+            '        manager.get_connection().execute_unprepared(sql_indexes).await?;',
+            '',
+        ])
+    
+    def _down_tail(self) -> str:
+        """End of a batched down() body"""
+        return self._batch_end([]) if self.batched else ''
+    
+    def _batch_end(self, lines: List[str]) -> str:
+        """The single execute of a batched body and its commit (an error drops txn, which rolls it back)"""
+        return '\n'.join([
+            '',
+            *lines,
+            '        "#;',
+            '        txn.execute_unprepared(sql).await?;',
+            '        txn.commit().await?;',
+            '',
+        ])
+    
+    def _generate_index_statements(self, table: Table) -> List[str]:
+        """CREATE INDEX statements of a table (only when index output is enabled)"""
+        if not self.indexes:
+            return []
+        return [
+            f"CREATE {'UNIQUE ' if index.unique else ''}INDEX {sql_identifier(index.name)} "
+            f"ON {sql_identifier(table.name)} ({sql_identifiers(index.columns)});"
+            for index in table.indexes
+        ]
+    
+    def _generate_table_up(self, table: Table) -> str:
+        """Generate UP migration SQL for a single table"""
+        binding = f'sql_{rust_identifier(table.name)}'
+        sql_lines = [f'        let {binding} = r#"']
+        sql_lines.append(self._generate_create_table(table))
+        sql_lines.append('        "#;')
+        sql_lines.append(f'        manager.get_connection().execute_unprepared({binding}).await?;')
+        sql_lines.append('')
+        
+        return '\n'.join(sql_lines)
+    
+    def _generate_create_table(self, table: Table) -> str:
+        """CREATE TABLE statement of a single table, indented for the raw string"""
+        sql_lines = [f'            CREATE TABLE {sql_identifier(table.name)} (']
         
-        for table in tables:
-            sql_lines = [f'        let sql_{table.name} = r#"']
-            sql_lines.append(f'            CREATE TABLE {table.name} (')
-            
-            # Generate column definitions
-            column_defs = []
-            for column in table.columns:
-                col_def = self._generate_column_definition(column)
-                column_defs.append(f'                {col_def}')
-            
-            sql_lines.append(',\n'.join(column_defs))
-            sql_lines.append('            );')
-            sql_lines.append('        "#;')
-            sql_lines.append(f'        manager.get_connection().execute_unprepared(sql_{table.name}).await?;')
-            sql_lines.append('')
-            
-            migrations.extend(sql_lines)
+        # Generate column definitions
+        column_defs = []
+        for column in table.columns:
+            col_def = self._generate_column_definition(column, len(table.primary_keys) == 1,
+                                                       autoincrement_key(column, table.primary_keys))
+            column_defs.append(f'                {col_def}')
         
-        return '\n'.join(migrations)
+        # Composite primary key as a table constraint
+        if len(table.primary_keys) > 1:
+            column_defs.append(f"                PRIMARY KEY ({sql_identifiers(table.primary_keys)})")
+        
+        sql_lines.append(',\n'.join(column_defs))
+        sql_lines.append('            );')
+        
+        return '\n'.join(sql_lines)
     
-    def _generate_down_migrations(self, tables: List[DDLTable]) -> str:
+    def _generate_down_migrations(self, tables: List[Table]) -> str:
         """Generate DOWN migration SQL for all tables"""
-        migrations = []
-        
         # Drop tables in reverse order to handle dependencies
-        for table in reversed(tables):
-            migrations.append(f'        manager.get_connection().execute_unprepared("DROP TABLE IF EXISTS {table.name};").await?;')
-        
-        return '\n'.join(migrations)
+        return (self._body_head() +
+                '\n'.join(self._table_down_fragment(table) for table in reversed(tables)) +
+                self._down_tail())
     
-    def _generate_column_definition(self, column: DDLColumn) -> str:
+    def _generate_table_down(self, table: Table) -> str:
+        """Generate DOWN migration SQL for a single table"""
+        # A plain (not raw) Rust string literal: quoted names need their quotes escaped
+        statement = f"DROP TABLE IF EXISTS {sql_identifier(table.name)};".replace('\\', '\\\\').replace('"', '\\"')
+        return f'        manager.get_connection().execute_unprepared("{statement}").await?;'
+    
+    def _generate_column_definition(self, column: Column, inline_primary_key: bool = True,
+                                    autoincrement: bool = False) -> str:
         """Generate SQL column definition"""
         # Map DDL type to SQL type
         sql_type = self.type_mapping.get(column.type.upper(), column.type.upper())
         
+        # SQLite only auto-increments an INTEGER key (BIGINT identity/serial keys included)
+        if autoincrement:
+            sql_type = 'INTEGER'
         # Handle varchar with length
-        if column.type.upper().startswith('VARCHAR'):
+        elif column.type.upper().startswith('VARCHAR'):
             if '(' in column.type:
                 # Keep the length specification
                 sql_type = column.type.upper()
             else:
                 sql_type = 'VARCHAR'
         
-        definition = f'{column.name} {sql_type}'
+        # A column without a type (BLOB affinity) is written as its bare name
+        definition = f'{sql_identifier(column.name)} {sql_type}' if sql_type else sql_identifier(column.name)
         
         # Add constraints
-        if column.primary_key:
+        if column.primary_key and inline_primary_key:
             definition += ' PRIMARY KEY'
         
-        if column.auto_increment:
+        if autoincrement:
             definition += ' AUTOINCREMENT'
         
         if not column.nullable:
             definition += ' NOT NULL'
         
         if column.default is not None:
-            if column.default.upper() in ['TRUE', 'FALSE']:
-                definition += f' DEFAULT {column.default.upper()}'
-            elif column.default.isdigit() or (column.default.startswith('-') and column.default[1:].isdigit()):
-                definition += f' DEFAULT {column.default}'
-            elif column.default.upper() == 'NULL':
-                definition += ' DEFAULT NULL'
-            else:
-                # String default
-                default_val = column.default.strip("'\"")
-                definition += f" DEFAULT '{default_val}'"
+            # Literals bare, expressions parenthesised, strings quoted
+            definition += f' DEFAULT {sql_default(column.default)}'
         
         return definition
     
-    def convert_file(self, ddl_file: str, output_file: str) -> None:
-        """Convert DDL file to Sea-ORM migration file"""
-        # Parse DDL file
+    def convert_file(self, ddl_file: str, output_file: str, cache_dir: Optional[str] = None) -> None:
+        """Convert DDL file to Sea-ORM migration file, reusing cached fragments for unchanged tables"""
+        cache = None
+        if cache_dir:
+            version = converter_version(sys.modules[__name__], ddl_parser, schema_ir)
+            cache = FragmentCache(cache_dir, 'ddl_to_seaorm', version, ddl_file)
+        
+        # Parse DDL file statement by statement; only changed tables are parsed and rendered
         parser = DDLParser()
-        tables = parser.parse_file(ddl_file)
+        with phase('read'):
+            with open(ddl_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+        instrumentation.count('bytes_in', len(content))
+        
+        entries = []
+        with phase('parse'):
+            # CREATE INDEX may follow its table anywhere, so indexes are collected before any table is rendered
+            statements = list(parser.split_statements(content))
+            indexes = parser.collect_indexes(statements)
+            for statement in statements:
+                if not parser.is_create_table(statement):
+                    continue
+                table_indexes = indexes.get((parser.table_name(statement) or '').lower(), [])
+            
+                def render(statement=statement, table_indexes=table_indexes):
+                    table = parser.parse_statement(statement)
+                    if table is None:
+                        return None
+                    if table_indexes:
+                        table = with_indexes(table, table_indexes)
+                    with phase('render'):
+                        return {
+                            'name': table.name,
+                            'columns': len(table.columns),
+                            'up': self._table_up_fragment(table),
+                            'down': self._table_down_fragment(table),
+                            'indexes': self._generate_index_statements(table),
+                        }
+            
+                entry = cached_fragment(cache, (self._mode(), parser.statement_text(statement),
+                                                repr(table_indexes)), render)
+                if entry:
+                    entries.append(entry)
         
-        if not tables:
+        if not entries:
             print("No tables found in DDL file")
             return
         
-        print(f"Found {len(tables)} tables:")
-        for table in tables:
-            print(f"  - {table.name} ({len(table.columns)} columns)")
+        print(f"Found {len(entries)} tables:")
+        for entry in entries:
+            print(f"  - {entry['name']} ({entry['columns']} columns)")
+        
+        instrumentation.count('tables', len(entries))
+        instrumentation.count('columns', sum(entry['columns'] for entry in entries))
         
-        # Generate Sea-ORM migration
-        migration_code = self.generate_migration(tables, "Migration")
+        # Splice the Sea-ORM migration together from the per-table fragments
+        with phase('render'):
+            migration_code = self._render_migration(
+                self._body_head() +
+                '\n'.join(entry['up'] for entry in entries) +
+                self._up_tail([statement for entry in entries for statement in entry['indexes']]),
+                self._body_head() + '\n'.join(entry['down'] for entry in reversed(entries)) + self._down_tail(),
+                "Migration",
+                *self._section_comments()
+            )
         
         # Write to output file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(migration_code)
+        with phase('write'):
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(migration_code)
+        instrumentation.count('bytes_out', len(migration_code))
         
+        self.last_cache = cache
+        if cache:
+            cache.save()
+            print(f"\n♻️  {cache.summary()}")
+        
+        print(f"\nSea-ORM migration generated successfully!")
+        print(f"Output file: {output_file}")
+    
+    def convert_file_streaming(self, ddl_file: str, output_file: str, dump: bool = False) -> int:
+        """Convert DDL file to Sea-ORM migration file one table at a time without holding the schema in memory"""
+        parser = DDLParser()
+        with open(output_file, 'w', encoding='utf-8') as f, phase('parse'):
+            tables = parser.iter_dump(ddl_file) if dump else parser.iter_file(ddl_file)
+            count = self.write_migration(tables, f)
+        instrumentation.count('bytes_out', os.path.getsize(output_file))
+        
+        print(f"Streamed {count} tables")
+        if self.indexes and parser.unattached_indexes:
+            print(f"Warning: {parser.unattached_indexes} CREATE INDEX statements not directly after their table "
+                  f"were skipped (convert without --stream/--dump to keep them)")
         print(f"\nSea-ORM migration generated successfully!")
         print(f"Output file: {output_file}")
+        return count
 
 
 def main():
@@ -301,6 +366,16 @@ def main():
     parser = argparse.ArgumentParser(description="Convert SQL DDL to Sea-ORM migration format")
     parser.add_argument('--input', '-i', help='Input SQL DDL file path')
     parser.add_argument('--output', '-o', help='Output Sea-ORM migration file path')
+    parser.add_argument('--cache-dir', '-c', help='Reuse rendered tables from this cache directory')
+    parser.add_argument('--stream', action='store_true',
+                        help='Convert table by table with bounded memory (ignores --cache-dir)')
+    parser.add_argument('--dump', action='store_true',
+                        help='Input is a full sqlite3 .dump: memory-map it and skip the data (implies --stream)')
+    parser.add_argument('--batched', action='store_true',
+                        help='Run up()/down() as one multi-statement execute in a single transaction')
+    parser.add_argument('--indexes', action='store_true',
+                        help='Create indexes after all tables')
+    instrumentation.add_arguments(parser)
     
     args = parser.parse_args()
     
@@ -327,8 +402,12 @@ def main():
         return 1
     
     try:
-        generator = DDLToSeaORMGenerator()
-        generator.convert_file(ddl_file, output_file)
+        generator = DDLToSeaORMGenerator(args.batched, args.indexes)
+        with instrumentation.instrumented('ddl_to_seaorm', args):
+            if args.stream or args.dump:
+                generator.convert_file_streaming(ddl_file, output_file, dump=args.dump)
+            else:
+                generator.convert_file(ddl_file, output_file, args.cache_dir)
         return 0
         
     except Exception as e:
@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""
+SQLite Dump Loader
+Reloads the rows of a sqlite3 .dump into a database built from a (possibly
+newer) schema such as db.sql. The dump is memory-mapped and scanned on bytes;
+the VALUES of its INSERTs are grouped per table (single-row INSERTs in the
+.dump format are read in bulk by the csv module, others value by value) and
+bound to one prepared INSERT per table, executed with executemany() in
+batches inside large transactions, with journaling and fsync off. Indexes and triggers of
+the target are dropped for the load and recreated at the end, as the dump
+itself would. Columns can be remapped by name to a newer schema version.
+
+Transactions are committed along the way and cannot be rolled back without a
+journal, so a failed load leaves rows behind: a target built by
+create_database() is deleted, an existing one gets its indexes and triggers
+back but keeps the rows committed so far.
+"""
+
+import binascii
+import csv
+import mmap
+import os
+import re
+import sqlite3
+import sys
+import time
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from schema_ir import Column, Table, sql_identifier
+from ddl_parser import DDLParser, DUMP_DATA_PATTERN, DUMP_GAP_PATTERN, DUMP_RELEASE_SIZE
+from data_copy import fallback_value
+from sqlite_snapshot import connect_snapshot
+import instrumentation
+from instrumentation import phase
+from sqlite_introspect import SQLiteToHCLConverter
+
+
+# INSERT [OR ...] INTO <table> [(<columns>)] VALUES, up to the first row
+_INSERT = (rb"""(?i:INSERT(?:\s+OR\s+[A-Za-z]+)?\s+INTO)\s+"""
+           rb"""("(?:[^"]|"")+"|\[[^\]]+\]|`[^`]+`|[A-Za-z_][A-Za-z0-9_$]*)\s*"""
+           rb"""(?:\(([^)]*)\)\s*)?(?i:VALUES)\s*""")
+INSERT_PATTERN = re.compile(_INSERT)
+
+# One literal value of a VALUES list: 'text', X'blob', NULL or a number
+_VALUE = rb"""(?:'[^']*(?:''[^']*)*'|[Xx]'[0-9A-Fa-f]*'|(?i:NULL)|[-+]?(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][-+]?[0-9]+)?)"""
+_ROW = rb"\(\s*" + _VALUE + rb"(?:\s*,\s*" + _VALUE + rb")*\s*\)"
+
+# The rows of an INSERT when every value is a literal (else SQLite evaluates them)
+ROWS_PATTERN = re.compile(rb"\s*" + _ROW + rb"(?:\s*,\s*" + _ROW + rb")*\s*")
+
+# A whole single-row INSERT as sqlite3 .dump writes it (no blanks, no blobs, no line breaks
+# in strings; group 3: the row), then the gap after it. Such rows are queued as raw text and
+# read by the csv module ('-quoted, '' escaped) in C instead of value by value.
+_PLAIN_VALUE = rb"""(?:'[^'\n]*(?:''[^'\n]*)*'|(?i:NULL)|[-+]?(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][-+]?[0-9]+)?)"""
+PLAIN_INSERT_PATTERN = re.compile(_INSERT + rb"(\(" + _PLAIN_VALUE + rb"(?:," + _PLAIN_VALUE + rb")*\));"
+                                  + DUMP_GAP_PATTERN.pattern, re.DOTALL)
+
+# Each value of validated rows, followed by ',' or the ')' that ends its row
+VALUE_PATTERN = re.compile(rb"""
+    [\s,(]*
+    (?:('[^']*(?:''[^']*)*')|[Xx]('[0-9A-Fa-f]*')|(?i:NULL)|([-+]?(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][-+]?[0-9]+)?))
+    \s*([,)])
+""", re.VERBOSE)
+
+# Escapes of unistr(), which newer sqlite3 shells write for control characters in strings
+UNISTR_ESCAPE = re.compile(r"\\(?:(\\)|([0-9A-Fa-f]{4})|u([0-9A-Fa-f]{4})|\+([0-9A-Fa-f]{6})|U([0-9A-Fa-f]{8}))")
+
+# Statements of a dump that the loader replaces with its own transaction handling
+SKIPPED_STATEMENTS = (b'BEGIN', b'COMMIT', b'END', b'ROLLBACK', b'PRAGMA', b'SAVEPOINT', b'RELEASE')
+
+
+def unquote_identifier(name: str) -> str:
+    """Identifier text without its SQL quotes"""
+    if name[:1] == '"':
+        return name[1:-1].replace('""', '"')
+    if name[:1] in ('[', '`'):
+        return name[1:-1]
+    return name
+
+
+def unistr(text: Optional[str]) -> Optional[str]:
+    """SQLite's unistr(), for SQLite versions that predate it"""
+    if text is None:
+        return None
+    return UNISTR_ESCAPE.sub(lambda m: m.group(1) or chr(int(next(g for g in m.groups()[1:] if g), 16)), text)
+
+
+def column_affinity(sql_type: str) -> str:
+    """SQLite type affinity of a declared column type"""
+    sql_type = sql_type.upper()
+    if 'INT' in sql_type:
+        return 'INTEGER'
+    if any(word in sql_type for word in ('CHAR', 'CLOB', 'TEXT')):
+        return 'TEXT'
+    if 'BLOB' in sql_type or not sql_type:
+        return 'BLOB'
+    if any(word in sql_type for word in ('REAL', 'FLOA', 'DOUB')):
+        return 'REAL'
+    return 'NUMERIC'
+
+
+def literal_rows(data: Any, start: int, end: int) -> List[tuple]:
+    """Python rows of a validated VALUES list between byte offsets start and end"""
+    rows = []
+    row: List[Any] = []
+    for text, blob, number, separator in VALUE_PATTERN.findall(data, start, end):
+        if text:
+            value = text[1:-1].decode('utf-8')
+            row.append(value.replace("''", "'") if "''" in value else value)
+        elif number:
+            row.append(float(number) if b'.' in number or b'e' in number or b'E' in number else int(number))
+        elif blob:
+            row.append(binascii.unhexlify(blob[1:-1]))
+        else:
+            row.append(None)
+        if separator == b')':
+            rows.append(tuple(row))
+            row = []
+    return rows
+
+
+class _TableBatch:
+    """Pending rows of one target table and the prepared INSERTs they are bound to
+
+    Rows are queued either converted (rows) or as the raw text of plain
+    single-row INSERTs (raw), read in bulk by the csv module at flush time.
+    csv yields every value as text, so text_sql turns the NULL keyword back
+    into NULL and the columns' affinity restores numbers exactly as the
+    literal would have; it is None when a column has BLOB affinity, which
+    would keep such numbers as text.
+    """
+
+    def __init__(self, name: str, sql: str, text_sql: Optional[str], pick: Optional[Callable[[Any], tuple]]):
+        self.name = name
+        self.sql = sql
+        self.text_sql = text_sql
+        self.pick = pick
+        self.rows: List[tuple] = []
+        self.raw: List[bytes] = []
+
+
+class SQLiteDumpLoader:
+    """Loads the INSERT data of a sqlite3 .dump into an existing database"""
+
+    def __init__(self, target_db: str, batch_rows: int = 10000, transaction_rows: int = 1000000,
+                 remap: bool = False, cache_size_mb: int = 256):
+        self.target_db = target_db
+        self.batch_rows = batch_rows
+        self.transaction_rows = transaction_rows
+        self.remap = remap
+        self.cache_size_mb = cache_size_mb
+        self.warnings: List[str] = []
+        # Rows loaded per table
+        self.rows: Dict[str, int] = {}
+        # State of the running load()
+        self.conn: Optional[sqlite3.Connection] = None
+        self.targets: Dict[str, Table] = {}
+        # Columns of the dumped tables, from the dump's CREATE TABLE statements
+        self.source_columns: Dict[str, List[str]] = {}
+        # Batch per (table, column list) as written in the dump
+        self.batches: Dict[Tuple[bytes, Optional[bytes]], Optional[_TableBatch]] = {}
+        self.pending = 0
+        self.uncommitted = 0
+        # Whether create_database() built the target (a failed load then deletes it)
+        self.created = False
+
+    def create_database(self, ddl_file: str) -> None:
+        """Build the target database from a DDL file (it must not exist yet)"""
+        if os.path.exists(self.target_db):
+            raise FileExistsError(f"Database file already exists: {self.target_db}")
+        with open(ddl_file, 'r', encoding='utf-8') as f:
+            ddl = f.read()
+        conn = sqlite3.connect(self.target_db)
+        try:
+            conn.executescript(ddl)
+        finally:
+            conn.close()
+        self.created = True
+
+    def read_schema(self) -> Dict[str, Table]:
+        """Tables of the target database keyed by lower-case name"""
+        conn = connect_snapshot(self.target_db)
+        try:
+            tables = SQLiteToHCLConverter().get_all_tables(conn)
+        finally:
+            conn.close()
+        return {table.name.lower(): table for table in tables}
+
+    def load(self, dump_file: str) -> int:
+        """Load every row of the dump; returns the row count (per table in self.rows)"""
+        for path in (dump_file, self.target_db):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"File not found: {path}")
+
+        self.targets = self.read_schema()
+        self.source_columns = {}
+        self.batches = {}
+        self.rows = {}
+        self.pending = 0
+        self.uncommitted = 0
+
+        conn = self.conn = sqlite3.connect(self.target_db, isolation_level=None)
+        deferred: List[Tuple[str, str, str]] = []
+        try:
+            # The target is a rebuild: no rollback journal, no fsync, large page cache
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(f"PRAGMA cache_size=-{self.cache_size_mb * 1024}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA locking_mode=EXCLUSIVE")
+            conn.execute("PRAGMA foreign_keys=OFF")
+            try:
+                conn.execute("SELECT unistr('')")
+            except sqlite3.OperationalError:
+                conn.create_function('unistr', 1, unistr, deterministic=True)
+
+            conn.execute("BEGIN")
+            # Filling tables first and indexing once afterwards beats updating every index per row
+            deferred = conn.execute("""
+                SELECT type, name, sql FROM sqlite_master
+                WHERE type IN ('index', 'trigger') AND sql IS NOT NULL ORDER BY type, name
+            """).fetchall()
+            for object_type, name, _ in deferred:
+                conn.execute(f"DROP {object_type.upper()} {sql_identifier(name)}")
+
+            if os.path.getsize(dump_file):
+                with open(dump_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    if hasattr(data, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        data.madvise(mmap.MADV_SEQUENTIAL)
+                    with phase('scan'):
+                        self._scan(data)
+            self._flush_all()
+
+            with phase('index'):
+                for _, _, sql in deferred:
+                    conn.execute(sql)
+            conn.execute("COMMIT")
+        except Exception:
+            self._abandon(deferred)
+            raise
+        finally:
+            conn.close()
+            self.conn = None
+        return sum(self.rows.values())
+
+    def _abandon(self, deferred: List[Tuple[str, str, str]]) -> None:
+        """Leave no half-built target behind a failed load
+
+        Earlier transactions are already committed, and ROLLBACK is unreliable
+        without a journal. A target built by create_database() is deleted. An
+        existing one gets its dropped indexes and triggers back.
+        """
+        conn = self.conn
+        if self.created:
+            conn.close()
+            os.remove(self.target_db)
+            self.warnings.append(f"{self.target_db}: load failed, partially loaded database deleted")
+            return
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        for object_type, name, sql in deferred:
+            try:
+                conn.execute(sql)
+            except sqlite3.Error as e:
+                # e.g. a UNIQUE index that the committed rows now violate
+                self.warnings.append(f"{object_type} {name}: not restored: {e}")
+        self.warnings.append(f"{self.target_db}: load failed, rows committed before the error remain")
+
+    def _scan(self, data: mmap.mmap) -> None:
+        """Dispatch every statement of the dump"""
+        parser = DDLParser()
+        plain = PLAIN_INSERT_PATTERN.match
+        skip = DUMP_DATA_PATTERN.match
+        insert = INSERT_PATTERN.match
+        batches = self.batches
+        size = len(data)
+        pos = DUMP_GAP_PATTERN.match(data, 0).end()
+        released = 0
+        while pos < size:
+            if pos - released >= DUMP_RELEASE_SIZE and hasattr(mmap, 'MADV_DONTNEED'):
+                boundary = pos - pos % mmap.PAGESIZE
+                data.madvise(mmap.MADV_DONTNEED, released, boundary - released)
+                released = boundary
+
+            # Fast path: another plain row for a table already seen
+            m = plain(data, pos)
+            if m is not None:
+                batch = batches.get(m.group(1, 2))
+                if batch is not None:
+                    if batch.rows:
+                        self._flush(batch)
+                    start, end = m.span(3)
+                    batch.raw.append(data[start + 1:end - 1])
+                    self.pending += 1
+                    if len(batch.raw) >= self.batch_rows:
+                        self._flush(batch)
+                    pos = m.end()
+                    continue
+
+            m = skip(data, pos)
+            if m is None:
+                if data[pos:pos + 6].upper() != b'CREATE':
+                    # A statement cut off by the end of the dump
+                    self.warnings.append(f"Incomplete statement at byte {pos} ignored")
+                    break
+                statement, pos = parser._dump_schema_statement(data, pos)
+                table = parser.parse_statement(statement) if statement else None
+                if table:
+                    self.source_columns[table.name.lower()] = [column.name for column in table.columns]
+                pos = DUMP_GAP_PATTERN.match(data, pos).end()
+                continue
+
+            end = m.end(1)
+            header = insert(data, pos, end)
+            if header is not None:
+                self._insert(data, header, end)
+            elif data[pos:pos + 10].split(None, 1)[0].rstrip(b';').upper() not in SKIPPED_STATEMENTS:
+                # DELETE FROM sqlite_sequence, ANALYZE, ...: run as is, in dump order
+                self._flush_all()
+                self._execute(data[pos:end].decode('utf-8'))
+            pos = m.end()
+
+    def _insert(self, data: mmap.mmap, header: re.Match, end: int) -> None:
+        """Queue the rows of one INSERT statement"""
+        key = header.group(1, 2)
+        if key in self.batches and self.batches[key] is None:
+            return
+        start = header.end()
+        if ROWS_PATTERN.fullmatch(data, start, end):
+            rows = literal_rows(data, start, end)
+        else:
+            # Values that are expressions (unistr(), replace(), char(), ...): let SQLite evaluate them
+            rows = self.conn.execute(f"VALUES {data[start:end].decode('utf-8')}").fetchall()
+        if not rows:
+            return
+
+        if key not in self.batches:
+            name, columns = key
+            self.batches[key] = self._prepare(unquote_identifier(name.decode('utf-8')),
+                                              [unquote_identifier(column.strip()) for column in
+                                               columns.decode('utf-8').split(',')] if columns else None,
+                                              len(rows[0]))
+        batch = self.batches[key]
+        if batch is None:
+            return
+        # Keep the dump's row order within a table (it decides the rowid of tables without one)
+        if batch.raw:
+            self._flush(batch)
+        batch.rows.extend(map(batch.pick, rows) if batch.pick else rows)
+        self.pending += len(rows)
+        if len(batch.rows) >= self.batch_rows:
+            self._flush(batch)
+
+    def _prepare(self, table_name: str, columns: Optional[List[str]], value_count: int) -> Optional[_TableBatch]:
+        """Target INSERT (and row remapping) for rows of table_name; None when the rows cannot be loaded"""
+        key = table_name.lower()
+        target = self.targets.get(key)
+        if target is None:
+            if key.startswith('sqlite_'):
+                # Internal tables (sqlite_sequence, sqlite_stat1): positional, like the dump
+                return _TableBatch(table_name, f"INSERT INTO {sql_identifier(table_name)} "
+                                               f"VALUES ({', '.join('?' * value_count)})", None, None)
+            self.warnings.append(f"{table_name}: not in the target schema, rows skipped")
+            return None
+
+        source = columns or self.source_columns.get(key)
+        if not self.remap or source is None or len(source) != value_count:
+            if self.remap:
+                self.warnings.append(f"{table_name}: columns unknown, loaded by position")
+            by_name = {column.name.lower(): column for column in target.columns}
+            bound = [by_name.get(column.lower()) for column in columns] if columns else target.columns
+            column_list = f" ({', '.join(sql_identifier(column) for column in columns)})" if columns else ''
+            return self._batch(target.name, column_list, ['?'] * value_count, bound, None)
+
+        positions = {column.lower(): i for i, column in enumerate(source)}
+        targets, values, picked, bound = [], [], [], []
+        for column in target.columns:
+            i = positions.pop(column.name.lower(), None)
+            if i is not None:
+                targets.append(sql_identifier(column.name))
+                values.append('?')
+                picked.append(i)
+                bound.append(column)
+            elif not column.nullable and column.default is None and not column.primary_key:
+                # Leaving it out would fail the NOT NULL constraint
+                targets.append(sql_identifier(column.name))
+                values.append(fallback_value(column))
+                self.warnings.append(f"{target.name}.{column.name}: NOT NULL without default, "
+                                     f"filled with {fallback_value(column)}")
+        if positions:
+            self.warnings.append(f"{target.name}: dropped {', '.join(source[i] for i in positions.values())}")
+        if not picked:
+            self.warnings.append(f"{target.name}: no column in common with the dump, rows skipped")
+            return None
+
+        if picked == list(range(value_count)):
+            pick = None
+        elif len(picked) == 1:
+            pick = lambda row, i=picked[0]: (row[i],)
+        else:
+            pick = itemgetter(*picked)
+        return self._batch(target.name, f" ({', '.join(targets)})", values, bound, pick)
+
+    def _batch(self, table_name: str, column_list: str, values: List[str], bound: List[Optional[Column]],
+               pick: Optional[Callable[[Any], tuple]]) -> _TableBatch:
+        """Batch inserting values ('?' per bound column) into column_list of table_name"""
+        insert = f"INSERT INTO {sql_identifier(table_name)}{column_list} VALUES "
+        sql = insert + f"({', '.join(values)})"
+        text_sql = None
+        if all(column is not None and column_affinity(column.type) != 'BLOB' for column in bound):
+            text_values = ["nullif(?, 'NULL')" if value == '?' else value for value in values]
+            text_sql = insert + f"({', '.join(text_values)})"
+        return _TableBatch(table_name, sql, text_sql, pick)
+
+    def _flush(self, batch: _TableBatch) -> None:
+        """Insert the pending rows of one table, committing once the transaction is large enough"""
+        sql, rows = batch.sql, batch.rows
+        if batch.raw:
+            with phase('parse'):
+                sql, rows = self._raw_rows(batch)
+        if not rows:
+            return
+        with phase('insert'):
+            if batch.name.lower() == 'sqlite_sequence':
+                # Loading rows with explicit ids already created these AUTOINCREMENT counters
+                self.conn.executemany("DELETE FROM sqlite_sequence WHERE name = ?", [row[:1] for row in rows])
+            self.conn.executemany(sql, rows)
+        count = len(rows)
+        self.rows[batch.name] = self.rows.get(batch.name, 0) + count
+        self.pending -= count
+        self.uncommitted += count
+        batch.rows = []
+        batch.raw = []
+        if self.uncommitted >= self.transaction_rows and not self.pending:
+            with phase('commit'):
+                self.conn.execute("COMMIT")
+                self.conn.execute("BEGIN")
+            self.uncommitted = 0
+
+    def _raw_rows(self, batch: _TableBatch) -> Tuple[str, List[Any]]:
+        """The statement and rows for the raw rows of a batch"""
+        text = b'\n'.join(batch.raw).decode('utf-8')
+        # A quoted 'NULL' would read the same as the NULL keyword
+        if batch.text_sql is not None and "'NULL'" not in text:
+            try:
+                rows = list(csv.reader(text.split('\n'), quotechar="'", doublequote=True, strict=True))
+            except csv.Error:
+                # Fields beyond csv.field_size_limit()
+                pass
+            else:
+                return batch.text_sql, list(map(batch.pick, rows)) if batch.pick else rows
+        rows = [row for raw in batch.raw for row in literal_rows(b'(' + raw + b')', 0, len(raw) + 2)]
+        return batch.sql, list(map(batch.pick, rows)) if batch.pick else rows
+
+    def _flush_all(self) -> None:
+        for batch in self.batches.values():
+            if batch is not None:
+                self._flush(batch)
+
+    def _execute(self, sql: str) -> None:
+        """Run a non-INSERT statement of the dump; failures on internal tables are only reported"""
+        try:
+            self.conn.execute(sql)
+        except sqlite3.Error as e:
+            if 'sqlite_' not in sql:
+                raise
+            self.warnings.append(f"{sql.split(None, 3)[:3]}: {e}")
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(
+        description="Load the data of a sqlite3 .dump into a database built from a schema",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+CREATE statements of the dump are not run: the target keeps its own schema.
+With --remap, columns are matched by name against the dump's CREATE TABLE:
+added columns get their DEFAULT, dropped columns are skipped.
+
+The load commits as it goes, without a rollback journal. If it fails, a
+target created with --ddl is deleted. A target loaded with --existing keeps
+the rows committed before the error, so restore it from a copy.
+
+Examples:
+  # Fresh database from db.sql, filled from a device dump
+  %(prog)s --dump device.dump --target db.new.sqlite --ddl db.sql
+
+  # Dump taken with an older schema version
+  %(prog)s --dump device.dump --target db.new.sqlite --ddl db.sql --remap
+
+  # Load into a database that already exists (keep a copy: see above)
+  %(prog)s --dump device.dump --target db.new.sqlite --existing
+        """
+    )
+    parser.add_argument('--dump', required=True, help='sqlite3 .dump file with the rows')
+    parser.add_argument('--target', required=True, help='Database to load the rows into')
+    parser.add_argument('--ddl', help='Create --target from this DDL file first')
+    parser.add_argument('--existing', action='store_true',
+                        help='Load into an existing --target (a failed load leaves it partially loaded)')
+    parser.add_argument('--remap', action='store_true', help='Match columns by name instead of position')
+    parser.add_argument('--batch-rows', type=int, default=10000,
+                        help='Rows per executemany() batch (default: 10000)')
+    parser.add_argument('--transaction-rows', type=int, default=1000000,
+                        help='Rows per transaction (default: 1000000)')
+    parser.add_argument('--cache-size', type=int, default=256, help='Page cache size in MB (default: 256)')
+    instrumentation.add_arguments(parser)
+
+    args = parser.parse_args()
+    if not args.ddl and not args.existing:
+        parser.error("--ddl is required unless --existing is given: "
+                     "a failed load leaves an existing target partially loaded")
+
+    print("🔄 SQLite Dump Loader")
+    print("=" * 40)
+    print(f"From: {os.path.abspath(args.dump)}")
+    print(f"To: {os.path.abspath(args.target)}")
+    print()
+
+    try:
+        loader = SQLiteDumpLoader(args.target, args.batch_rows, args.transaction_rows, args.remap,
+                                  args.cache_size)
+        with instrumentation.instrumented('dump_loader', args):
+            if args.ddl:
+                with phase('create'):
+                    loader.create_database(args.ddl)
+                print(f"📋 Created {args.target} from {args.ddl}")
+            start = time.perf_counter()
+            rows = loader.load(args.dump)
+            elapsed = time.perf_counter() - start
+            instrumentation.count('bytes_in', os.path.getsize(args.dump))
+            instrumentation.count('tables', len(loader.rows))
+            instrumentation.count('rows', rows)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        for warning in loader.warnings:
+            print(f"⚠️  {warning}")
+        return 1
+
+    for table_name, count in sorted(loader.rows.items()):
+        print(f"  {count:>10} rows  {table_name}")
+    for warning in loader.warnings:
+        print(f"⚠️  {warning}")
+
+    print()
+    print(f"✅ Loaded {rows} rows into {len(loader.rows)} tables in {elapsed:.2f}s "
+          f"({rows / elapsed if elapsed else 0:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Fleet Export
+Introspects many SQLite databases (one per device) across a process pool
+and writes DDL and/or HCL per database, or one file per distinct schema
+"""
+
+import glob
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from db_to_ddl import SQLiteToDDLGenerator, OBJECT_TYPES
+import instrumentation
+from instrumentation import phase
+from sqlite_introspect import SQLiteToHCLConverter
+
+
+DATABASE_PATTERNS = ('*.sqlite', '*.sqlite3', '*.db')
+
+
+def find_databases(source: str) -> List[str]:
+    """Resolve a directory (searched recursively) or a glob pattern to database files"""
+    if os.path.isdir(source):
+        paths = []
+        for pattern in DATABASE_PATTERNS:
+            paths.extend(glob.glob(os.path.join(source, '**', pattern), recursive=True))
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(set(path for path in paths if os.path.isfile(path)))
+
+
+def output_stem(db_path: str, base_dir: str) -> str:
+    """Flat output name for a database (device1/db.sqlite -> device1__db); see output_stems() for uniqueness"""
+    relative = os.path.relpath(db_path, base_dir)
+    return os.path.splitext(relative)[0].replace(os.sep, '__')
+
+
+def output_stems(db_paths: List[str], base_dir: str) -> Dict[str, str]:
+    """Output name per database path, unique even on a case-insensitive file system
+
+    Names that flatten alike (a/db.sqlite and a/db.db, a__b/db.sqlite and
+    a/b/db.sqlite) all get a hash of their relative path appended.
+    """
+    stems = {path: output_stem(path, base_dir) for path in db_paths}
+    counts = Counter(stem.lower() for stem in stems.values())
+    for path, stem in stems.items():
+        if counts[stem.lower()] > 1:
+            digest = hashlib.sha256(os.path.relpath(path, base_dir).encode('utf-8')).hexdigest()
+            stems[path] = f"{stem}__{digest[:8]}"
+    if len(set(stem.lower() for stem in stems.values())) != len(stems):
+        raise ValueError("Databases map to the same output name even with a path hash appended")
+    return stems
+
+
+def export_database(db_path: str, formats: Tuple[str, ...], all_objects: bool,
+                    immutable: bool = False) -> Dict[str, Any]:
+    """Introspect one database from a read-only snapshot; runs inside a worker process"""
+    start = time.perf_counter()
+    object_types = OBJECT_TYPES if all_objects else ('table',)
+    result: Dict[str, Any] = {'path': db_path}
+
+    try:
+        generator = SQLiteToDDLGenerator(db_path, '', snapshot=True, immutable=immutable)
+        conn = generator.connect_to_database()
+        try:
+            ddl = io.StringIO()
+            counts = generator.write_ddl(conn, ddl, object_types, verbose=False)
+            result['ddl'] = ddl.getvalue()
+            result['tables'] = counts['table']
+
+            if 'hcl' in formats:
+                converter = SQLiteToHCLConverter()
+                result['hcl'] = converter.generate_hcl_schema(converter.get_all_tables(conn))
+        finally:
+            conn.close()
+
+        # The catalog SQL identifies the schema regardless of the requested formats
+        result['fingerprint'] = hashlib.sha256(result['ddl'].encode('utf-8')).hexdigest()
+        if 'ddl' not in formats:
+            del result['ddl']
+    except Exception as e:
+        result['error'] = str(e)
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+class FleetExporter:
+    """Exports the schema of many SQLite databases in parallel"""
+
+    EXTENSIONS = {'ddl': '.sql', 'hcl': '.hcl'}
+
+    def __init__(self, output_dir: str, formats: Tuple[str, ...] = ('ddl',), workers: int = 0,
+                 dedupe: bool = False, all_objects: bool = False, immutable: bool = False):
+        self.output_dir = output_dir
+        self.formats = formats
+        self.workers = workers or os.cpu_count() or 1
+        self.dedupe = dedupe
+        self.all_objects = all_objects
+        self.immutable = immutable
+
+    def export(self, db_paths: List[str]) -> List[Dict[str, Any]]:
+        """Export all databases and write the outputs; returns per-file results"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base_dir = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in db_paths])
+        stems = output_stems([os.path.abspath(p) for p in db_paths], base_dir)
+
+        # Large chunks keep the per-task IPC overhead low for small databases
+        chunksize = max(1, len(db_paths) // (self.workers * 4))
+        results = []
+        manifest: Dict[str, str] = {}
+        written_fingerprints = set()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for result in executor.map(export_database, db_paths,
+                                       [self.formats] * len(db_paths),
+                                       [self.all_objects] * len(db_paths),
+                                       [self.immutable] * len(db_paths),
+                                       chunksize=chunksize):
+                results.append(result)
+                if 'error' in result:
+                    continue
+
+                stem = stems[os.path.abspath(result['path'])]
+                if self.dedupe:
+                    fingerprint = result['fingerprint']
+                    manifest[stem] = fingerprint
+                    if fingerprint in written_fingerprints:
+                        continue
+                    written_fingerprints.add(fingerprint)
+                    stem = f"schema_{fingerprint[:12]}"
+
+                for fmt in self.formats:
+                    output_path = os.path.join(self.output_dir, stem + self.EXTENSIONS[fmt])
+                    with open(output_path, 'w', encoding='utf-8') as f:
+                        f.write(result[fmt])
+
+        if self.dedupe:
+            with open(os.path.join(self.output_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+
+        return results
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(
+        description="Export DDL/HCL from many SQLite databases in parallel",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Every *.sqlite/*.sqlite3/*.db under a directory, DDL only
+  %(prog)s --input /data/devices --output /data/schemas
+
+  # Glob, both formats, one file per distinct schema plus manifest.json
+  %(prog)s --input '/data/devices/*/db.sqlite' --output out --format ddl hcl --dedupe
+        """
+    )
+    parser.add_argument('--input', '-i', required=True, help='Directory or glob of SQLite database files')
+    parser.add_argument('--output', '-o', required=True, help='Output directory')
+    parser.add_argument('--format', '-f', nargs='+', choices=['ddl', 'hcl'], default=['ddl'],
+                        help='Output formats (default: ddl)')
+    parser.add_argument('--workers', '-w', type=int, default=0, help='Worker processes (default: CPU count)')
+    parser.add_argument('--dedupe', '-d', action='store_true',
+                        help='Write one file per distinct schema fingerprint plus manifest.json')
+    parser.add_argument('--all-objects', '-a', action='store_true',
+                        help='Also export indexes, views and triggers in the DDL')
+    parser.add_argument('--immutable', action='store_true',
+                        help='Databases are offline copies: open with immutable=1 (no locking at all)')
+
+    instrumentation.add_arguments(parser)
+
+    args = parser.parse_args()
+
+    db_paths = find_databases(args.input)
+
+    print("🔄 Fleet Export")
+    print("=" * 40)
+    print(f"Input: {args.input}")
+    print(f"Output: {os.path.abspath(args.output)}")
+    print(f"Databases: {len(db_paths)}")
+    print()
+
+    if not db_paths:
+        print(f"❌ Error: No SQLite database files found for: {args.input}")
+        return 1
+
+    try:
+        exporter = FleetExporter(args.output, tuple(args.format), args.workers, args.dedupe,
+                                 args.all_objects, args.immutable)
+        with instrumentation.instrumented('fleet_export', args):
+            start = time.perf_counter()
+            with phase('export'):
+                results = exporter.export(db_paths)
+            elapsed = time.perf_counter() - start
+            instrumentation.count('databases', len(results))
+            instrumentation.count('tables', sum(r.get('tables', 0) for r in results))
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    failed = [r for r in results if 'error' in r]
+    for result in sorted(results, key=lambda r: r['seconds'], reverse=True):
+        status = f"❌ {result['error']}" if 'error' in result else f"{result['tables']} tables"
+        print(f"  {result['seconds'] * 1000:8.1f} ms  {result['path']}  ({status})")
+
+    print()
+    if args.dedupe:
+        schemas = len({r['fingerprint'] for r in results if 'error' not in r})
+        print(f"📋 Distinct schemas: {schemas}")
+    print(f"✅ Exported {len(results) - len(failed)}/{len(results)} databases in {elapsed:.2f}s "
+          f"with {exporter.workers} workers")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,206 +7,356 @@ Converts Atlas HCL schema files to SQL DDL (Data Definition Language) statements
 import re
 import os
 import sys
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Any, Optional, TextIO, Tuple
 
+import schema_ir
+from schema_ir import (SQL_DEFAULT_KEYWORDS, Column, ForeignKey, Table, autoincrement_key, make_column, make_foreign_key,
+                       make_index, make_table, release_table, sql_default, sql_identifier, sql_identifiers,
+                       sql_string)
+from schema_cache import FragmentCache, cached_fragment, converter_version
+import instrumentation
+from instrumentation import phase
 
-@dataclass
-class HCLColumn:
-    """Represents a column in HCL format"""
-    name: str
-    type: str
-    null: bool
-    default: Optional[str] = None
-    auto_increment: bool = False
+
+# HCL column types and their SQL spelling in the shared schema model
+HCL_TYPE_MAPPING = {
+    'int': 'INTEGER',
+    'varchar': 'VARCHAR',
+    'varchar(7)': 'VARCHAR(7)',
+    'varchar(8)': 'VARCHAR(8)', 
+    'varchar(4)': 'VARCHAR(4)',
+    'bool': 'BOOLEAN',
+    'text': 'TEXT',
+    'datetime': 'DATETIME',
+    'date': 'DATE',
+    'float': 'REAL',
+    'double': 'REAL',
+    'decimal': 'DECIMAL',
+    'json': 'JSON',
+    'blob': 'BLOB'
+}
+
+
+class HCLBlock:
+    """A generic HCL block: type, labels, attributes (raw expressions) and child blocks"""
+    __slots__ = ('type', 'labels', 'attributes', 'blocks')
+
+    def __init__(self, type_: str, labels: List[str]):
+        self.type = type_
+        self.labels = labels
+        self.attributes: Dict[str, str] = {}
+        self.blocks: List['HCLBlock'] = []
     
+    def normalized(self) -> str:
+        """Canonical text of the block, independent of whitespace, comments and attribute order"""
+        attributes = ';'.join(f'{key}={value}' for key, value in sorted(self.attributes.items()))
+        children = ''.join(block.normalized() for block in self.blocks)
+        return f'{self.type} {self.labels!r} {{{attributes}{children}}}'
+
+
+# HCL lexical tokens; every branch consumes at least one character so one
+# left-to-right walk over the buffer tokenizes it in linear time
+HCL_TOKEN_PATTERN = re.compile(r'''
+    (?P<nl>\n)
+  | (?P<ws>[ \t\r]+)
+  | (?P<comment>\#[^\n]*|//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>"[^"\\\n]*(?:\\.[^"\\\n]*)*")
+  | (?P<open>[{\[(])
+  | (?P<close>[}\])])
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_\-]*)
+  | (?P<eq>=)
+  | (?P<other>.)
+''', re.VERBOSE | re.DOTALL)
+
+# Escape sequences of an HCL string literal (plus the doubled $${ and %%{ of a template-free string)
+HCL_UNESCAPES = {'n': '\n', 'r': '\r', 't': '\t'}
+_HCL_UNESCAPE_PATTERN = re.compile(r'\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)|\$\$\{|%%\{')
+
+# A reference (column.a, table.t.column.b, column["my col"]) and its steps
+HCL_REFERENCE_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_-]*(?:\.[A-Za-z_][A-Za-z0-9_-]*|\["(?:[^"\\]|\\.)*"\])*')
+HCL_STEP_PATTERN = re.compile(r'([A-Za-z_][A-Za-z0-9_-]*)|\[("(?:[^"\\]|\\.)*")\]')
+
+
+def hcl_text(literal: str) -> str:
+    """The text of a double-quoted HCL string literal"""
+    def unescape(m: re.Match) -> str:
+        escape = m.group(1)
+        if escape is None:
+            return m.group()[1:]
+        if len(escape) > 1:
+            return chr(int(escape[1:], 16))
+        return HCL_UNESCAPES.get(escape, escape)
+    return _HCL_UNESCAPE_PATTERN.sub(unescape, literal[1:-1])
 
-@dataclass 
-class HCLTable:
-    """Represents a table in HCL format"""
-    name: str
-    schema: str
-    columns: List[HCLColumn]
-    primary_key: List[str]
+
+def hcl_references(expression: str) -> List[List[str]]:
+    """Steps of every reference in an expression ([column.a, column["b c"]] -> [['column', 'a'], ['column', 'b c']])"""
+    return [
+        [name or hcl_text(literal) for name, literal in HCL_STEP_PATTERN.findall(reference)]
+        for reference in HCL_REFERENCE_PATTERN.findall(expression)
+    ]
+
+
+# Characters read per chunk when streaming an HCL file
+STREAM_CHUNK_SIZE = 1 << 20
 
 
 class HCLParser:
     """Parser for Atlas HCL schema files"""
     
     def __init__(self):
-        self.tables: List[HCLTable] = []
+        self.tables: List[Table] = []
     
-    def parse_file(self, file_path: str) -> List[HCLTable]:
+    def parse_file(self, file_path: str) -> List[Table]:
         """Parse HCL file and extract table definitions"""
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
         return self.parse_content(content)
     
-    def parse_content(self, content: str) -> List[HCLTable]:
+    def parse_content(self, content: str) -> List[Table]:
         """Parse HCL content and extract table definitions"""
         self.tables = []
         
-        # Find all table blocks using a more robust approach
-        table_start_pattern = r'table\s+"([^"]+)"\s*\{'
+        for block in self.iter_blocks(content):
+            if block.type == 'table' and block.labels:
+                table = self._parse_table(block)
+                if table:
+                    self.tables.append(table)
         
+        return self.tables
+    
+    def iter_file(self, file_path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Table]:
+        """Yield tables one at a time, reading the file in chunks (memory bounded by the largest block)"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for block in self.stream_blocks(f, chunk_size):
+                if block.type == 'table' and block.labels:
+                    table = self._parse_table(block)
+                    if table:
+                        yield table
+                        # Nothing of the table is reused, so the pools stay bounded by one table
+                        release_table(table)
+    
+    def stream_blocks(self, f: TextIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[HCLBlock]:
+        """Yield each top-level block read from a file object chunk by chunk"""
+        buffer = ''
+        read_size = chunk_size
+        final = False
+        while not final:
+            chunk = f.read(read_size)
+            final = not chunk
+            buffer += chunk
+            
+            consumed = 0
+            for block, end in self._iter_blocks(buffer, final):
+                yield block
+                consumed = end
+            buffer = buffer[consumed:]
+            
+            # A block longer than the buffer: read more at once instead of rescanning it per chunk
+            read_size = chunk_size if consumed else read_size * 2
+    
+    def iter_blocks(self, content: str) -> Iterator[HCLBlock]:
+        """Walk the buffer once and yield each top-level block as soon as it closes"""
+        for block, _ in self._iter_blocks(content, True):
+            yield block
+    
+    def _iter_blocks(self, content: str, final: bool) -> Iterator[Tuple[HCLBlock, int]]:
+        """Yield (top-level block, end offset); unless final, stop at a string cut off by the end of content"""
+        match = HCL_TOKEN_PATTERN.match
+        end = len(content)
         pos = 0
-        while True:
-            match = re.search(table_start_pattern, content[pos:])
-            if not match:
-                break
+        stack: List[HCLBlock] = []
+        # Pending block header: type followed by labels, waiting for '{' or '='
+        header: List[str] = []
+        
+        while pos < end:
+            m = match(content, pos)
+            kind = m.lastgroup
+            pos = m.end()
+            
+            if kind in ('ws', 'nl', 'comment'):
+                continue
             
-            table_name = match.group(1)
-            start_pos = pos + match.end() - 1  # Position of opening brace
+            if kind == 'other' and not final and m.group() == '"':
+                # Strings never span lines, so this one continues in the next chunk
+                return
             
-            # Find the matching closing brace
-            brace_count = 0
-            end_pos = start_pos
-            for i, char in enumerate(content[start_pos:], start_pos):
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        end_pos = i
+            if kind == 'ident' or (kind == 'string' and header):
+                header.append(m.group() if kind == 'ident' else hcl_text(m.group()))
+                continue
+            
+            if kind == 'eq' and len(header) == 1:
+                # Attribute: raw expression up to the end of line at bracket depth 0,
+                # without the comments in it (strings are whole tokens, so '#' or '//' inside one stays)
+                value_start = pos
+                parts = []
+                depth = 0
+                while pos < end:
+                    m = match(content, pos)
+                    kind = m.lastgroup
+                    if kind == 'nl' and depth == 0:
                         break
+                    if kind == 'comment':
+                        parts.append(content[value_start:pos])
+                        value_start = m.end()
+                    elif kind == 'open':
+                        depth += 1
+                    elif kind == 'close':
+                        if depth == 0:
+                            break
+                        depth -= 1
+                    elif kind == 'other' and not final and m.group() == '"':
+                        return
+                    pos = m.end()
+                if stack:
+                    parts.append(content[value_start:pos])
+                    stack[-1].attributes[header[0]] = ''.join(parts).strip()
+                header = []
+                continue
             
-            if brace_count == 0:
-                table_content = content[start_pos + 1:end_pos]  # Skip opening brace
-                table = self._parse_table(table_name, table_content)
-                if table:
-                    self.tables.append(table)
+            if kind == 'open' and m.group() == '{' and header:
+                stack.append(HCLBlock(header[0], header[1:]))
+                header = []
+                continue
             
-            pos = end_pos + 1
-        
-        return self.tables
+            if kind == 'close' and m.group() == '}' and stack:
+                block = stack.pop()
+                if stack:
+                    stack[-1].blocks.append(block)
+                else:
+                    yield block, pos
+            
+            header = []
     
-    def _parse_table(self, table_name: str, table_content: str) -> Optional[HCLTable]:
-        """Parse individual table content"""
+    def _parse_table(self, block: HCLBlock) -> Optional[Table]:
+        """Build a table from its parsed block"""
         columns = []
         primary_key = []
+        indexes = []
+        foreign_keys = []
         schema = "main"
         
         # Extract schema
-        schema_match = re.search(r'schema\s*=\s*schema\.(\w+)', table_content)
-        if schema_match:
-            schema = schema_match.group(1)
+        for steps in hcl_references(block.attributes.get('schema', '')):
+            if len(steps) == 2 and steps[0] == 'schema':
+                schema = steps[1]
         
-        # Find all column blocks using robust parsing
-        column_start_pattern = r'column\s+"([^"]+)"\s*\{'
-        
-        pos = 0
-        while True:
-            match = re.search(column_start_pattern, table_content[pos:])
-            if not match:
-                break
-            
-            column_name = match.group(1)
-            start_pos = pos + match.end() - 1  # Position of opening brace
-            
-            # Find the matching closing brace
-            brace_count = 0
-            end_pos = start_pos
-            for i, char in enumerate(table_content[start_pos:], start_pos):
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        end_pos = i
-                        break
-            
-            if brace_count == 0:
-                column_content = table_content[start_pos + 1:end_pos]  # Skip opening brace
-                column = self._parse_column(column_name, column_content)
+        for child in block.blocks:
+            if child.type == 'column' and child.labels:
+                column = self._parse_column(child.labels[0], child.attributes)
                 if column:
                     columns.append(column)
-            
-            pos = end_pos + 1
-        
-        # Find primary key
-        pk_pattern = r'primary_key\s*\{([^}]*)\}'
-        pk_match = re.search(pk_pattern, table_content, re.DOTALL)
-        if pk_match:
-            pk_content = pk_match.group(1)
-            # Extract column names from primary key
-            col_pattern = r'column\.(\w+)'
-            pk_columns = re.findall(col_pattern, pk_content)
-            primary_key = pk_columns
-        
-        return HCLTable(
-            name=table_name,
+            elif child.type == 'primary_key':
+                # Extract column names from primary key
+                primary_key = self._column_refs(child.attributes.get('columns', ''))
+            elif child.type == 'index' and child.labels:
+                indexes.append(make_index(
+                    name=child.labels[0],
+                    columns=self._column_refs(child.attributes.get('columns', '')),
+                    unique=child.attributes.get('unique') == 'true'
+                ))
+            elif child.type == 'foreign_key':
+                foreign_key = self._parse_foreign_key(child.attributes)
+                if foreign_key:
+                    foreign_keys.append(foreign_key)
+        
+        return make_table(
+            name=block.labels[0],
+            columns=columns,
+            primary_keys=primary_key,
+            indexes=indexes,
             schema=schema,
+            foreign_keys=foreign_keys
+        )
+    
+    def _parse_foreign_key(self, attributes: Dict[str, str]) -> Optional[ForeignKey]:
+        """Foreign key from columns = [column.a], ref_columns = [table.t.column.b] and on_update/on_delete"""
+        ref_columns = attributes.get('ref_columns', '')
+        ref_table = next((steps[1] for steps in hcl_references(ref_columns)
+                          if len(steps) == 4 and steps[0] == 'table'), None)
+        columns = self._column_refs(attributes.get('columns', ''))
+        if not ref_table or not columns:
+            return None
+        return make_foreign_key(
             columns=columns,
-            primary_key=primary_key
+            ref_table=ref_table,
+            ref_columns=self._column_refs(ref_columns),
+            on_update=attributes.get('on_update', 'NO_ACTION').replace('_', ' '),
+            on_delete=attributes.get('on_delete', 'NO_ACTION').replace('_', ' ')
         )
     
-    def _parse_column(self, column_name: str, column_content: str) -> Optional[HCLColumn]:
-        """Parse individual column content"""
+    def _column_refs(self, expression: str) -> List[str]:
+        """Extract column names from a [column.a, column.b] (or [table.t.column.a]) expression"""
+        return [steps[-1] for steps in hcl_references(expression) if len(steps) >= 2 and steps[-2] == 'column']
+    
+    def _parse_column(self, column_name: str, attributes: Dict[str, str]) -> Optional[Column]:
+        """Parse individual column attributes"""
         # Extract type
-        type_match = re.search(r'type\s*=\s*(\w+(?:\(\d+\))?)', column_content)
-        if not type_match:
+        column_type = attributes.get('type')
+        if not column_type:
             return None
         
-        column_type = type_match.group(1)
-        
         # Extract null constraint
-        null_match = re.search(r'null\s*=\s*(true|false)', column_content)
-        null = True  # default
-        if null_match:
-            null = null_match.group(1) == 'true'
+        null = attributes.get('null', 'true') == 'true'
         
         # Extract default value
-        default_match = re.search(r'default\s*=\s*([^\n]+)', column_content)
-        default = None
-        if default_match:
-            default = default_match.group(1).strip()
+        default = attributes.get('default')
         
         # Extract auto_increment
-        auto_increment_match = re.search(r'auto_increment\s*=\s*(true|false)', column_content)
-        auto_increment = False
-        if auto_increment_match:
-            auto_increment = auto_increment_match.group(1) == 'true'
+        auto_increment = attributes.get('auto_increment') == 'true'
         
-        return HCLColumn(
+        return make_column(
             name=column_name,
-            type=column_type,
-            null=null,
-            default=default,
+            type=self._map_type(column_type),
+            nullable=null,
+            default=self._map_default(default),
             auto_increment=auto_increment
         )
+    
+    def _map_type(self, hcl_type: str) -> str:
+        """Map an HCL type expression to its SQL spelling"""
+        # Raw SQL types are written as sql("TYPE")
+        raw_type_match = re.fullmatch(r'sql\("([^"]*)"\)', hcl_type)
+        if raw_type_match:
+            return raw_type_match.group(1).upper()
+        
+        # Handle varchar with length
+        if hcl_type.startswith('varchar'):
+            length_match = re.search(r'varchar\((\d+)\)', hcl_type)
+            if length_match:
+                return f'VARCHAR({length_match.group(1)})'
+            return 'VARCHAR(255)'  # Default length
+        
+        return HCL_TYPE_MAPPING.get(hcl_type, hcl_type.upper())
+    
+    def _map_default(self, default: Optional[str]) -> Optional[str]:
+        """Map an HCL default expression to an SQL literal"""
+        if default is None:
+            return None
+        if default.lower() in ['true', 'false', 'null']:
+            return default.upper()
+        # Computed defaults are written as sql("expression")
+        raw_default_match = re.fullmatch(r'sql\(("(?:[^"\\]|\\.)*")\)', default)
+        if raw_default_match:
+            expression = hcl_text(raw_default_match.group(1))
+            return expression.upper() if expression.upper() in SQL_DEFAULT_KEYWORDS else f'({expression})'
+        if default.startswith('"') and default.endswith('"'):
+            return sql_string(hcl_text(default))
+        return default
 
 
 class HCLToDDLConverter:
     """Converts HCL schema to SQL DDL statements"""
     
     def __init__(self):
-        self.type_mapping = {
-            'int': 'INTEGER',
-            'varchar': 'VARCHAR',
-            'varchar(7)': 'VARCHAR(7)',
-            'varchar(8)': 'VARCHAR(8)', 
-            'varchar(4)': 'VARCHAR(4)',
-            'bool': 'BOOLEAN',
-            'text': 'TEXT',
-            'datetime': 'DATETIME',
-            'date': 'DATE',
-            'float': 'REAL',
-            'double': 'REAL',
-            'decimal': 'DECIMAL',
-            'json': 'JSON',
-            'blob': 'BLOB'
-        }
+        # Fragment cache used by the last convert_file call (None when caching is off)
+        self.last_cache: Optional[FragmentCache] = None
     
-    def generate_ddl(self, tables: List[HCLTable]) -> str:
+    def generate_ddl(self, tables: List[Table]) -> str:
         """Generate SQL DDL from HCL tables"""
         
-        ddl_lines = []
-        
-        # Add header comment
-        ddl_lines.append("-- SQL DDL generated from HCL schema")
-        ddl_lines.append("-- Generated with HCL to DDL converter")
-        ddl_lines.append("")
+        ddl_lines = self._generate_header()
         
         # Generate CREATE TABLE statements
         for table in tables:
@@ -215,45 +365,82 @@ class HCLToDDLConverter:
         
         return '\n'.join(ddl_lines)
     
-    def _generate_table_ddl(self, table: HCLTable) -> List[str]:
+    def write_ddl(self, tables: Iterable[Table], f: TextIO) -> int:
+        """Write the same DDL as generate_ddl() table by table to a file object; returns the table count"""
+        f.write('\n'.join(self._generate_header()[:-1]) + '\n')
+        count = 0
+        for table in tables:
+            with phase('render'):
+                text = '\n' + '\n'.join(self._generate_table_ddl(table)) + '\n'
+            with phase('write'):
+                f.write(text)
+            count += 1
+            instrumentation.count('columns', len(table.columns))
+        instrumentation.count('tables', count)
+        return count
+    
+    def _generate_header(self) -> List[str]:
+        """Header comment lines of the DDL file"""
+        return [
+            "-- SQL DDL generated from HCL schema",
+            "-- Generated with HCL to DDL converter",
+            "",
+        ]
+    
+    def _generate_table_ddl(self, table: Table) -> List[str]:
         """Generate SQL DDL for a single table"""
-        lines = [f"CREATE TABLE {table.name} ("]
+        lines = [f"CREATE TABLE {sql_identifier(table.name)} ("]
         
         # Generate column definitions
         column_defs = []
         for column in table.columns:
-            col_def = self._generate_column_definition(column, table.primary_key)
+            col_def = self._generate_column_definition(column, table.primary_keys)
             column_defs.append(f"    {col_def}")
         
         # Add primary key constraint if multiple columns
-        if len(table.primary_key) > 1:
-            pk_constraint = f"    PRIMARY KEY ({', '.join(table.primary_key)})"
+        if len(table.primary_keys) > 1:
+            pk_constraint = f"    PRIMARY KEY ({sql_identifiers(table.primary_keys)})"
             column_defs.append(pk_constraint)
         
+        # UNIQUE constraints (SQLite names their indexes itself) and foreign keys
+        for index in table.indexes:
+            if index.constraint:
+                column_defs.append(f"    UNIQUE ({sql_identifiers(index.columns)})")
+        for foreign_key in table.foreign_keys:
+            column_defs.append(f"    {self._generate_foreign_key(foreign_key)}")
+        
         lines.append(',\n'.join(column_defs))
         lines.append(");")
         
+        # Secondary indexes declared in the table block
+        for index in table.indexes:
+            if index.constraint:
+                continue
+            unique = 'UNIQUE ' if index.unique else ''
+            lines.append(f"CREATE {unique}INDEX {sql_identifier(index.name)} ON {sql_identifier(table.name)} "
+                         f"({sql_identifiers(index.columns)});")
+        
         return lines
     
-    def _generate_column_definition(self, column: HCLColumn, primary_keys: List[str]) -> str:
+    def _generate_foreign_key(self, foreign_key: ForeignKey) -> str:
+        """FOREIGN KEY table constraint (no referenced columns: the referenced table's primary key)"""
+        ref_columns = f" ({sql_identifiers(foreign_key.ref_columns)})" if foreign_key.ref_columns else ''
+        constraint = (f"FOREIGN KEY ({sql_identifiers(foreign_key.columns)}) "
+                      f"REFERENCES {sql_identifier(foreign_key.ref_table)}{ref_columns}")
+        if foreign_key.on_update != 'NO ACTION':
+            constraint += f" ON UPDATE {foreign_key.on_update}"
+        if foreign_key.on_delete != 'NO ACTION':
+            constraint += f" ON DELETE {foreign_key.on_delete}"
+        return constraint
+    
+    def _generate_column_definition(self, column: Column, primary_keys: Tuple[str, ...]) -> str:
         """Generate SQL column definition"""
-        # Map HCL type to SQL type
-        sql_type = self.type_mapping.get(column.type, column.type.upper())
+        # SQLite only auto-increments an INTEGER key (BIGINT identity/serial keys included)
+        autoincrement = autoincrement_key(column, primary_keys)
+        sql_type = 'INTEGER' if autoincrement else column.type
         
-        # Handle varchar with length
-        if column.type.startswith('varchar'):
-            if '(' in column.type:
-                # Extract length from varchar(n)
-                length_match = re.search(r'varchar\((\d+)\)', column.type)
-                if length_match:
-                    length = length_match.group(1)
-                    sql_type = f'VARCHAR({length})'
-                else:
-                    sql_type = 'VARCHAR'
-            else:
-                sql_type = 'VARCHAR(255)'  # Default length
-        
-        definition = f'{column.name} {sql_type}'
+        # A column without a type (BLOB affinity) is written as its bare name
+        definition = f'{sql_identifier(column.name)} {sql_type}' if sql_type else sql_identifier(column.name)
         
         # Add constraints
         constraints = []
@@ -263,27 +450,16 @@ class HCLToDDLConverter:
             constraints.append('PRIMARY KEY')
         
         # Auto increment
-        if column.auto_increment:
+        if autoincrement:
             constraints.append('AUTOINCREMENT')
         
         # NOT NULL constraint
-        if not column.null:
+        if not column.nullable:
             constraints.append('NOT NULL')
         
-        # Default value
+        # Default value (literals bare, expressions parenthesised, strings quoted)
         if column.default is not None:
-            if column.default.lower() in ['true', 'false']:
-                # Boolean defaults
-                constraints.append(f'DEFAULT {column.default.upper()}')
-            elif column.default.isdigit() or (column.default.startswith('-') and column.default[1:].isdigit()):
-                # Numeric defaults
-                constraints.append(f'DEFAULT {column.default}')
-            elif column.default.lower() == 'null':
-                constraints.append('DEFAULT NULL')
-            else:
-                # String defaults (remove quotes if present)
-                default_val = column.default.strip('"\'')
-                constraints.append(f"DEFAULT '{default_val}'")
+            constraints.append(f'DEFAULT {sql_default(column.default)}')
         
         # Add constraints to definition
         if constraints:
@@ -291,29 +467,82 @@ class HCLToDDLConverter:
         
         return definition
     
-    def convert_file(self, hcl_file: str, output_file: str) -> None:
-        """Convert HCL file to DDL file"""
-        # Parse HCL file
+    def convert_file(self, hcl_file: str, output_file: str, cache_dir: Optional[str] = None) -> None:
+        """Convert HCL file to DDL file, reusing cached fragments for unchanged tables"""
+        cache = None
+        if cache_dir:
+            version = converter_version(sys.modules[__name__], schema_ir)
+            cache = FragmentCache(cache_dir, 'hcl_to_ddl', version, hcl_file)
+        
+        # Parse HCL file block by block; only changed tables are converted and rendered
         parser = HCLParser()
-        tables = parser.parse_file(hcl_file)
+        with phase('read'):
+            with open(hcl_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+        instrumentation.count('bytes_in', len(content))
+        
+        entries = []
+        with phase('parse'):
+            for block in parser.iter_blocks(content):
+                if block.type != 'table' or not block.labels:
+                    continue
+            
+                def render(block=block):
+                    table = parser._parse_table(block)
+                    if table is None:
+                        return None
+                    with phase('render'):
+                        fragment = '\n'.join(self._generate_table_ddl(table))
+                    return {'name': table.name, 'columns': len(table.columns), 'fragment': fragment}
+            
+                entry = cached_fragment(cache, (block.normalized(),), render)
+                if entry:
+                    entries.append(entry)
         
-        if not tables:
+        if not entries:
             print("No tables found in HCL file")
             return
         
-        print(f"Found {len(tables)} tables:")
-        for table in tables:
-            print(f"  - {table.name} ({len(table.columns)} columns)")
+        print(f"Found {len(entries)} tables:")
+        for entry in entries:
+            print(f"  - {entry['name']} ({entry['columns']} columns)")
+        
+        instrumentation.count('tables', len(entries))
+        instrumentation.count('columns', sum(entry['columns'] for entry in entries))
         
-        # Generate DDL
-        ddl_content = self.generate_ddl(tables)
+        # Splice the DDL together from the per-table fragments
+        with phase('render'):
+            ddl_lines = self._generate_header()
+            for entry in entries:
+                ddl_lines.append(entry['fragment'])
+                ddl_lines.append("")
+            ddl_content = '\n'.join(ddl_lines)
         
         # Write to output file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(ddl_content)
+        with phase('write'):
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(ddl_content)
+        instrumentation.count('bytes_out', len(ddl_content))
+        
+        self.last_cache = cache
+        if cache:
+            cache.save()
+            print(f"\n♻️  {cache.summary()}")
         
         print(f"\nSQL DDL generated successfully!")
         print(f"Output file: {output_file}")
+    
+    def convert_file_streaming(self, hcl_file: str, output_file: str) -> int:
+        """Convert HCL file to DDL file one table at a time without holding the schema in memory"""
+        parser = HCLParser()
+        with open(output_file, 'w', encoding='utf-8') as f, phase('parse'):
+            count = self.write_ddl(parser.iter_file(hcl_file), f)
+        instrumentation.count('bytes_out', os.path.getsize(output_file))
+        
+        print(f"Streamed {count} tables")
+        print(f"\nSQL DDL generated successfully!")
+        print(f"Output file: {output_file}")
+        return count
 
 
 def main():
@@ -324,6 +553,10 @@ def main():
     parser = argparse.ArgumentParser(description="Convert HCL schema to SQL DDL format")
     parser.add_argument('--input', '-i', help='Input HCL schema file path')
     parser.add_argument('--output', '-o', help='Output SQL DDL file path')
+    parser.add_argument('--cache-dir', '-c', help='Reuse rendered tables from this cache directory')
+    parser.add_argument('--stream', action='store_true',
+                        help='Convert table by table with bounded memory (ignores --cache-dir)')
+    instrumentation.add_arguments(parser)
     
     args = parser.parse_args()
     
@@ -351,7 +584,11 @@ def main():
     
     try:
         converter = HCLToDDLConverter()
-        converter.convert_file(hcl_file, output_file)
+        with instrumentation.instrumented('hcl_to_ddl', args):
+            if args.stream:
+                converter.convert_file_streaming(hcl_file, output_file)
+            else:
+                converter.convert_file(hcl_file, output_file, args.cache_dir)
         return 0
         
     except Exception as e:
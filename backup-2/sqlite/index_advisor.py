@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Index Advisor
+Runs EXPLAIN QUERY PLAN for a file of application queries against a SQLite
+database, finds full table scans and temporary B-trees, proposes covering
+indexes from the columns each query filters, joins, groups and sorts on,
+verifies them on a scratch copy of the database and writes the indexes that
+removed a problem into the DDL/HCL output
+"""
+
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+from schema_ir import Index, Table, make_index, make_table, sql_identifier
+from ddl_parser import DDLParser, Token, tokenize
+from pipeline import DDLSink, HCLSink, SQLiteSource
+from sqlite_snapshot import connect_snapshot
+import instrumentation
+from instrumentation import phase
+
+
+# Plan details: a full table scan (not over an index), a sort/group/distinct B-tree, an index in use
+TABLE_SCAN = re.compile(r'^SCAN ([^\s(]+)$')
+TEMP_BTREE = re.compile(r'^USE TEMP B-TREE FOR ')
+USING_INDEX = re.compile(r'USING (?:COVERING )?INDEX (\S+)')
+
+# Keywords that switch the clause a column reference belongs to
+CLAUSE_WORDS = {
+    'SELECT': 'select', 'FROM': 'from', 'JOIN': 'from', 'UPDATE': 'from', 'INTO': 'from',
+    'WHERE': 'where', 'ON': 'where', 'GROUP': 'group', 'ORDER': 'order',
+    'HAVING': 'other', 'LIMIT': 'other', 'SET': 'set', 'VALUES': 'other',
+    'RETURNING': 'other', 'UNION': 'other', 'WINDOW': 'other',
+}
+
+# Words after a table name that are not its alias
+NOT_ALIAS_WORDS = set(CLAUSE_WORDS) | {
+    'AS', 'LEFT', 'RIGHT', 'FULL', 'INNER', 'OUTER', 'CROSS', 'NATURAL', 'USING', 'INDEXED', 'NOT',
+}
+
+# Comparisons an index can seek on
+EQUALITY_OPERATORS = {'=', '==', 'IS', 'IN'}
+RANGE_OPERATORS = {'<', '>', '<=', '>=', 'BETWEEN', 'LIKE', 'GLOB'}
+
+# Widest index proposed; past this a covering index costs more than it saves
+MAX_INDEX_COLUMNS = 6
+
+
+@dataclass
+class ColumnUsage:
+    """How one query uses the columns of one table, in order of appearance"""
+    equality: List[str] = field(default_factory=list)
+    join: List[str] = field(default_factory=list)
+    range: List[str] = field(default_factory=list)
+    group: List[str] = field(default_factory=list)
+    order: List[str] = field(default_factory=list)
+    other: List[str] = field(default_factory=list)
+    star: bool = False
+
+
+@dataclass
+class QueryReport:
+    """Plan problems of one query before and after the proposed indexes"""
+    sql: str
+    issues: List[str] = field(default_factory=list)
+    after_issues: List[str] = field(default_factory=list)
+    seconds: Optional[float] = None
+    after_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class Recommendation:
+    """A proposed index and the queries (by number) it was proposed for"""
+    table: str
+    index: Index
+    queries: List[int] = field(default_factory=list)
+    accepted: bool = False
+
+
+def _append(columns: List[str], name: str) -> None:
+    """Add a column once, keeping first-appearance order"""
+    if name not in columns:
+        columns.append(name)
+
+
+def null_parameters(tokens: List[Token]) -> Union[Tuple, Dict[str, None]]:
+    """NULL bindings for the ?, ?NNN, :name, @name and $name parameters of a query"""
+    named: Dict[str, None] = {}
+    positional = 0
+    numbered = 0
+    for i, token in enumerate(tokens):
+        if token.kind != 'op':
+            continue
+        following = tokens[i + 1] if i + 1 < len(tokens) else None
+        adjacent = following is not None and following.pos == token.pos + 1
+        if token.value == '?':
+            if adjacent and following.kind == 'number':
+                numbered = max(numbered, int(following.value))
+            else:
+                positional += 1
+        elif token.value in (':', '@', '$') and adjacent and following.kind == 'word':
+            named[following.value] = None
+    return named if named else (None,) * max(positional, numbered)
+
+
+class QueryAnalyzer:
+    """Attributes the column references of a query to the tables it reads"""
+
+    def __init__(self, tables: Dict[str, Table]):
+        # Lower-case table name -> lower-case column name -> column name
+        self.columns = {key: {column.name.lower(): column.name for column in table.columns}
+                        for key, table in tables.items()}
+
+    def aliases(self, tokens: List[Token]) -> Dict[str, str]:
+        """Lower-case table name or alias -> lower-case table name, for the tables in FROM/JOIN/UPDATE"""
+        aliases = {}
+        expect_table = False
+        in_from = False
+        for i, token in enumerate(tokens):
+            if token.kind == 'word' and token.value.upper() in CLAUSE_WORDS:
+                in_from = CLAUSE_WORDS[token.value.upper()] == 'from'
+                expect_table = in_from
+                continue
+            if token.kind == 'punct' and token.value == ',' and in_from:
+                expect_table = True
+                continue
+            if not expect_table or token.kind not in ('word', 'ident'):
+                expect_table = False
+                continue
+            expect_table = False
+            # schema.table: use the table part
+            if i + 2 < len(tokens) and tokens[i + 1].value == '.':
+                continue
+            key = token.value.lower()
+            if key not in self.columns:
+                continue
+            aliases[key] = key
+            rest = tokens[i + 1:i + 3]
+            if rest and rest[0].kind == 'word' and rest[0].value.upper() == 'AS':
+                rest = rest[1:]
+            if rest and rest[0].kind in ('word', 'ident') and rest[0].value.upper() not in NOT_ALIAS_WORDS:
+                aliases[rest[0].value.lower()] = key
+        return aliases
+
+    def analyze(self, tokens: List[Token]) -> Tuple[Dict[str, str], Dict[str, ColumnUsage]]:
+        """(aliases, lower-case table name -> column usage) of one query"""
+        aliases = self.aliases(tokens)
+        tables = sorted(set(aliases.values()))
+        usage = {key: ColumnUsage() for key in tables}
+        clause = 'other'
+        stack = []
+
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token.kind == 'punct' and token.value == '(':
+                stack.append(clause)
+            elif token.kind == 'punct' and token.value == ')':
+                clause = stack.pop() if stack else 'other'
+            elif token.kind == 'word' and token.value.upper() in CLAUSE_WORDS:
+                clause = CLAUSE_WORDS[token.value.upper()]
+            elif token.kind == 'op' and token.value == '*' and clause == 'select':
+                # SELECT * or SELECT t.*: no index can cover the row
+                qualifier = tokens[i - 2].value.lower() if i >= 2 and tokens[i - 1].value == '.' else None
+                for key in ([aliases[qualifier]] if qualifier in aliases else tables):
+                    usage[key].star = True
+            elif token.kind in ('word', 'ident') and clause != 'from':
+                end, reference = self._reference(tokens, i, aliases, tables)
+                if reference:
+                    key, name = reference
+                    self._record(usage[key], clause, self._comparison(tokens, i, end, tables), name)
+                i = end
+                continue
+            i += 1
+        return aliases, usage
+
+    def _reference(self, tokens: List[Token], i: int, aliases: Dict[str, str],
+                   tables: List[str]) -> Tuple[int, Optional[Tuple[str, str]]]:
+        """(index after the reference, (table, column) or None) for a name at tokens[i]"""
+        token = tokens[i]
+        if i + 2 < len(tokens) and tokens[i + 1].value == '.' and tokens[i + 2].kind in ('word', 'ident'):
+            key = aliases.get(token.value.lower())
+            name = self.columns.get(key, {}).get(tokens[i + 2].value.lower())
+            return i + 3, (key, name) if name else None
+        if i + 1 < len(tokens) and tokens[i + 1].value == '(':
+            # A function call, not a column
+            return i + 1, None
+        if i > 0 and tokens[i - 1].value == '.':
+            return i + 1, None
+        matches = [key for key in tables if token.value.lower() in self.columns[key]]
+        if len(matches) != 1:
+            return i + 1, None
+        return i + 1, (matches[0], self.columns[matches[0]][token.value.lower()])
+
+    def _comparison(self, tokens: List[Token], start: int, end: int, tables: List[str]) -> Optional[str]:
+        """'equality', 'join' (equal to another column) or 'range' when tokens[start:end] is compared, else None"""
+        # (operator, index of the other operand's nearest token)
+        operators = []
+        # Operator after the reference: a run of adjacent op characters, or a keyword
+        j = end
+        while j < len(tokens) and tokens[j].kind == 'op' and (j == end or tokens[j].pos == tokens[j - 1].pos + 1):
+            j += 1
+        if j > end:
+            operators.append((''.join(token.value for token in tokens[end:j]), j))
+        elif end < len(tokens) and tokens[end].kind == 'word':
+            word = tokens[end].value.upper()
+            following = tokens[end + 1].value.upper() if end + 1 < len(tokens) else ''
+            if not (word == 'IS' and following == 'NOT'):
+                operators.append((word, end + 1))
+        # Operator before the reference (value = column)
+        j = start
+        while j > 0 and tokens[j - 1].kind == 'op' and (j == start or tokens[j].pos == tokens[j - 1].pos + 1):
+            j -= 1
+        if j < start:
+            operators.append((''.join(token.value for token in tokens[j:start]), j - 1))
+
+        for operator, operand in operators:
+            if operator in EQUALITY_OPERATORS:
+                return 'join' if self._is_column(tokens, operand, tables) else 'equality'
+        if any(operator in RANGE_OPERATORS for operator, _ in operators):
+            return 'range'
+        return None
+
+    def _is_column(self, tokens: List[Token], k: int, tables: List[str]) -> bool:
+        """Whether tokens[k] is (the first or last token of) a column reference"""
+        if not 0 <= k < len(tokens) or tokens[k].kind not in ('word', 'ident'):
+            return False
+        if k + 1 < len(tokens) and tokens[k + 1].value in ('.', '('):
+            return tokens[k + 1].value == '.'
+        if k > 0 and tokens[k - 1].value == '.':
+            return True
+        return any(tokens[k].value.lower() in self.columns[key] for key in tables)
+
+    def _record(self, usage: ColumnUsage, clause: str, comparison: Optional[str], name: str) -> None:
+        """File a column reference under its role"""
+        if clause == 'where' and comparison == 'equality':
+            _append(usage.equality, name)
+        elif clause == 'where' and comparison == 'join':
+            _append(usage.join, name)
+        elif clause == 'where' and comparison == 'range':
+            _append(usage.range, name)
+        elif clause == 'group':
+            _append(usage.group, name)
+        elif clause == 'order':
+            _append(usage.order, name)
+        elif clause != 'set':
+            # Assigned columns are written, not read: covering them only adds index maintenance
+            _append(usage.other, name)
+
+
+class IndexAdvisor:
+    """Proposes indexes for a query workload and verifies them on a scratch copy"""
+
+    def __init__(self, db_path: str, repeat: int = 3):
+        self.db_path = db_path
+        # Timed runs per query (best kept); 0 skips timing
+        self.repeat = repeat
+        self.parser = DDLParser()
+        self.tables: Dict[str, Table] = {}
+
+    def load_queries(self, query_file: str) -> List[str]:
+        """Statements of a query file (';'-separated, comments allowed)"""
+        with open(query_file, 'r', encoding='utf-8') as f:
+            return list(self.parser.split_text(f.read()))
+
+    def advise(self, queries: List[str]) -> Tuple[List[QueryReport], List[Recommendation]]:
+        """Explain every query, propose indexes, and keep the ones that remove a scan or temp B-tree"""
+        self.tables = {table.name.lower(): table for table in SQLiteSource(self.db_path).load()}
+        analyzer = QueryAnalyzer(self.tables)
+
+        scratch_dir = tempfile.mkdtemp(prefix='index_advisor_')
+        try:
+            conn = self._scratch_copy(os.path.join(scratch_dir, 'scratch.sqlite'))
+            try:
+                reports = []
+                parsed = []
+                candidates: Dict[Tuple[str, Tuple[str, ...]], List[int]] = {}
+                for number, sql in enumerate(queries, 1):
+                    tokens = list(tokenize(sql))
+                    parameters = null_parameters(tokens)
+                    report = QueryReport(sql)
+                    reports.append(report)
+                    parsed.append(parameters)
+                    try:
+                        plan = self.explain(conn, sql, parameters)
+                        report.seconds = self.time_query(conn, sql, parameters)
+                    except sqlite3.Error as e:
+                        report.error = str(e)
+                        continue
+                    report.issues = self.issues(plan)
+                    if report.issues:
+                        aliases, usage = analyzer.analyze(tokens)
+                        for key, columns in self.propose(plan, aliases, usage):
+                            candidates.setdefault((key, columns), []).append(number)
+
+                recommendations = self._merge(candidates)
+                for recommendation in recommendations:
+                    conn.execute(self.create_index_sql(recommendation))
+
+                used = set()
+                for report, parameters in zip(reports, parsed):
+                    if report.error:
+                        continue
+                    plan = self.explain(conn, report.sql, parameters)
+                    report.after_issues = self.issues(plan)
+                    report.after_seconds = self.time_query(conn, report.sql, parameters)
+                    if len(report.after_issues) < len(report.issues):
+                        used.update(match.group(1) for detail in plan for match in [USING_INDEX.search(detail)]
+                                    if match)
+                for recommendation in recommendations:
+                    recommendation.accepted = recommendation.index.name in used
+            finally:
+                conn.close()
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+        return reports, recommendations
+
+    def explain(self, conn: sqlite3.Connection, sql: str, parameters: Union[Tuple, Dict]) -> List[str]:
+        """Detail column of EXPLAIN QUERY PLAN"""
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)]
+
+    def issues(self, plan: List[str]) -> List[str]:
+        """Plan lines that an index could remove"""
+        return [detail for detail in plan if TABLE_SCAN.match(detail) or TEMP_BTREE.match(detail)]
+
+    def time_query(self, conn: sqlite3.Connection, sql: str, parameters: Union[Tuple, Dict]) -> Optional[float]:
+        """Best wall time of a read-only query (with NULL parameters); None for other statements"""
+        if not self.repeat or not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return None
+        best = float('inf')
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            conn.execute(sql, parameters).fetchall()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def propose(self, plan: List[str], aliases: Dict[str, str],
+                usage: Dict[str, ColumnUsage]) -> List[Tuple[str, Tuple[str, ...]]]:
+        """(table, index columns) for the scanned and sorted tables, and for every filtered table of the query"""
+        keys = []
+        for detail in plan:
+            match = TABLE_SCAN.match(detail)
+            if match and match.group(1).lower() in aliases:
+                _append(keys, aliases[match.group(1).lower()])
+            elif TEMP_BTREE.match(detail):
+                for key, columns in usage.items():
+                    if columns.group or columns.order:
+                        _append(keys, key)
+        # An index on a filtered table can change the join order and remove the scan of another
+        for key, columns in usage.items():
+            if columns.equality or columns.range:
+                _append(keys, key)
+
+        proposals = []
+        for key in keys:
+            columns = self.index_columns(self.tables[key], usage[key])
+            if columns:
+                proposals.append((key, columns))
+        return proposals
+
+    def index_columns(self, table: Table, usage: ColumnUsage) -> Tuple[str, ...]:
+        """Equality columns, join columns, then the GROUP BY, ORDER BY or first range column, then covered ones"""
+        columns = list(usage.equality)
+        for name in usage.join:
+            _append(columns, name)
+        if usage.group:
+            tail = usage.group
+        elif usage.order:
+            tail = usage.order
+        else:
+            tail = usage.range[:1]
+        for name in tail:
+            _append(columns, name)
+        if not columns:
+            return ()
+
+        # Every index carries the rowid, so an INTEGER PRIMARY KEY never needs covering
+        rowid = {name for name in table.primary_keys
+                 if len(table.primary_keys) == 1 and
+                 any(column.name == name and column.type.upper() == 'INTEGER' for column in table.columns)}
+        referenced = set(usage.join + usage.range + usage.order + usage.group + usage.other)
+        covered = [column.name for column in table.columns
+                   if column.name in referenced and column.name not in columns and column.name not in rowid]
+        if not usage.star and len(columns) + len(covered) <= MAX_INDEX_COLUMNS:
+            columns.extend(covered)
+        return tuple(name for name in columns if name not in rowid)
+
+    def create_index_sql(self, recommendation: Recommendation) -> str:
+        """CREATE INDEX statement for the scratch copy"""
+        columns = ', '.join(sql_identifier(name) for name in recommendation.index.columns)
+        return (f"CREATE INDEX {sql_identifier(recommendation.index.name)} "
+                f"ON {sql_identifier(recommendation.table)} ({columns})")
+
+    def tables_with(self, recommendations: List[Recommendation]) -> List[Table]:
+        """The database's tables with the accepted indexes added"""
+        added: Dict[str, List[Index]] = {}
+        for recommendation in recommendations:
+            if recommendation.accepted:
+                added.setdefault(recommendation.table.lower(), []).append(recommendation.index)
+        return [
+            make_table(table.name, table.columns, table.primary_keys, table.indexes + tuple(added[key]),
+                       table.schema, table.foreign_keys, table.comment) if key in added else table
+            for key, table in self.tables.items()
+        ]
+
+    def _merge(self, candidates: Dict[Tuple[str, Tuple[str, ...]], List[int]]) -> List[Recommendation]:
+        """One recommendation per distinct index; an index that is a prefix of another is folded into it"""
+        recommendations = []
+        for (key, columns), queries in sorted(candidates.items(), key=lambda item: (item[0][0], -len(item[0][1]))):
+            table = self.tables[key]
+            lowered = tuple(name.lower() for name in columns)
+            existing = [tuple(name.lower() for name in index.columns) for index in table.indexes]
+            if any(index[:len(lowered)] == lowered for index in existing):
+                continue
+            wider = next((recommendation for recommendation in recommendations
+                          if recommendation.table == table.name and
+                          tuple(name.lower() for name in recommendation.index.columns)[:len(lowered)] == lowered),
+                         None)
+            if wider:
+                wider.queries = sorted(set(wider.queries + queries))
+                continue
+            name = f"idx_{table.name}_{'_'.join(columns)}"
+            recommendations.append(Recommendation(table.name, make_index(name, columns), sorted(queries)))
+        return recommendations
+
+    def _scratch_copy(self, scratch_path: str) -> sqlite3.Connection:
+        """Copy the database (from a read-only snapshot) to a scratch file and open it"""
+        source = connect_snapshot(self.db_path)
+        conn = sqlite3.connect(scratch_path, isolation_level=None)
+        try:
+            source.backup(conn)
+        finally:
+            source.close()
+        return conn
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(
+        description="Propose and verify SQLite indexes for a file of application queries",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Queries are ';'-separated; parameters (?, :name) are explained and timed as NULL.
+Proposed indexes are created on a scratch copy of the database; only those that
+remove a full scan or temp B-tree from some query are kept.
+
+Examples:
+  # Report only
+  %(prog)s -d db.sqlite -q queries.sql
+
+  # Write the schema with the accepted indexes
+  %(prog)s -d db.sqlite -q queries.sql --ddl db.sql --hcl db.hcl
+        """
+    )
+    parser.add_argument('--database', '-d', default='db.sqlite', help='SQLite database (default: db.sqlite)')
+    parser.add_argument('--queries', '-q', required=True, help='File of application queries')
+    parser.add_argument('--ddl', help='Write the SQL DDL with the accepted indexes to this path')
+    parser.add_argument('--hcl', help='Write the HCL schema with the accepted indexes to this path')
+    parser.add_argument('--schema', '-s', default='main', help='HCL schema name (default: main)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per query, 0 to skip timing (default: 3)')
+
+    instrumentation.add_arguments(parser)
+
+    args = parser.parse_args()
+
+    print("🔎 Index Advisor")
+    print("=" * 30)
+    print(f"Database: {os.path.abspath(args.database)}")
+    print(f"Queries: {os.path.abspath(args.queries)}")
+    print()
+
+    try:
+        advisor = IndexAdvisor(args.database, args.repeat)
+        with instrumentation.instrumented('index_advisor', args):
+            with phase('read'):
+                queries = advisor.load_queries(args.queries)
+            with phase('advise'):
+                reports, recommendations = advisor.advise(queries)
+            instrumentation.count('queries', len(queries))
+            instrumentation.count('indexes', sum(1 for recommendation in recommendations if recommendation.accepted))
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    def timing(seconds: Optional[float]) -> str:
+        return f"{seconds * 1000:.3f} ms" if seconds is not None else "-"
+
+    for number, report in enumerate(reports, 1):
+        first_line = ' '.join(report.sql.split())
+        print(f"[{number}] {first_line[:100]}")
+        if report.error:
+            print(f"    ⚠️  {report.error}")
+        elif not report.issues:
+            print("    ✅ no scans or temp B-trees")
+        else:
+            print(f"    before: {'; '.join(report.issues)}  ({timing(report.seconds)})")
+            print(f"    after:  {'; '.join(report.after_issues) or 'no scans or temp B-trees'}  "
+                  f"({timing(report.after_seconds)})")
+    print()
+
+    accepted = [recommendation for recommendation in recommendations if recommendation.accepted]
+    for recommendation in recommendations:
+        mark = "✅" if recommendation.accepted else "➖ unused:"
+        queries = ', '.join(str(number) for number in recommendation.queries)
+        columns = ', '.join(recommendation.index.columns)
+        print(f"{mark} CREATE INDEX {recommendation.index.name} ON {recommendation.table} ({columns});"
+              f"  -- queries {queries}")
+    if not recommendations:
+        print("✅ No indexes to propose")
+
+    tables = advisor.tables_with(recommendations)
+    outputs = []
+    if args.ddl:
+        outputs.append((args.ddl, DDLSink().render(tables)))
+    if args.hcl:
+        outputs.append((args.hcl, HCLSink(args.schema).render(tables)))
+    for path, content in outputs:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"📄 {os.path.abspath(path)} ({len(accepted)} indexes added)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
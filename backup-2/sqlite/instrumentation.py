@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Instrumentation
+Per-phase metrics shared by every command line entry point: wall time, CPU
+time and allocations per phase (read, parse, introspect, map types, render,
+write) plus counters (tables, columns, bytes), written as JSON or Prometheus
+text, and an optional cProfile dump.
+
+Library code marks its phases with phase() and its counters with count();
+outside an instrumented run both are no-ops. Phases may nest: each one is
+charged only for its own (exclusive) time, so the phases add up to the run.
+The running metrics are a context variable: other threads (and concurrent
+runs in them) never charge phases to a run they are not part of.
+"""
+
+import contextlib
+import contextvars
+import cProfile
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Prefix of every Prometheus metric name
+PROMETHEUS_PREFIX = 'schema_converter'
+
+# Shared no-op context for phase() outside an instrumented run
+_NO_PHASE = contextlib.nullcontext()
+
+# The metrics of the running command in this context (thread), if it is instrumented
+_active: 'contextvars.ContextVar[Optional[Metrics]]' = contextvars.ContextVar('instrumentation_metrics',
+                                                                               default=None)
+
+
+@dataclass
+class PhaseStats:
+    """Exclusive cost of one phase, summed over its calls"""
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    # Net change in live allocated blocks (always measured, cheap)
+    allocated_blocks: int = 0
+    # Net traced bytes and highest traced memory while in the phase (--trace-allocations only)
+    allocated_bytes: int = 0
+    peak_traced_bytes: int = 0
+
+
+def phase(name: str):
+    """Context manager charging the enclosed work to a phase of the running command"""
+    metrics = _active.get()
+    return metrics.phase(name) if metrics is not None else _NO_PHASE
+
+
+def count(name: str, value: int = 1) -> None:
+    """Add to a counter of the running command (tables, columns, bytes_in, bytes_out, ...)"""
+    metrics = _active.get()
+    if metrics is not None:
+        metrics.count(name, value)
+
+
+class Metrics:
+    """Phases and counters of one command run"""
+
+    def __init__(self, command: str, trace_allocations: bool = False):
+        self.command = command
+        self.trace_allocations = trace_allocations
+        self.phases: Dict[str, PhaseStats] = {}
+        self.counters: Dict[str, int] = {}
+        # Open phases: [name, wall, cpu, blocks, traced bytes] at the time each was last resumed
+        self._stack: List[List[Any]] = []
+        self._start = (time.perf_counter(), time.process_time())
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.max_rss_bytes: Optional[int] = None
+
+    def _clocks(self) -> List[Any]:
+        traced = tracemalloc.get_traced_memory()[0] if self.trace_allocations else 0
+        return [time.perf_counter(), time.process_time(), sys.getallocatedblocks(), traced]
+
+    def _charge(self, frame: List[Any], now: List[Any]) -> None:
+        """Charge the time since frame was resumed to its phase"""
+        stats = self.phases[frame[0]]
+        stats.wall_seconds += now[0] - frame[1]
+        stats.cpu_seconds += now[1] - frame[2]
+        stats.allocated_blocks += now[2] - frame[3]
+        if self.trace_allocations:
+            stats.allocated_bytes += now[3] - frame[4]
+            stats.peak_traced_bytes = max(stats.peak_traced_bytes, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Charge the enclosed work to name; an enclosing phase is paused meanwhile"""
+        self.phases.setdefault(name, PhaseStats())
+        now = self._clocks()
+        if self._stack:
+            self._charge(self._stack[-1], now)
+        self._stack.append([name] + now)
+        try:
+            yield
+        finally:
+            now = self._clocks()
+            frame = self._stack.pop()
+            self._charge(frame, now)
+            self.phases[name].calls += 1
+            if self._stack:
+                self._stack[-1][1:] = now
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add to a counter"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish(self) -> None:
+        """Record the totals of the run"""
+        self.wall_seconds = time.perf_counter() - self._start[0]
+        self.cpu_seconds = time.process_time() - self._start[1]
+        if resource is not None:
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # Kilobytes on Linux, bytes on macOS
+            self.max_rss_bytes = max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready metrics"""
+        return {
+            'command': self.command,
+            'wall_seconds': round(self.wall_seconds, 6),
+            'cpu_seconds': round(self.cpu_seconds, 6),
+            'max_rss_bytes': self.max_rss_bytes,
+            'phases': {name: {key: round(value, 6) if isinstance(value, float) else value
+                              for key, value in asdict(stats).items()}
+                       for name, stats in self.phases.items()},
+            'counters': dict(self.counters),
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (e.g. for the node_exporter textfile collector)"""
+        command = self.command.replace('\\', '\\\\').replace('"', '\\"')
+        lines = []
+
+        def family(name: str, help_text: str, samples: List[Any]) -> None:
+            metric = f'{PROMETHEUS_PREFIX}_{name}'
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} gauge')
+            for labels, value in samples:
+                label_text = ','.join([f'command="{command}"'] + [f'{key}="{val}"' for key, val in labels])
+                lines.append(f'{metric}{{{label_text}}} {value}')
+
+        family('run_wall_seconds', 'Wall time of the whole run', [((), self.wall_seconds)])
+        family('run_cpu_seconds', 'CPU time of the whole run', [((), self.cpu_seconds)])
+        if self.max_rss_bytes is not None:
+            family('run_max_rss_bytes', 'Peak resident set size of the process', [((), self.max_rss_bytes)])
+        fields = [
+            ('calls', 'Times the phase was entered'),
+            ('wall_seconds', 'Exclusive wall time per phase'),
+            ('cpu_seconds', 'Exclusive CPU time per phase'),
+            ('allocated_blocks', 'Net change in allocated memory blocks per phase'),
+        ]
+        if self.trace_allocations:
+            fields.append(('allocated_bytes', 'Net traced allocated bytes per phase'))
+            fields.append(('peak_traced_bytes', 'Highest traced memory while in the phase'))
+        for field_name, help_text in fields:
+            family(f'phase_{field_name}', help_text,
+                   [((('phase', name),), getattr(stats, field_name)) for name, stats in self.phases.items()])
+        family('count', 'Items processed (tables, columns, bytes)',
+               [((('name', name),), value) for name, value in self.counters.items()])
+        return '\n'.join(lines) + '\n'
+
+    def report(self) -> str:
+        """Human-readable phase table"""
+        lines = [f"{'phase':<14} {'calls':>7} {'wall s':>9} {'cpu s':>9} {'blocks':>10}"
+                 + (f" {'alloc MB':>9} {'peak MB':>9}" if self.trace_allocations else '')]
+        for name, stats in self.phases.items():
+            line = (f"{name:<14} {stats.calls:>7} {stats.wall_seconds:>9.4f} {stats.cpu_seconds:>9.4f} "
+                    f"{stats.allocated_blocks:>10}")
+            if self.trace_allocations:
+                line += (f" {stats.allocated_bytes / (1024 * 1024):>9.2f}"
+                         f" {stats.peak_traced_bytes / (1024 * 1024):>9.2f}")
+            lines.append(line)
+        lines.append(f"{'total':<14} {'':>7} {self.wall_seconds:>9.4f} {self.cpu_seconds:>9.4f}")
+        if self.counters:
+            lines.append(', '.join(f"{name}: {value}" for name, value in self.counters.items()))
+        return '\n'.join(lines)
+
+    def write(self, path: str, output_format: Optional[str] = None) -> None:
+        """Write JSON, or Prometheus text for .prom paths (output_format overrides the extension)"""
+        if output_format is None:
+            output_format = 'prometheus' if path.endswith('.prom') else 'json'
+        content = self.to_prometheus() if output_format == 'prometheus' else json.dumps(self.to_dict(), indent=2)
+        # Write-then-rename, so a textfile collector never reads a partial file; the temporary
+        # file is our own, so concurrent runs writing the same path never mix their content
+        directory = os.path.dirname(path) or '.'
+        fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            # mkstemp creates the file private; collectors usually run as another user
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+def add_arguments(parser) -> None:
+    """Add the instrumentation options to an entry point's argument parser"""
+    group = parser.add_argument_group('instrumentation')
+    group.add_argument('--profile', action='store_true', help='Print wall/CPU time per phase at the end')
+    group.add_argument('--metrics-out', help='Write per-phase metrics to this path (.prom: Prometheus, else JSON)')
+    group.add_argument('--metrics-format', choices=('json', 'prometheus'),
+                       help='Metrics format, overriding the --metrics-out extension')
+    group.add_argument('--cprofile', help='Write a cProfile dump (pstats format) to this path')
+    group.add_argument('--trace-allocations', action='store_true',
+                       help='Also trace allocated bytes per phase (tracemalloc; slows the run down)')
+
+
+@contextlib.contextmanager
+def instrumented(command: str, args) -> Iterator[Optional[Metrics]]:
+    """Instrument the enclosed run as requested by the add_arguments() options"""
+    if not (args.profile or args.metrics_out or args.cprofile):
+        yield None
+        return
+
+    if args.trace_allocations:
+        tracemalloc.start()
+    metrics = Metrics(command, args.trace_allocations)
+    profiler = cProfile.Profile() if args.cprofile else None
+    token = _active.set(metrics)
+    if profiler:
+        profiler.enable()
+    try:
+        yield metrics
+    finally:
+        if profiler:
+            profiler.disable()
+        _active.reset(token)
+        metrics.finish()
+        if args.trace_allocations:
+            tracemalloc.stop()
+
+        if profiler:
+            profiler.dump_stats(args.cprofile)
+            print(f"📈 cProfile dump: {os.path.abspath(args.cprofile)}")
+        if args.metrics_out:
+            metrics.write(args.metrics_out, args.metrics_format)
+            print(f"📈 Metrics: {os.path.abspath(args.metrics_out)}")
+        if args.profile:
+            print()
+            print(metrics.report())
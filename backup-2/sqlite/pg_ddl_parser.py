@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+PostgreSQL DDL Parser
+Reads PostgreSQL DDL (hand written or pg_dump --schema-only) into the shared
+schema model, so Postgres schemas convert to HCL/Sea-ORM without a round
+trip through `atlas schema inspect` against a live server
+
+Understands schema-qualified and quoted names (unquoted names fold to lower
+case), identity and serial columns, CHECK (skipped), REFERENCES / FOREIGN
+KEY, UNIQUE, CREATE INDEX, COMMENT ON and the ALTER TABLE forms pg_dump
+emits. Types are stored in the model's SQL spelling (int4 -> INTEGER,
+character varying(n) -> VARCHAR(n), bytea -> BLOB, ...).
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ddl_parser import DDLParser, Token, _is_punct, _is_word, _render
+from schema_ir import (ForeignKey, Index, Table, make_column, make_foreign_key, make_index,
+                       make_table)
+
+
+# PostgreSQL type names (and aliases) -> model spelling; anything else is kept as written
+PG_TYPES = {
+    'INT': 'INTEGER',
+    'INT4': 'INTEGER',
+    'INT2': 'SMALLINT',
+    'INT8': 'BIGINT',
+    'SERIAL': 'INTEGER',
+    'SERIAL4': 'INTEGER',
+    'SMALLSERIAL': 'SMALLINT',
+    'SERIAL2': 'SMALLINT',
+    'BIGSERIAL': 'BIGINT',
+    'SERIAL8': 'BIGINT',
+    'BOOL': 'BOOLEAN',
+    'FLOAT4': 'REAL',
+    'FLOAT8': 'DOUBLE',
+    'DOUBLE PRECISION': 'DOUBLE',
+    'NUMERIC': 'DECIMAL',
+    'CHARACTER VARYING': 'VARCHAR',
+    'CHARACTER': 'CHAR',
+    'BPCHAR': 'CHAR',
+    'TIMESTAMP WITHOUT TIME ZONE': 'TIMESTAMP',
+    'TIMESTAMP WITH TIME ZONE': 'TIMESTAMPTZ',
+    'TIME WITHOUT TIME ZONE': 'TIME',
+    'TIME WITH TIME ZONE': 'TIMETZ',
+    'BYTEA': 'BLOB',
+}
+
+# Schema of unqualified table names (PostgreSQL's default search_path)
+DEFAULT_SCHEMA = 'public'
+
+# Serial pseudo-types: an integer column backed by a sequence
+SERIAL_TYPES = {'SERIAL', 'SERIAL4', 'SMALLSERIAL', 'SERIAL2', 'BIGSERIAL', 'SERIAL8'}
+
+# Words that end a column type (or a DEFAULT expression) and start the next column constraint
+PG_CONSTRAINT_WORDS = {
+    'CONSTRAINT', 'PRIMARY', 'NOT', 'NULL', 'UNIQUE', 'CHECK', 'DEFAULT',
+    'COLLATE', 'REFERENCES', 'GENERATED',
+}
+
+# Computed defaults with a SQLite spelling; any other expression is kept parenthesised
+PG_DEFAULTS = {
+    'now()': 'CURRENT_TIMESTAMP',
+    'transaction_timestamp()': 'CURRENT_TIMESTAMP',
+    'LOCALTIMESTAMP': 'CURRENT_TIMESTAMP',
+    'LOCALTIME': 'CURRENT_TIME',
+    'CURRENT_TIMESTAMP': 'CURRENT_TIMESTAMP',
+    'CURRENT_TIME': 'CURRENT_TIME',
+    'CURRENT_DATE': 'CURRENT_DATE',
+}
+
+# Referential actions, as the model spells them
+FK_ACTIONS = {'CASCADE', 'RESTRICT', 'NO ACTION', 'SET NULL', 'SET DEFAULT'}
+
+
+def _identifier(token: Token) -> str:
+    """Identifier value: quoted names are kept, unquoted ones fold to lower case like PostgreSQL does"""
+    return token.value.lower() if token.kind == 'word' else token.value
+
+
+def _skip_parens(tokens: List[Token], i: int) -> int:
+    """Index after the parenthesised group starting at tokens[i] (i itself if there is none)"""
+    if i >= len(tokens) or not _is_punct(tokens[i], '('):
+        return i
+    depth = 0
+    while i < len(tokens):
+        if _is_punct(tokens[i], '('):
+            depth += 1
+        elif _is_punct(tokens[i], ')'):
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _name_list(tokens: List[Token], i: int) -> Tuple[List[str], int]:
+    """Plain column names of a parenthesised list at tokens[i]; an expression element makes the list empty"""
+    if i >= len(tokens) or not _is_punct(tokens[i], '('):
+        return [], i
+    end = _skip_parens(tokens, i)
+    names: List[str] = []
+    element: List[Token] = []
+    for token in tokens[i + 1:end - 1] + [Token('punct', ',', -1)]:
+        if _is_punct(token, ','):
+            # Sort order and operator class words after the name are ignored
+            if not element or element[0].kind not in ('word', 'ident') or _is_punct(element[-1], ')'):
+                return [], end
+            names.append(_identifier(element[0]))
+            element = []
+        else:
+            element.append(token)
+    return names, end
+
+
+class _TableDraft:
+    """A table under construction: later statements (ALTER, CREATE INDEX, COMMENT ON) still change it"""
+
+    def __init__(self, name: str, schema: str):
+        self.name = name
+        self.schema = schema
+        # Column keyword arguments for make_column(), in declaration order
+        self.columns: Dict[str, Dict] = {}
+        self.primary_keys: List[str] = []
+        self.indexes: List[Index] = []
+        # (columns, referenced (schema, table), referenced columns or None for its primary key, on update, on delete)
+        self.foreign_keys: List[Tuple[List[str], Tuple[str, str], Optional[List[str]], str, str]] = []
+        self.comment: Optional[str] = None
+
+
+# Drafts by (schema, table name); unqualified names resolve to DEFAULT_SCHEMA
+_Drafts = Dict[Tuple[str, str], _TableDraft]
+
+
+def _table_key(parts: List[str]) -> Tuple[str, str]:
+    """(schema, table) of a [schema.]table name (a database qualifier before the schema is ignored)"""
+    return (parts[-2] if len(parts) > 1 else DEFAULT_SCHEMA), parts[-1]
+
+
+class PostgresDDLParser(DDLParser):
+    """Parser for PostgreSQL DDL files (same interface as DDLParser)"""
+
+    def parse_content(self, content: str) -> List[Table]:
+        """Parse DDL content; tables are built once every statement that may change them has been read
+
+        The model has one namespace, so tables of the same name in two schemas
+        are rejected rather than one silently replacing the other.
+        """
+        drafts: _Drafts = {}
+        for statement in self.split_statements(content):
+            self._parse_pg_statement(statement, drafts)
+        seen: Dict[str, _TableDraft] = {}
+        for draft in drafts.values():
+            other = seen.setdefault(draft.name, draft)
+            if other is not draft:
+                raise ValueError(f"Tables {other.schema}.{other.name} and {draft.schema}.{draft.name} "
+                                 f"would both be written as {draft.name}")
+        self.tables = [self._build(draft, drafts) for draft in drafts.values()]
+        return self.tables
+
+    def iter_file(self, file_path: str, chunk_size: int = 0) -> Iterator[Table]:
+        """Tables of a file; CREATE INDEX, ALTER TABLE and COMMENT ON may follow the table anywhere, so not streamed"""
+        yield from self.parse_file(file_path)
+
+    def parse_statement(self, statement: List[Token]) -> Optional[Table]:
+        """Parse one CREATE TABLE statement on its own"""
+        drafts: _Drafts = {}
+        self._parse_pg_statement(statement, drafts)
+        return next((self._build(draft, drafts) for draft in drafts.values()), None)
+
+    # ------------------------------------------------------------------ statements
+
+    def _parse_pg_statement(self, statement: List[Token], drafts: _Drafts) -> None:
+        """Apply one statement to the drafts; statements that do not describe tables are ignored"""
+        if not statement:
+            return
+        if _is_word(statement[0], 'CREATE'):
+            i = 1
+            while i < len(statement) and _is_word(statement[i], 'GLOBAL', 'LOCAL', 'TEMP', 'TEMPORARY',
+                                                   'UNLOGGED', 'UNIQUE'):
+                i += 1
+            if i < len(statement) and _is_word(statement[i], 'TABLE'):
+                self._create_table(statement, i + 1, drafts)
+            elif i < len(statement) and _is_word(statement[i], 'INDEX'):
+                self._create_index(statement, i + 1, _is_word(statement[i - 1], 'UNIQUE'), drafts)
+        elif _is_word(statement[0], 'ALTER') and len(statement) > 1 and _is_word(statement[1], 'TABLE'):
+            self._alter_table(statement, drafts)
+        elif _is_word(statement[0], 'COMMENT') and len(statement) > 2 and _is_word(statement[1], 'ON'):
+            self._comment_on(statement, drafts)
+
+    def _qualified_name(self, tokens: List[Token], i: int) -> Tuple[List[str], int]:
+        """Dotted name parts starting at tokens[i] (IF [NOT] EXISTS and ONLY skipped)"""
+        while i < len(tokens) and _is_word(tokens[i], 'IF', 'NOT', 'EXISTS', 'ONLY'):
+            i += 1
+        parts = []
+        while i < len(tokens) and tokens[i].kind in ('word', 'ident'):
+            parts.append(_identifier(tokens[i]))
+            i += 1
+            if i < len(tokens) and _is_punct(tokens[i], '.'):
+                i += 1
+            else:
+                break
+        return parts, i
+
+    def _create_table(self, tokens: List[Token], i: int, drafts: _Drafts) -> None:
+        parts, i = self._qualified_name(tokens, i)
+        # CREATE TABLE ... AS / PARTITION OF / OF type have no column list to read
+        if not parts or i >= len(tokens) or not _is_punct(tokens[i], '('):
+            return
+        schema, name = _table_key(parts)
+        draft = _TableDraft(name, schema)
+        drafts[schema, name] = draft
+
+        # Split the body into column/constraint definitions at top-level commas (one pass over the tokens)
+        definition: List[Token] = []
+        depth = 0
+        for token in tokens[i + 1:]:
+            if token.kind == 'punct':
+                if token.value == '(':
+                    depth += 1
+                elif token.value == ')':
+                    if depth == 0:
+                        break
+                    depth -= 1
+                elif token.value == ',' and depth == 0:
+                    self._definition(draft, definition)
+                    definition = []
+                    continue
+            definition.append(token)
+        self._definition(draft, definition)
+
+    def _definition(self, draft: _TableDraft, definition: List[Token]) -> None:
+        """One column or table constraint of a CREATE TABLE body"""
+        if not definition:
+            return
+        if _is_word(definition[0], 'CONSTRAINT', 'PRIMARY', 'UNIQUE', 'CHECK', 'FOREIGN', 'EXCLUDE'):
+            self._table_constraint(draft, definition, 0)
+        elif not _is_word(definition[0], 'LIKE'):
+            self._pg_column(draft, definition)
+
+    def _create_index(self, tokens: List[Token], i: int, unique: bool, drafts: _Drafts) -> None:
+        """CREATE [UNIQUE] INDEX [CONCURRENTLY] [IF NOT EXISTS] [name] ON [ONLY] table [USING method] (columns)"""
+        if i < len(tokens) and _is_word(tokens[i], 'CONCURRENTLY'):
+            i += 1
+        name_parts: List[str] = []
+        if i < len(tokens) and not _is_word(tokens[i], 'ON'):
+            name_parts, i = self._qualified_name(tokens, i)
+        if i >= len(tokens) or not _is_word(tokens[i], 'ON'):
+            return
+        table_parts, i = self._qualified_name(tokens, i + 1)
+        draft = drafts.get(_table_key(table_parts)) if table_parts else None
+        if draft is None:
+            return
+        if i + 1 < len(tokens) and _is_word(tokens[i], 'USING'):
+            i += 2
+        columns, _ = _name_list(tokens, i)
+        # Expression indexes cannot be expressed by column names
+        if columns:
+            name = name_parts[-1] if name_parts else f"{draft.name}_{'_'.join(columns)}_idx"
+            draft.indexes.append(make_index(name, columns, unique))
+
+    def _alter_table(self, tokens: List[Token], drafts: _Drafts) -> None:
+        """The ALTER TABLE forms pg_dump writes: ADD CONSTRAINT / COLUMN and ALTER COLUMN (identity, default, not null)"""
+        parts, i = self._qualified_name(tokens, 2)
+        draft = drafts.get(_table_key(parts)) if parts else None
+        if draft is None:
+            return
+        # Comma-separated actions
+        action: List[Token] = []
+        depth = 0
+        for token in tokens[i:] + [Token('punct', ',', -1)]:
+            if _is_punct(token, '('):
+                depth += 1
+            elif _is_punct(token, ')'):
+                depth -= 1
+            elif _is_punct(token, ',') and depth == 0:
+                self._alter_action(draft, action)
+                action = []
+                continue
+            action.append(token)
+
+    def _alter_action(self, draft: _TableDraft, action: List[Token]) -> None:
+        if len(action) < 2:
+            return
+        if _is_word(action[0], 'ADD') and _is_word(action[1], 'CONSTRAINT', 'PRIMARY', 'UNIQUE', 'FOREIGN'):
+            self._table_constraint(draft, action, 1)
+            return
+        if _is_word(action[0], 'ADD'):
+            i = 2 if _is_word(action[1], 'COLUMN') else 1
+            while i < len(action) and _is_word(action[i], 'IF', 'NOT', 'EXISTS'):
+                i += 1
+            self._pg_column(draft, action[i:])
+            return
+        if not _is_word(action[0], 'ALTER'):
+            return
+        i = 2 if _is_word(action[1], 'COLUMN') else 1
+        if i >= len(action):
+            return
+        column = draft.columns.get(_identifier(action[i]))
+        if column is None:
+            return
+        rest = action[i + 1:]
+        if len(rest) > 1 and _is_word(rest[0], 'ADD') and _is_word(rest[1], 'GENERATED'):
+            column['auto_increment'] = True
+        elif len(rest) > 2 and _is_word(rest[0], 'SET') and _is_word(rest[1], 'DEFAULT'):
+            self._apply_default(column, rest, 2)
+        elif len(rest) > 2 and _is_word(rest[0], 'SET') and _is_word(rest[1], 'NOT'):
+            column['nullable'] = False
+        elif len(rest) > 1 and _is_word(rest[0], 'DROP') and _is_word(rest[1], 'DEFAULT'):
+            column['default'] = None
+
+    def _comment_on(self, tokens: List[Token], drafts: _Drafts) -> None:
+        """COMMENT ON TABLE name IS '...' / COMMENT ON COLUMN table.column IS '...' (NULL removes it)"""
+        if not _is_word(tokens[2], 'TABLE', 'COLUMN'):
+            return
+        parts, i = self._qualified_name(tokens, 3)
+        if i + 1 >= len(tokens) or not _is_word(tokens[i], 'IS'):
+            return
+        text = tokens[i + 1].value[1:-1].replace("''", "'") if tokens[i + 1].kind == 'string' else None
+        if _is_word(tokens[2], 'TABLE'):
+            draft = drafts.get(_table_key(parts)) if parts else None
+            if draft is not None:
+                draft.comment = text
+        elif len(parts) >= 2 and _table_key(parts[:-1]) in drafts:
+            column = drafts[_table_key(parts[:-1])].columns.get(parts[-1])
+            if column is not None:
+                column['comment'] = text
+
+    # ------------------------------------------------------------------ definitions
+
+    def _pg_column(self, draft: _TableDraft, definition: List[Token]) -> None:
+        """Column definition: name, type, then constraints in any order"""
+        if len(definition) < 2 or definition[0].kind not in ('word', 'ident'):
+            return
+        name = _identifier(definition[0])
+        column_type, serial, i = self._parse_type(definition, 1)
+        if not column_type:
+            return
+        column = {'name': name, 'type': column_type, 'nullable': True, 'primary_key': False,
+                  'auto_increment': serial, 'default': None, 'comment': None}
+        draft.columns[name] = column
+
+        end = len(definition)
+        while i < end:
+            token = definition[i]
+            i += 1
+            if token.kind != 'word':
+                continue
+            word = token.value.upper()
+            if word == 'CONSTRAINT' or word == 'COLLATE':
+                i += 1
+            elif word == 'NOT' and i < end and _is_word(definition[i], 'NULL'):
+                column['nullable'] = False
+                i += 1
+            elif word == 'PRIMARY':
+                draft.primary_keys.append(name)
+            elif word == 'UNIQUE':
+                draft.indexes.append(make_index(f"{draft.name}_{name}_key", [name], True))
+            elif word == 'DEFAULT':
+                i = self._apply_default(column, definition, i)
+            elif word == 'GENERATED':
+                # GENERATED {ALWAYS | BY DEFAULT} AS IDENTITY [(sequence options)] or AS (expression) STORED
+                while i < end and not _is_word(definition[i], 'AS'):
+                    i += 1
+                i += 1
+                if i < end and _is_word(definition[i], 'IDENTITY'):
+                    column['auto_increment'] = True
+                    i += 1
+                i = _skip_parens(definition, i)
+            elif word == 'CHECK':
+                i = _skip_parens(definition, i)
+            elif word == 'REFERENCES':
+                i = self._references(draft, [name], definition, i)
+
+    def _parse_type(self, definition: List[Token], i: int) -> Tuple[str, bool, int]:
+        """(model type, whether it is a serial pseudo-type, next index)"""
+        words: List[str] = []
+        arguments: List[Token] = []
+        array = ''
+        while i < len(definition):
+            token = definition[i]
+            kind = token.kind
+            if kind == 'word':
+                word = token.value.upper()
+                if word in PG_CONSTRAINT_WORDS:
+                    break
+                words.append(word)
+                i += 1
+            elif kind == 'ident' and not words:
+                # Quoted type name ("char", user-defined types)
+                words.append(token.value)
+                i += 1
+            elif _is_punct(token, '(') and words:
+                end = _skip_parens(definition, i)
+                arguments = definition[i:end]
+                i = end
+            elif token.kind == 'ident' and token.value == '':
+                # [] lexes as an empty bracketed identifier
+                array += '[]'
+                i += 1
+            elif _is_punct(token, '.') and words:
+                # Schema-qualified type: keep the type name only
+                words = []
+                i += 1
+            else:
+                break
+        if not words:
+            return '', False, i
+        name = ' '.join(words)
+        column_type = PG_TYPES.get(name, name) + (_render(arguments) if arguments else '') + array
+        return column_type, name in SERIAL_TYPES and not array, i
+
+    def _apply_default(self, column: Dict, definition: List[Token], i: int) -> int:
+        """Read a DEFAULT expression into the column; nextval() defaults mark the column auto-increment
+
+        Literals are stored as written; function calls and other expressions
+        are stored parenthesised (the model's marker for a computed default).
+        """
+        start = i
+        depth = 0
+        while i < len(definition):
+            token = definition[i]
+            if _is_punct(token, '('):
+                depth += 1
+            elif _is_punct(token, ')'):
+                depth -= 1
+            elif depth == 0 and i > start and _is_word(token, *PG_CONSTRAINT_WORDS):
+                break
+            i += 1
+        expression = definition[start:i]
+
+        # Drop ::type casts at the top level ('x'::text, '{}'::jsonb)
+        tokens: List[Token] = []
+        j = 0
+        while j < len(expression):
+            if (expression[j].value == ':' and j + 1 < len(expression) and expression[j + 1].value == ':'):
+                _, _, j = self._parse_type(expression, j + 2)
+                continue
+            tokens.append(expression[j])
+            j += 1
+
+        if tokens and _is_word(tokens[0], 'NEXTVAL'):
+            column['auto_increment'] = True
+            column['default'] = None
+        elif len(tokens) == 2 and tokens[0].kind == 'op' and tokens[0].value in '+-':
+            column['default'] = tokens[0].value + tokens[1].value
+        elif len(tokens) == 1 and (tokens[0].kind != 'word' or _is_word(tokens[0], 'TRUE', 'FALSE', 'NULL')):
+            token = tokens[0]
+            column['default'] = f'"{token.value}"' if token.kind == 'ident' else token.value
+        elif tokens:
+            expression = _render(tokens)
+            column['default'] = PG_DEFAULTS.get(expression.upper() if len(tokens) == 1 else expression.lower(),
+                                                f'({expression})')
+        return i
+
+    def _table_constraint(self, draft: _TableDraft, definition: List[Token], i: int) -> None:
+        """[CONSTRAINT name] PRIMARY KEY (...) | UNIQUE (...) | FOREIGN KEY (...) REFERENCES ... | CHECK (...)"""
+        name = None
+        if i + 1 < len(definition) and _is_word(definition[i], 'CONSTRAINT'):
+            name = _identifier(definition[i + 1])
+            i += 2
+        if i >= len(definition):
+            return
+        token = definition[i]
+        if _is_word(token, 'PRIMARY'):
+            columns, _ = _name_list(definition, i + 2)
+            draft.primary_keys = columns
+        elif _is_word(token, 'UNIQUE'):
+            j = i + 1
+            if j < len(definition) and _is_word(definition[j], 'NULLS'):
+                j += 3
+            columns, _ = _name_list(definition, j)
+            if columns:
+                draft.indexes.append(make_index(name or f"{draft.name}_{'_'.join(columns)}_key", columns, True))
+        elif _is_word(token, 'FOREIGN'):
+            columns, j = _name_list(definition, i + 2)
+            if columns and j < len(definition) and _is_word(definition[j], 'REFERENCES'):
+                self._references(draft, columns, definition, j + 1)
+
+    def _references(self, draft: _TableDraft, columns: List[str], definition: List[Token], i: int) -> int:
+        """REFERENCES table [(columns)] [MATCH ...] [ON DELETE action] [ON UPDATE action]; returns the next index"""
+        parts, i = self._qualified_name(definition, i)
+        ref_columns = None
+        if i < len(definition) and _is_punct(definition[i], '('):
+            ref_columns, i = _name_list(definition, i)
+        on_update = on_delete = "NO ACTION"
+        while i < len(definition):
+            if _is_word(definition[i], 'MATCH'):
+                i += 2
+            elif _is_word(definition[i], 'ON') and i + 2 < len(definition):
+                event = definition[i + 1].value.upper()
+                words = [definition[i + 2].value.upper()]
+                i += 3
+                if i < len(definition) and ' '.join(words + [definition[i].value.upper()]) in FK_ACTIONS:
+                    words.append(definition[i].value.upper())
+                    i += 1
+                if event == 'DELETE':
+                    on_delete = ' '.join(words)
+                elif event == 'UPDATE':
+                    on_update = ' '.join(words)
+            else:
+                break
+        if parts:
+            draft.foreign_keys.append((columns, _table_key(parts), ref_columns, on_update, on_delete))
+        return i
+
+    def _build(self, draft: _TableDraft, drafts: _Drafts) -> Table:
+        """The immutable table of a finished draft"""
+        primary_keys = set(draft.primary_keys)
+        columns = [
+            # Primary key columns are NOT NULL in PostgreSQL whether or not it is spelled out
+            make_column(**dict(column, nullable=column['nullable'] and column['name'] not in primary_keys))
+            for column in draft.columns.values()
+        ]
+        foreign_keys: List[ForeignKey] = []
+        for fk_columns, ref_key, ref_columns, on_update, on_delete in draft.foreign_keys:
+            if ref_columns is None:
+                # No column list: the referenced table's primary key
+                referenced = drafts.get(ref_key)
+                ref_columns = referenced.primary_keys if referenced and referenced.primary_keys else ['id']
+            foreign_keys.append(make_foreign_key(fk_columns, ref_key[1], ref_columns, on_update, on_delete))
+        return make_table(draft.name, columns, draft.primary_keys, draft.indexes, draft.schema,
+                          foreign_keys, draft.comment)
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Schema Pipeline
+In-process conversion API: one source stage (SQLite file, DDL text, HCL text)
+feeds the parsed schema model to any number of sink stages (DDL, HCL,
+Sea-ORM, JSON) without intermediate files or re-parsing
+"""
+
+import json
+import os
+import sys
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+from schema_ir import Table
+from ddl_parser import DDLParser
+from pg_ddl_parser import PostgresDDLParser
+from hcl_to_ddl import HCLParser, HCLToDDLConverter
+from ddl_to_hcl import DDLToHCLConverter
+from ddl_to_seaorm import DDLToSeaORMGenerator
+import instrumentation
+from instrumentation import phase
+from sqlite_introspect import SQLiteToHCLConverter
+
+
+# ----------------------------------------------------------------------------- Sources
+
+# DDL parser per SQL dialect
+DDL_DIALECTS = {
+    'sqlite': DDLParser,
+    'postgres': PostgresDDLParser,
+}
+
+
+class Source:
+    """A pipeline source: produces the schema model once"""
+    name = "source"
+    # Instrumentation phase charged with load()
+    phase_name = "parse"
+
+    def load(self) -> List[Table]:
+        raise NotImplementedError
+
+
+class SQLiteSource(Source):
+    """Introspects a SQLite database (one batched catalog read from a read-only snapshot)"""
+    name = "sqlite"
+    phase_name = "introspect"
+
+    def __init__(self, db_path: str, immutable: bool = False):
+        self.db_path = db_path
+        self.immutable = immutable
+
+    def load(self) -> List[Table]:
+        converter = SQLiteToHCLConverter()
+        conn = converter.connect_to_database(self.db_path, snapshot=True, immutable=self.immutable)
+        try:
+            return converter.get_all_tables(conn)
+        finally:
+            conn.close()
+
+
+class DDLSource(Source):
+    """Parses SQL DDL text (SQLite or PostgreSQL dialect)"""
+    name = "ddl"
+
+    def __init__(self, content: str, dialect: str = "sqlite"):
+        if dialect not in DDL_DIALECTS:
+            raise ValueError(f"Unknown SQL dialect: {dialect} (expected one of: {', '.join(DDL_DIALECTS)})")
+        self.content = content
+        self.dialect = dialect
+
+    @classmethod
+    def from_file(cls, path: str, dialect: str = "sqlite") -> 'DDLSource':
+        with phase('read'), open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read(), dialect)
+
+    def load(self) -> List[Table]:
+        return DDL_DIALECTS[self.dialect]().parse_content(self.content)
+
+
+class DumpSource(Source):
+    """Reads the schema of a full sqlite3 .dump, skipping its data without decoding it"""
+    name = "dump"
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> List[Table]:
+        return DDLParser().parse_dump(self.path)
+
+
+class HCLSource(Source):
+    """Parses Atlas HCL text"""
+    name = "hcl"
+
+    def __init__(self, content: str):
+        self.content = content
+
+    @classmethod
+    def from_file(cls, path: str) -> 'HCLSource':
+        with phase('read'), open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read())
+
+    def load(self) -> List[Table]:
+        return HCLParser().parse_content(self.content)
+
+
+def open_source(path: str) -> Source:
+    """Pick the source for a schema file by extension (database, HCL, dump, otherwise SQL DDL)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.sqlite', '.sqlite3', '.db'):
+        return SQLiteSource(path)
+    if extension == '.hcl':
+        return HCLSource.from_file(path)
+    if extension == '.dump':
+        return DumpSource(path)
+    return DDLSource.from_file(path)
+
+
+# ----------------------------------------------------------------------------- Sinks
+
+class Sink:
+    """A pipeline sink: renders the schema model to text"""
+    name = "sink"
+
+    def render(self, tables: List[Table]) -> str:
+        raise NotImplementedError
+
+
+class DDLSink(Sink):
+    """SQL DDL (CREATE TABLE / CREATE INDEX)"""
+    name = "ddl"
+
+    def render(self, tables: List[Table]) -> str:
+        return HCLToDDLConverter().generate_ddl(tables)
+
+
+class HCLSink(Sink):
+    """Atlas HCL schema"""
+    name = "hcl"
+
+    def __init__(self, schema_name: str = "main"):
+        self.schema_name = schema_name
+
+    def render(self, tables: List[Table]) -> str:
+        return DDLToHCLConverter().generate_hcl_schema(tables, self.schema_name)
+
+
+class SeaORMSink(Sink):
+    """Sea-ORM migration"""
+    name = "seaorm"
+
+    def __init__(self, migration_name: str = "Migration", batched: bool = False, indexes: bool = False):
+        self.migration_name = migration_name
+        self.batched = batched
+        self.indexes = indexes
+
+    def render(self, tables: List[Table]) -> str:
+        return DDLToSeaORMGenerator(self.batched, self.indexes).generate_migration(tables, self.migration_name)
+
+
+class JSONSink(Sink):
+    """The schema model itself, as JSON"""
+    name = "json"
+
+    def render(self, tables: List[Table]) -> str:
+        return json.dumps([asdict(table) for table in tables], indent=2)
+
+
+# ----------------------------------------------------------------------------- Pipeline
+
+class Pipeline:
+    """Loads a source once and fans the parsed tables out to sinks"""
+
+    def __init__(self, source: Source):
+        self.source = source
+        self._tables: Optional[List[Table]] = None
+
+    @property
+    def tables(self) -> List[Table]:
+        """The parsed schema model (loaded on first use, then reused by every sink)"""
+        if self._tables is None:
+            with phase(self.source.phase_name):
+                self._tables = self.source.load()
+            instrumentation.count('tables', len(self._tables))
+            instrumentation.count('columns', sum(len(table.columns) for table in self._tables))
+        return self._tables
+
+    def render(self, *sinks: Sink) -> Dict[str, str]:
+        """Render every sink; returns text keyed by sink name"""
+        return {sink.name: sink.render(self.tables) for sink in sinks}
+
+    def write(self, outputs: Dict[str, Sink]) -> Dict[str, int]:
+        """Render each sink into its output path; returns bytes written per path"""
+        written = {}
+        for path, sink in outputs.items():
+            tables = self.tables
+            with phase('render'):
+                content = sink.render(tables)
+            with phase('write'):
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+            written[path] = len(content.encode('utf-8'))
+            instrumentation.count('bytes_out', written[path])
+        return written
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(
+        description="Convert a schema to several formats in one process, parsing it once",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # All artifacts from db.sqlite with a single introspection
+  %(prog)s --sqlite db.sqlite --ddl db.sql --hcl db.hcl --seaorm sea-orm.rs
+
+  # HCL to DDL and JSON
+  %(prog)s --from-hcl db.hcl --ddl db.sql --json schema.json
+
+  # Schema of a device's sqlite3 .dump (data skipped) to HCL
+  %(prog)s --from-dump device.dump --hcl db.hcl
+
+  # PostgreSQL DDL (or pg_dump --schema-only) to HCL and Sea-ORM, without atlas
+  %(prog)s --from-ddl raspberrypi_postgresql.sql --dialect postgres --hcl db.hcl --seaorm sea-orm.rs
+        """
+    )
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument('--sqlite', help='Source SQLite database file')
+    source_group.add_argument('--from-ddl', help='Source SQL DDL file')
+    source_group.add_argument('--from-hcl', help='Source HCL schema file')
+    source_group.add_argument('--from-dump', help='Source sqlite3 .dump file (schema only, data skipped)')
+    parser.add_argument('--dialect', choices=sorted(DDL_DIALECTS), default='sqlite',
+                        help='SQL dialect of --from-ddl (default: sqlite)')
+    parser.add_argument('--ddl', help='Write SQL DDL to this path')
+    parser.add_argument('--hcl', help='Write HCL schema to this path')
+    parser.add_argument('--seaorm', help='Write Sea-ORM migration to this path')
+    parser.add_argument('--json', help='Write the schema model as JSON to this path')
+    parser.add_argument('--schema', '-s', default='main', help='HCL schema name (default: main)')
+    parser.add_argument('--seaorm-batched', action='store_true',
+                        help='Sea-ORM: run up()/down() as one multi-statement execute in a single transaction')
+    parser.add_argument('--seaorm-indexes', action='store_true',
+                        help='Sea-ORM: create indexes after all tables')
+    instrumentation.add_arguments(parser)
+
+    args = parser.parse_args()
+
+    outputs: Dict[str, Sink] = {}
+    if args.ddl:
+        outputs[args.ddl] = DDLSink()
+    if args.hcl:
+        outputs[args.hcl] = HCLSink(args.schema)
+    if args.seaorm:
+        outputs[args.seaorm] = SeaORMSink(batched=args.seaorm_batched, indexes=args.seaorm_indexes)
+    if args.json:
+        outputs[args.json] = JSONSink()
+
+    if not outputs:
+        print("❌ Error: No outputs requested (use --ddl, --hcl, --seaorm and/or --json)")
+        return 1
+
+    source_path = args.sqlite or args.from_ddl or args.from_hcl or args.from_dump
+    if not os.path.exists(source_path):
+        print(f"❌ Error: Source file not found: {source_path}")
+        return 1
+
+    print("🔄 Schema Pipeline")
+    print("=" * 30)
+    print(f"Source: {os.path.abspath(source_path)}")
+
+    try:
+        with instrumentation.instrumented('pipeline', args):
+            if args.sqlite:
+                source = SQLiteSource(args.sqlite)
+            elif args.from_ddl:
+                source = DDLSource.from_file(args.from_ddl, args.dialect)
+            elif args.from_dump:
+                source = DumpSource(args.from_dump)
+            else:
+                source = HCLSource.from_file(args.from_hcl)
+
+            pipeline = Pipeline(source)
+            print(f"Found {len(pipeline.tables)} tables")
+            print()
+
+            for path, size in pipeline.write(outputs).items():
+                print(f"  ✅ {os.path.abspath(path)} ({size} bytes)")
+        return 0
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
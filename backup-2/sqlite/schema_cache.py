@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Schema Cache
+On-disk cache of rendered per-table fragments, so converters only re-parse
+and re-render the tables whose source changed since the previous run on the
+same input file
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def converter_version(*modules: ModuleType) -> str:
+    """Hash of the source files of the given modules; changes whenever the converter code does"""
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class FragmentCache:
+    """Rendered fragments keyed by a hash of the normalized table source and the converter version"""
+
+    def __init__(self, cache_dir: str, name: str, version: str, source: Optional[str] = None):
+        # One file per converter and input, so runs on different schemas do not evict each other
+        if source is not None:
+            source_hash = hashlib.sha256(os.path.abspath(source).encode('utf-8')).hexdigest()[:16]
+            name = f"{name}-{source_hash}"
+        self.path = os.path.join(cache_dir, f"{name}.json")
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        # Entries from the previous run, and the ones used by this run
+        self.entries: Dict[str, Any] = {}
+        self.used: Dict[str, Any] = {}
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def key(self, *parts: str) -> str:
+        """Cache key for a table source (plus any render options)"""
+        digest = hashlib.sha256(self.version.encode('utf-8'))
+        for part in parts:
+            digest.update(b'\0')
+            digest.update(part.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached fragment for key, counting the hit or miss"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.used[key] = entry
+        return entry
+
+    def put(self, key: str, entry: Any) -> None:
+        """Store a freshly rendered fragment"""
+        self.used[key] = entry
+
+    def save(self) -> None:
+        """Write the entries used by this run; everything else is stale and evicted"""
+        self.evicted = len(self.entries.keys() - self.used.keys())
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        # A temporary file of its own, so concurrent runs never write into each other's
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + '.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.used, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.entries = self.used
+        self.used = {}
+
+    def summary(self) -> str:
+        """One-line hit/miss report"""
+        return f"cache: {self.hits} hits, {self.misses} misses, {self.evicted} evicted"
+
+
+def cached_fragment(cache: Optional[FragmentCache], key_parts: Iterable[str],
+                    render: Callable[[], Optional[Any]]) -> Optional[Any]:
+    """Return the cached fragment for key_parts, rendering (and caching) it on a miss"""
+    if cache is None:
+        return render()
+    key = cache.key(*key_parts)
+    entry = cache.get(key)
+    if entry is None:
+        entry = render()
+        if entry is not None:
+            cache.put(key, entry)
+    return entry
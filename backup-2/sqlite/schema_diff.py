@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Schema Diff
+Compares two schemas (SQLite database, SQL DDL or HCL) and emits the smallest
+SQLite migration between them: ALTER TABLE ADD/DROP COLUMN and CREATE/DROP
+INDEX where SQLite allows it, the 12-step table rebuild only where it must,
+as SQL and as Sea-ORM up/down bodies
+
+Tables, columns and indexes are matched through dicts, so a diff is
+O(tables + columns); unchanged tables are usually the same hash-consed
+record on both sides and are skipped with one comparison.
+"""
+
+import os
+import re
+import sys
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+from schema_ir import Column, Index, Table, sql_default, sql_identifier, sql_identifiers
+from hcl_to_ddl import HCLToDDLConverter
+from ddl_to_seaorm import DDLToSeaORMGenerator
+from data_copy import fallback_value
+from pipeline import open_source
+import instrumentation
+from instrumentation import phase
+
+
+# Defaults ALTER TABLE ADD COLUMN refuses (not constant)
+NON_CONSTANT_DEFAULTS = {'CURRENT_TIME', 'CURRENT_DATE', 'CURRENT_TIMESTAMP'}
+
+# Prefix of the temporary table used by the 12-step rebuild
+REBUILD_PREFIX = '_new_'
+
+# Temporary table whose trigger rolls the migration back before COMMIT on foreign key violations
+FK_CHECK_TABLE = '_foreign_key_violations'
+
+# Length/precision arguments of a type, which SQLite ignores: VARCHAR(255), DECIMAL(10, 2)
+TYPE_ARGUMENTS_PATTERN = re.compile(r'\s*\([^)]*\)')
+
+
+def canonical_type(sql_type: str) -> str:
+    """Type spelling as SQLite sees it: upper case, single spaces, no length/precision (VARCHAR(255) = varchar)"""
+    return ' '.join(TYPE_ARGUMENTS_PATTERN.sub('', sql_type).upper().split())
+
+
+def column_definition(column: Column) -> Tuple:
+    """What ALTER/rebuild decisions compare; types and defaults by their canonical spelling"""
+    default = sql_default(column.default) if column.default is not None else None
+    return (canonical_type(column.type), column.nullable, column.primary_key, column.auto_increment, default)
+
+
+def index_definition(index: Index) -> Tuple:
+    """What index decisions compare: a UNIQUE constraint and a unique index on the same columns are equivalent"""
+    return (tuple(column.lower() for column in index.columns), index.unique)
+
+
+@dataclass
+class TableDiff:
+    """The change to one table: action is create, drop, alter or rebuild"""
+    name: str
+    action: str
+    statements: List[str] = field(default_factory=list)
+    details: List[str] = field(default_factory=list)
+
+
+class SchemaDiffer:
+    """Computes minimal SQLite migrations between two lists of tables"""
+
+    def __init__(self):
+        self.ddl = HCLToDDLConverter()
+
+    def diff(self, old_tables: List[Table], new_tables: List[Table]) -> List[TableDiff]:
+        """Per-table changes turning old_tables into new_tables (created/altered first, dropped last)"""
+        old_by_name = {table.name.lower(): table for table in old_tables}
+        new_by_name = {table.name.lower(): table for table in new_tables}
+
+        diffs = []
+        for key, new_table in new_by_name.items():
+            old_table = old_by_name.get(key)
+            if old_table is None:
+                diffs.append(self._create_table(new_table))
+            elif old_table is not new_table and old_table != new_table:
+                table_diff = self._alter_table(old_table, new_table)
+                if table_diff.statements:
+                    diffs.append(table_diff)
+
+        for key, old_table in old_by_name.items():
+            if key not in new_by_name:
+                diffs.append(TableDiff(old_table.name, 'drop', [f"DROP TABLE {sql_identifier(old_table.name)};"]))
+
+        return diffs
+
+    def migration_statements(self, diffs: List[TableDiff]) -> List[str]:
+        """All statements of a migration, with foreign keys off around table rebuilds"""
+        statements = [statement for table_diff in diffs for statement in table_diff.statements]
+        if any(table_diff.action == 'rebuild' for table_diff in diffs):
+            # foreign_keys can only change outside a transaction. PRAGMA foreign_key_check (step 10
+            # of the rebuild) only returns rows, which a script ignores, so any violation raises
+            # ROLLBACK: the COMMIT after it then has no transaction left, even in a shell that
+            # keeps going after errors
+            statements = (["PRAGMA foreign_keys=OFF;", "BEGIN;"] + statements + [
+                f"CREATE TEMP TABLE {FK_CHECK_TABLE} (violations INTEGER);",
+                f"CREATE TEMP TRIGGER {FK_CHECK_TABLE}_abort AFTER INSERT ON {FK_CHECK_TABLE} "
+                f"WHEN NEW.violations > 0 BEGIN SELECT RAISE(ROLLBACK, 'foreign key violations'); END;",
+                f"INSERT INTO {FK_CHECK_TABLE} SELECT count(*) FROM pragma_foreign_key_check;",
+                f"DROP TABLE {FK_CHECK_TABLE};",
+                "COMMIT;",
+                "PRAGMA foreign_keys=ON;",
+            ])
+        return statements
+
+    def _create_table(self, table: Table) -> TableDiff:
+        """CREATE TABLE plus its indexes"""
+        return TableDiff(table.name, 'create', ['\n'.join(self.ddl._generate_table_ddl(table))])
+
+    def _alter_table(self, old_table: Table, new_table: Table) -> TableDiff:
+        """ALTER statements when SQLite supports every change, the 12-step rebuild otherwise"""
+        old_columns = {column.name.lower(): column for column in old_table.columns}
+        new_columns = {column.name.lower(): column for column in new_table.columns}
+
+        added = [column for key, column in new_columns.items() if key not in old_columns]
+        dropped = [column for key, column in old_columns.items() if key not in new_columns]
+        changed = [column for key, column in new_columns.items()
+                   if key in old_columns and column_definition(old_columns[key]) != column_definition(column)]
+
+        table_diff = TableDiff(new_table.name, 'alter')
+        table_diff.details.extend(f"add column {column.name}" for column in added)
+        table_diff.details.extend(f"drop column {column.name}" for column in dropped)
+        table_diff.details.extend(f"change column {column.name}" for column in changed)
+
+        # Changed column definitions always need a rebuild (already listed in details)
+        rebuild_reasons = []
+        if old_table.primary_keys != new_table.primary_keys:
+            rebuild_reasons.append("primary key changed")
+        # pragma_foreign_key_list numbers foreign keys in reverse declaration order
+        if set(old_table.foreign_keys) != set(new_table.foreign_keys):
+            rebuild_reasons.append("foreign keys changed")
+        rebuild_reasons.extend(f"cannot add {column.name}" for column in added if not self._can_add(column))
+        rebuild_reasons.extend(f"cannot drop {column.name}" for column in dropped
+                               if not self._can_drop(old_table, column))
+
+        # A UNIQUE constraint's index (sqlite_autoindex_*) cannot be dropped, only rebuilt away
+        old_indexes = {index.name.lower(): index for index in old_table.indexes}
+        new_indexes = {index.name.lower(): index for index in new_table.indexes}
+        rebuild_reasons.extend(
+            f"unique constraint {index.name} changed" for key, index in old_indexes.items()
+            if index.constraint and (key not in new_indexes or
+                                     index_definition(new_indexes[key]) != index_definition(index))
+        )
+
+        if changed or rebuild_reasons:
+            table_diff.action = 'rebuild'
+            table_diff.details.extend(rebuild_reasons)
+            table_diff.statements = self._rebuild(old_table, new_table, old_columns)
+            return table_diff
+
+        # Indexes covering a dropped column have to go before the column does
+        for key, index in old_indexes.items():
+            if key not in new_indexes or index_definition(new_indexes[key]) != index_definition(index):
+                table_diff.statements.append(f"DROP INDEX {sql_identifier(index.name)};")
+                table_diff.details.append(f"drop index {index.name}")
+
+        for column in added:
+            definition = self.ddl._generate_column_definition(column, ())
+            table_diff.statements.append(f"ALTER TABLE {sql_identifier(new_table.name)} ADD COLUMN {definition};")
+        for column in dropped:
+            table_diff.statements.append(f"ALTER TABLE {sql_identifier(new_table.name)} "
+                                          f"DROP COLUMN {sql_identifier(column.name)};")
+
+        for key, index in new_indexes.items():
+            if key not in old_indexes or index_definition(old_indexes[key]) != index_definition(index):
+                table_diff.statements.append(self._create_index(new_table, index))
+                table_diff.details.append(f"create index {index.name}")
+
+        return table_diff
+
+    def _can_add(self, column: Column) -> bool:
+        """Whether ALTER TABLE ADD COLUMN accepts this column"""
+        if column.primary_key or column.auto_increment:
+            return False
+        default = (column.default or '').upper()
+        if default in NON_CONSTANT_DEFAULTS or default.startswith('('):
+            return False
+        # NOT NULL needs a non-NULL default to fill the existing rows
+        return column.nullable or (column.default is not None and default != 'NULL')
+
+    def _can_drop(self, table: Table, column: Column) -> bool:
+        """Whether ALTER TABLE DROP COLUMN (SQLite 3.35+) accepts this column"""
+        # Indexes on it are dropped first (they cannot survive in the new schema)
+        if column.primary_key:
+            return False
+        return not any(column.name in foreign_key.columns for foreign_key in table.foreign_keys)
+
+    def _rebuild(self, old_table: Table, new_table: Table, old_columns: Dict[str, Column]) -> List[str]:
+        """The 12-step rebuild: create new, copy shared columns, drop old, rename, recreate indexes
+
+        The new table keeps its UNIQUE and FOREIGN KEY constraints; migration_statements()
+        checks the foreign keys before COMMIT.
+        """
+        temp_name = REBUILD_PREFIX + new_table.name
+        constraints = tuple(index for index in new_table.indexes if index.constraint)
+        statements = ['\n'.join(self.ddl._generate_table_ddl(replace(new_table, name=temp_name, indexes=constraints)))]
+
+        targets = []
+        sources = []
+        for column in new_table.columns:
+            old_column = old_columns.get(column.name.lower())
+            if old_column is not None:
+                source = sql_identifier(old_column.name)
+                if old_column.nullable and not column.nullable:
+                    # Tightened to NOT NULL: existing NULLs need a value
+                    fill = sql_default(column.default) if column.default is not None else fallback_value(column)
+                    source = f"COALESCE({source}, {fill})"
+            elif not column.nullable and column.default is None and not column.primary_key:
+                source = fallback_value(column)
+            else:
+                continue
+            targets.append(sql_identifier(column.name))
+            sources.append(source)
+
+        if targets:
+            statements.append(f"INSERT INTO {sql_identifier(temp_name)} ({', '.join(targets)}) "
+                              f"SELECT {', '.join(sources)} FROM {sql_identifier(old_table.name)};")
+        statements.append(f"DROP TABLE {sql_identifier(old_table.name)};")
+        statements.append(f"ALTER TABLE {sql_identifier(temp_name)} RENAME TO {sql_identifier(new_table.name)};")
+        statements.extend(self._create_index(new_table, index) for index in new_table.indexes if not index.constraint)
+        return statements
+
+    def _create_index(self, table: Table, index: Index) -> str:
+        """CREATE [UNIQUE] INDEX statement"""
+        unique = 'UNIQUE ' if index.unique else ''
+        return (f"CREATE {unique}INDEX {sql_identifier(index.name)} ON {sql_identifier(table.name)} "
+                f"({sql_identifiers(index.columns)});")
+
+
+class MigrationWriter:
+    """Renders up/down diffs as a SQL file and as a Sea-ORM migration"""
+
+    def __init__(self, differ: Optional[SchemaDiffer] = None):
+        self.differ = differ or SchemaDiffer()
+
+    def generate_sql(self, diffs: List[TableDiff], label: str = "up") -> str:
+        """SQL migration file for one direction"""
+        lines = [f"-- Schema migration ({label}) generated by schema diff"]
+        for table_diff in diffs:
+            details = f": {', '.join(table_diff.details)}" if table_diff.details else ''
+            lines.append(f"-- {table_diff.action} {table_diff.name}{details}")
+        lines.append("")
+        lines.extend(self.differ.migration_statements(diffs))
+        return '\n'.join(lines) + '\n'
+
+    def generate_seaorm(self, up: List[TableDiff], down: List[TableDiff],
+                        migration_name: str = "Migration") -> str:
+        """Sea-ORM migration running the up and down statements"""
+        generator = DDLToSeaORMGenerator()
+        return generator._render_migration(
+            self._seaorm_body(self.differ.migration_statements(up)),
+            self._seaorm_body(self.differ.migration_statements(down)),
+            migration_name,
+            up_comment="Apply schema changes",
+            down_comment="Revert schema changes"
+        )
+
+    def _seaorm_body(self, statements: List[str]) -> str:
+        """All statements in one execute_unprepared call, so BEGIN/COMMIT share a pooled connection"""
+        if not statements:
+            return ''
+        sql = '\n'.join(f'            {line}' for statement in statements for line in statement.split('\n'))
+        return '\n'.join([
+            '        let sql = r#"',
+            sql,
+            '        "#;',
+            '        manager.get_connection().execute_unprepared(sql).await?;',
+            '',
+        ])
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(
+        description="Generate a minimal SQLite migration between two schemas",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Schemas are read by extension: .sqlite/.sqlite3/.db databases, .hcl files,
+anything else as SQL DDL.
+
+Examples:
+  # What changed between the device database and the edited db.sql
+  %(prog)s --from db.sqlite --to db.sql --sql migration.sql --down-sql rollback.sql
+
+  # Sea-ORM migration between two HCL versions
+  %(prog)s --from old.hcl --to db.hcl --seaorm m20240101_000001_update.rs
+        """
+    )
+    parser.add_argument('--from', dest='old', required=True, help='Current schema')
+    parser.add_argument('--to', dest='new', required=True, help='Target schema')
+    parser.add_argument('--sql', help='Write the up migration SQL to this path')
+    parser.add_argument('--down-sql', help='Write the down migration SQL to this path')
+    parser.add_argument('--seaorm', help='Write a Sea-ORM migration to this path')
+    parser.add_argument('--name', default='Migration', help='Sea-ORM migration struct name (default: Migration)')
+
+    instrumentation.add_arguments(parser)
+
+    args = parser.parse_args()
+
+    print("🔍 Schema Diff")
+    print("=" * 30)
+    print(f"From: {os.path.abspath(args.old)}")
+    print(f"To: {os.path.abspath(args.new)}")
+    print()
+
+    try:
+        with instrumentation.instrumented('schema_diff', args):
+            with phase('parse'):
+                old_tables = open_source(args.old).load()
+                new_tables = open_source(args.new).load()
+            instrumentation.count('tables', len(old_tables) + len(new_tables))
+
+            writer = MigrationWriter()
+            with phase('diff'):
+                up = writer.differ.diff(old_tables, new_tables)
+                down = writer.differ.diff(new_tables, old_tables)
+            instrumentation.count('changes', len(up))
+
+            if not up:
+                print("✅ Schemas are identical, no migration needed")
+                return 0
+
+            for table_diff in up:
+                details = f" ({', '.join(table_diff.details)})" if table_diff.details else ''
+                print(f"  {table_diff.action:<8} {table_diff.name}{details}")
+            print()
+
+            outputs: List[Tuple[str, str]] = []
+            with phase('render'):
+                if args.sql:
+                    outputs.append((args.sql, writer.generate_sql(up, "up")))
+                if args.down_sql:
+                    outputs.append((args.down_sql, writer.generate_sql(down, "down")))
+                if args.seaorm:
+                    outputs.append((args.seaorm, writer.generate_seaorm(up, down, args.name)))
+            if not outputs:
+                print(writer.generate_sql(up, "up"))
+            for path, content in outputs:
+                with phase('write'):
+                    with open(path, 'w', encoding='utf-8') as f:
+                        f.write(content)
+                instrumentation.count('bytes_out', len(content))
+                print(f"  ✅ {os.path.abspath(path)}")
+            return 0
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
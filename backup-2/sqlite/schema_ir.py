@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Schema IR
+Shared, compact schema model read and written by every converter
+
+Records are frozen and slotted. Names, types and defaults are interned, and
+make_column()/make_table() hash-cons their results, so loading many databases
+that share one schema keeps a single copy of each distinct table definition.
+
+Column types and defaults are stored in SQL spelling (e.g. VARCHAR(255),
+'text', TRUE, 0.5, CURRENT_TIMESTAMP, (lower('X'))); each converter maps them
+to and from its own dialect. Names are stored unquoted; emitters quote them
+with sql_identifier() and write defaults with sql_default().
+"""
+
+import re
+import sys
+from typing import Dict, Iterable, Optional, Tuple
+from dataclasses import dataclass, replace
+
+
+@dataclass(frozen=True, slots=True)
+class Column:
+    """Represents a table column"""
+    name: str
+    type: str
+    nullable: bool = True
+    primary_key: bool = False
+    auto_increment: bool = False
+    default: Optional[str] = None
+    comment: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class Index:
+    """Represents a secondary index (constraint: backs a UNIQUE constraint of the table, not a CREATE INDEX)"""
+    name: str
+    columns: Tuple[str, ...]
+    unique: bool = False
+    constraint: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class ForeignKey:
+    """Represents a foreign key constraint"""
+    columns: Tuple[str, ...]
+    ref_table: str
+    ref_columns: Tuple[str, ...]
+    on_update: str = "NO ACTION"
+    on_delete: str = "NO ACTION"
+
+
+@dataclass(frozen=True, slots=True)
+class Table:
+    """Represents a table"""
+    name: str
+    columns: Tuple[Column, ...]
+    primary_keys: Tuple[str, ...]
+    indexes: Tuple[Index, ...] = ()
+    schema: str = "main"
+    foreign_keys: Tuple[ForeignKey, ...] = ()
+    comment: Optional[str] = None
+
+
+# SQLite keywords (https://sqlite.org/lang_keywords.html); names spelled like one are quoted on output
+SQL_KEYWORDS = frozenset('''
+    ABORT ACTION ADD AFTER ALL ALTER ALWAYS ANALYZE AND AS ASC ATTACH AUTOINCREMENT BEFORE BEGIN
+    BETWEEN BY CASCADE CASE CAST CHECK COLLATE COLUMN COMMIT CONFLICT CONSTRAINT CREATE CROSS
+    CURRENT CURRENT_DATE CURRENT_TIME CURRENT_TIMESTAMP DATABASE DEFAULT DEFERRABLE DEFERRED
+    DELETE DESC DETACH DISTINCT DO DROP EACH ELSE END ESCAPE EXCEPT EXCLUDE EXCLUSIVE EXISTS
+    EXPLAIN FAIL FILTER FIRST FOLLOWING FOR FOREIGN FROM FULL GENERATED GLOB GROUP GROUPS HAVING
+    IF IGNORE IMMEDIATE IN INDEX INDEXED INITIALLY INNER INSERT INSTEAD INTERSECT INTO IS ISNULL
+    JOIN KEY LAST LEFT LIKE LIMIT MATCH MATERIALIZED NATURAL NO NOT NOTHING NOTNULL NULL NULLS OF
+    OFFSET ON OR ORDER OTHERS OUTER OVER PARTITION PLAN PRAGMA PRECEDING PRIMARY QUERY RAISE
+    RANGE RECURSIVE REFERENCES REGEXP REINDEX RELEASE RENAME REPLACE RESTRICT RETURNING RIGHT
+    ROLLBACK ROW ROWS SAVEPOINT SELECT SET TABLE TEMP TEMPORARY THEN TIES TO TRANSACTION TRIGGER
+    UNBOUNDED UNION UNIQUE UPDATE USING VACUUM VALUES VIEW VIRTUAL WHEN WHERE WINDOW WITH WITHOUT
+'''.split())
+
+_PLAIN_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+
+def sql_identifier(name: str) -> str:
+    """A name as it must be written in SQL: bare when it is a plain non-keyword identifier, double-quoted otherwise"""
+    if _PLAIN_IDENTIFIER.fullmatch(name) and name.upper() not in SQL_KEYWORDS:
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_identifiers(names: Iterable[str]) -> str:
+    """Comma-separated column list for SQL"""
+    return ', '.join(sql_identifier(name) for name in names)
+
+
+def rust_identifier(name: str) -> str:
+    """A name made usable inside a Rust identifier (anything but ASCII letters, digits and '_' becomes '_')"""
+    return re.sub(r'[^A-Za-z0-9_]', '_', name)
+
+
+# Defaults SQLite accepts as bare keywords; any other expression must be parenthesised
+SQL_DEFAULT_KEYWORDS = frozenset({'CURRENT_DATE', 'CURRENT_TIME', 'CURRENT_TIMESTAMP'})
+
+_NUMERIC_LITERAL = re.compile(r'[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?')
+_FUNCTION_CALL = re.compile(r'[A-Za-z_][A-Za-z0-9_.]*\(.*\)', re.DOTALL)
+
+
+def is_numeric_default(default: str) -> bool:
+    """Whether a default is a numeric literal (0, -1.5, 0.00, 1e3)"""
+    return _NUMERIC_LITERAL.fullmatch(default) is not None
+
+
+def default_expression(default: str) -> Optional[str]:
+    """The SQL expression of a computed default, without parentheses; None for literals
+
+    Expressions are stored parenthesised, as SQLite writes them; PRAGMA
+    table_info drops the parentheses, so a bare function call counts too.
+    """
+    if default.upper() in SQL_DEFAULT_KEYWORDS:
+        return default.upper()
+    if default.startswith('(') and default.endswith(')'):
+        return default[1:-1].strip()
+    if _FUNCTION_CALL.fullmatch(default):
+        return default
+    return None
+
+
+def sql_string(text: str) -> str:
+    """A SQL string literal ('it''s')"""
+    return "'" + text.replace("'", "''") + "'"
+
+
+def default_text(default: str) -> str:
+    """The text of a string default: stored SQL quotes removed and doubled quotes undone ('it''s' -> it's)"""
+    if len(default) >= 2 and default[0] == default[-1] and default[0] in "'\"":
+        quote = default[0]
+        return default[1:-1].replace(quote * 2, quote)
+    return default
+
+
+def sql_default(default: str) -> str:
+    """A default as written after DEFAULT in SQLite DDL: literals and keywords bare, expressions parenthesised, the rest as a string"""
+    if default.upper() in ('TRUE', 'FALSE', 'NULL'):
+        return default.upper()
+    if is_numeric_default(default):
+        return default
+    expression = default_expression(default)
+    if expression is not None:
+        return expression if expression in SQL_DEFAULT_KEYWORDS else f'({expression})'
+    return sql_string(default_text(default))
+
+
+def autoincrement_key(column: Column, primary_keys: Iterable[str]) -> bool:
+    """Whether a column is written as SQLite's INTEGER PRIMARY KEY AUTOINCREMENT
+
+    SQLite only allows AUTOINCREMENT on a single-column INTEGER key, so
+    identity/serial keys of any integer width map to it and auto-increment
+    flags elsewhere are dropped.
+    """
+    return column.auto_increment and tuple(primary_keys) == (column.name,)
+
+
+# Canonical instances, keyed by themselves (records hash and compare by value)
+_column_pool: Dict[Column, Column] = {}
+_index_pool: Dict[Index, Index] = {}
+_foreign_key_pool: Dict[ForeignKey, ForeignKey] = {}
+_table_pool: Dict[Table, Table] = {}
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern a string, passing None through"""
+    return sys.intern(value) if value is not None else None
+
+
+def make_column(name: str, type: str, nullable: bool = True, primary_key: bool = False,
+                auto_increment: bool = False, default: Optional[str] = None,
+                comment: Optional[str] = None) -> Column:
+    """Create (or reuse) a column with interned strings"""
+    column = Column(
+        name=sys.intern(name),
+        type=sys.intern(type),
+        nullable=nullable,
+        primary_key=primary_key,
+        auto_increment=auto_increment,
+        default=_intern(default),
+        comment=comment
+    )
+    return _column_pool.setdefault(column, column)
+
+
+def make_index(name: str, columns: Iterable[str], unique: bool = False, constraint: bool = False) -> Index:
+    """Create (or reuse) an index with interned strings"""
+    index = Index(
+        name=sys.intern(name),
+        columns=tuple(sys.intern(col) for col in columns),
+        unique=unique,
+        constraint=constraint
+    )
+    return _index_pool.setdefault(index, index)
+
+
+def make_foreign_key(columns: Iterable[str], ref_table: str, ref_columns: Iterable[str],
+                     on_update: str = "NO ACTION", on_delete: str = "NO ACTION") -> ForeignKey:
+    """Create (or reuse) a foreign key with interned strings"""
+    foreign_key = ForeignKey(
+        columns=tuple(sys.intern(col) for col in columns),
+        ref_table=sys.intern(ref_table),
+        ref_columns=tuple(sys.intern(col) for col in ref_columns),
+        on_update=sys.intern(on_update),
+        on_delete=sys.intern(on_delete)
+    )
+    return _foreign_key_pool.setdefault(foreign_key, foreign_key)
+
+
+def make_table(name: str, columns: Iterable[Column], primary_keys: Iterable[str] = (),
+               indexes: Iterable[Index] = (), schema: str = "main",
+               foreign_keys: Iterable[ForeignKey] = (), comment: Optional[str] = None) -> Table:
+    """Create (or reuse) a table; column primary_key flags follow primary_keys"""
+    primary_keys = tuple(sys.intern(pk) for pk in primary_keys)
+    pk_names = set(primary_keys)
+    columns = tuple(
+        column if column.primary_key == (column.name in pk_names)
+        else make_column(
+            column.name, column.type, column.nullable, column.name in pk_names,
+            column.auto_increment, column.default, column.comment
+        )
+        for column in columns
+    )
+    table = Table(
+        name=sys.intern(name),
+        columns=columns,
+        primary_keys=primary_keys,
+        indexes=tuple(indexes),
+        schema=sys.intern(schema),
+        foreign_keys=tuple(foreign_keys),
+        comment=comment
+    )
+    return _table_pool.setdefault(table, table)
+
+
+def with_indexes(table: Table, indexes: Iterable[Index]) -> Table:
+    """The table plus indexes declared after it (CREATE INDEX), replacing it in the pool"""
+    if _table_pool.get(table) is table:
+        del _table_pool[table]
+    return make_table(table.name, table.columns, table.primary_keys, table.indexes + tuple(indexes),
+                      table.schema, table.foreign_keys, table.comment)
+
+
+def release_table(table: Table) -> None:
+    """Drop a table and its columns/indexes/foreign keys from the pools once a streaming consumer is done with it
+
+    Columns shared with a table still in use simply stop being shared with
+    later ones; the records themselves stay valid.
+    """
+    if _table_pool.get(table) is table:
+        del _table_pool[table]
+    for column in table.columns:
+        _column_pool.pop(column, None)
+        if column.primary_key:
+            # The non-key column a parser made before make_table() set the flag
+            _column_pool.pop(replace(column, primary_key=False), None)
+    for index in table.indexes:
+        _index_pool.pop(index, None)
+    for foreign_key in table.foreign_keys:
+        _foreign_key_pool.pop(foreign_key, None)
+
+
+def pool_sizes() -> Dict[str, int]:
+    """Number of distinct columns, indexes, foreign keys and tables currently held"""
+    return {
+        'columns': len(_column_pool),
+        'indexes': len(_index_pool),
+        'foreign_keys': len(_foreign_key_pool),
+        'tables': len(_table_pool),
+    }
+
+
+def clear_pools() -> None:
+    """Drop all canonical instances (existing records stay valid)"""
+    _column_pool.clear()
+    _index_pool.clear()
+    _foreign_key_pool.clear()
+    _table_pool.clear()
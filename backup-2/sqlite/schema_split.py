@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Schema Splitter
+Writes one file per table (DDL up/down migrations, HCL, Sea-ORM) from a
+single parse of the schema, in place of the sequential per-table loops of
+sql_single.sh and hcl_single.sh. Files are rendered and written on a thread
+pool, each through a temporary file and an atomic rename; files whose
+content is unchanged are not rewritten, so their mtimes (and whatever
+build depends on them) stay untouched.
+
+Layout under the output directory:
+  sql/<table>/up.sql, sql/<table>/down.sql
+  hcl/<table>.hcl
+  seaorm/<table>.rs
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from schema_ir import Table, sql_identifier
+from ddl_to_hcl import DDLToHCLConverter
+from ddl_to_seaorm import DDLToSeaORMGenerator
+from hcl_to_ddl import HCLToDDLConverter
+from pipeline import DDL_DIALECTS, DDLSource, open_source
+import instrumentation
+from instrumentation import phase
+
+
+FORMATS = ('sql', 'hcl', 'seaorm')
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    """Atomically replace path with content unless it already holds exactly that; returns whether it was written"""
+    data = content.encode('utf-8')
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+class SchemaSplitter:
+    """Renders per-table files for the requested formats and writes the changed ones in parallel"""
+
+    def __init__(self, output_dir: str, formats: Sequence[str] = FORMATS, schema_name: str = "main",
+                 workers: int = 0):
+        self.output_dir = output_dir
+        self.formats = list(formats)
+        self.schema_name = schema_name
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.ddl = HCLToDDLConverter()
+        self.hcl = DDLToHCLConverter()
+        self.seaorm = DDLToSeaORMGenerator()
+
+    def table_files(self, table: Table) -> List[Tuple[str, Callable[[], str]]]:
+        """(path, renderer) of every file of one table"""
+        files = []
+        if 'sql' in self.formats:
+            table_dir = os.path.join(self.output_dir, 'sql', table.name)
+            files.append((os.path.join(table_dir, 'up.sql'),
+                          lambda: '\n'.join(self.ddl._generate_table_ddl(table)) + '\n'))
+            files.append((os.path.join(table_dir, 'down.sql'), lambda: f"DROP TABLE {sql_identifier(table.name)};\n"))
+        if 'hcl' in self.formats:
+            files.append((os.path.join(self.output_dir, 'hcl', f"{table.name}.hcl"),
+                          lambda: self.hcl.generate_hcl_schema([table], self.schema_name)))
+        if 'seaorm' in self.formats:
+            files.append((os.path.join(self.output_dir, 'seaorm', f"{table.name}.rs"),
+                          lambda: self.seaorm.generate_migration([table])))
+        return files
+
+    def split(self, tables: Sequence[Table]) -> Dict[str, bool]:
+        """Render and write every file; returns whether each path was (re)written"""
+        files = [entry for table in tables for entry in self.table_files(table)]
+
+        def render_and_write(entry: Tuple[str, Callable[[], str]]) -> Tuple[str, bool, int]:
+            path, render = entry
+            content = render()
+            return path, write_if_changed(path, content), len(content)
+
+        results: Dict[str, bool] = {}
+        # Rendering and writing overlap on the pool threads, so both are charged to one phase
+        with phase('write'):
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for path, written, size in executor.map(render_and_write, files):
+                    results[path] = written
+                    if written:
+                        instrumentation.count('bytes_out', size)
+        instrumentation.count('files_written', sum(results.values()))
+        instrumentation.count('files_unchanged', len(results) - sum(results.values()))
+        return results
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Split a schema into per-table DDL, HCL and Sea-ORM files",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # What sql_single.sh and hcl_single.sh produced, from one introspection
+  %(prog)s --input ./sqlite/sqlite.db --output ./sqlite --formats sql,hcl
+
+  # Every format from an HCL schema; rerunning only touches the files that changed
+  %(prog)s --input db.hcl --output ./split
+
+  # PostgreSQL DDL
+  %(prog)s --input raspberrypi_postgresql.sql --dialect postgres --output ./split
+        """
+    )
+    parser.add_argument('--input', '-i', required=True, help='Schema file (SQLite database, HCL or SQL DDL)')
+    parser.add_argument('--output', '-o', default='.', help='Output directory (default: current directory)')
+    parser.add_argument('--formats', '-f', default=','.join(FORMATS),
+                        help=f"Comma-separated formats to write (default: {','.join(FORMATS)})")
+    parser.add_argument('--dialect', choices=sorted(DDL_DIALECTS), default='sqlite',
+                        help='SQL dialect of a DDL input (default: sqlite)')
+    parser.add_argument('--schema', '-s', default='main', help='HCL schema name (default: main)')
+    parser.add_argument('--workers', '-w', type=int, default=0,
+                        help='Render/write threads (default: CPU count, at most 8)')
+    instrumentation.add_arguments(parser)
+
+    args = parser.parse_args()
+
+    formats = [name.strip() for name in args.formats.split(',') if name.strip()]
+    unknown = [name for name in formats if name not in FORMATS]
+    if unknown or not formats:
+        print(f"❌ Error: Unknown format: {', '.join(unknown) or args.formats} (expected: {', '.join(FORMATS)})")
+        return 1
+
+    if not os.path.exists(args.input):
+        print(f"❌ Error: Schema file not found: {args.input}")
+        return 1
+
+    print("🔄 Schema Splitter")
+    print("=" * 30)
+    print(f"Input: {os.path.abspath(args.input)}")
+    print(f"Output: {os.path.abspath(args.output)}")
+
+    try:
+        with instrumentation.instrumented('schema_split', args):
+            source = open_source(args.input)
+            if isinstance(source, DDLSource) and args.dialect != 'sqlite':
+                source = DDLSource(source.content, args.dialect)
+            with phase(source.phase_name):
+                tables = source.load()
+            instrumentation.count('tables', len(tables))
+            print(f"Found {len(tables)} tables")
+
+            splitter = SchemaSplitter(args.output, formats, args.schema, args.workers)
+            results = splitter.split(tables)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    written = sum(results.values())
+    print(f"\n✅ {written} files written, {len(results) - written} unchanged")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
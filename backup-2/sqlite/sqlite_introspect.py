@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+SQLite Introspection Import
+The SQLite catalog reader (SQLiteToHCLConverter) lives in backup-1/sqlite.
+Importing it from here puts that directory on sys.path once, so the
+converters and benchmarks of this directory share one import instead of
+each patching the path
+"""
+
+import os
+import sys
+
+# backup-1/sqlite, next to this directory's parent
+BACKUP1_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backup-1', 'sqlite'))
+
+if BACKUP1_DIR not in sys.path:
+    sys.path.insert(0, BACKUP1_DIR)
+
+from sqlite_to_hcl import SQLiteToHCLConverter  # noqa: E402
+
+__all__ = ['BACKUP1_DIR', 'SQLiteToHCLConverter']
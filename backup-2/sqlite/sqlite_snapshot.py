@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+SQLite Snapshot Connections
+Read-only connections for introspecting live databases: opened through a
+mode=ro URI (plus immutable=1 for offline copies), memory-mapped, and held
+in one read transaction so every catalog query sees the same snapshot.
+Under WAL the snapshot never blocks the writer.
+"""
+
+import os
+import sqlite3
+from urllib.parse import quote
+
+
+# Upper bound for memory-mapped reads; SQLite maps at most the file size
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+
+
+def snapshot_uri(db_path: str, immutable: bool = False) -> str:
+    """file: URI opening a database read-only (immutable=1 also skips locking and change detection)"""
+    uri = f"file:{quote(os.path.abspath(db_path))}?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    return uri
+
+
+def connect_snapshot(db_path: str, immutable: bool = False,
+                     mmap_size: int = DEFAULT_MMAP_SIZE) -> sqlite3.Connection:
+    """Open a read-only, memory-mapped connection with its read transaction already started"""
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database file not found: {db_path}")
+
+    conn = sqlite3.connect(snapshot_uri(db_path, immutable), uri=True, isolation_level=None)
+    try:
+        conn.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        # A deferred BEGIN takes its snapshot at the first read, so read the catalog once now
+        conn.execute("BEGIN")
+        conn.execute("SELECT count(*) FROM sqlite_master").fetchone()
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
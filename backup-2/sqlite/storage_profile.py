@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+SQLite Storage Profile
+Reports, per table and per index, the row count, pages, payload bytes,
+overflow pages, average row size and fragmentation of a database, read from
+the dbstat virtual table in one pass over its pages. Builds without dbstat
+get an estimate from sampled rows. Output is a sorted text report and/or JSON.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlite_snapshot import connect_snapshot
+import instrumentation
+from instrumentation import phase
+
+
+# Report columns that --sort accepts (all sorted largest first)
+SORT_KEYS = ('pages', 'rows', 'payload_bytes', 'overflow_pages', 'avg_row_bytes', 'unused_percent',
+             'fragmentation_percent')
+
+# Per-cell overhead estimate (cell pointer, payload size and rowid varints) for sampled profiles
+CELL_OVERHEAD = 6
+
+# Leaf page fill an estimate assumes (inserts in key order leave pages nearly full)
+ESTIMATED_FILL = 0.9
+
+# Bytes a value takes in a record (integers use the smallest of the 0/1/2/3/4/6/8-byte encodings)
+RECORD_BYTES = (
+    "CASE typeof({0}) WHEN 'null' THEN 0 WHEN 'real' THEN 8 "
+    "WHEN 'integer' THEN CASE WHEN {0} IN (0, 1) THEN 0 WHEN abs({0}) < 128 THEN 1 "
+    "WHEN abs({0}) < 32768 THEN 2 WHEN abs({0}) < 8388608 THEN 3 WHEN abs({0}) < 2147483648 THEN 4 "
+    "WHEN abs({0}) < 140737488355328 THEN 6 ELSE 8 END "
+    "ELSE length(CAST({0} AS BLOB)) END"
+)
+
+
+@dataclass
+class ObjectStats:
+    """Storage of one b-tree (a table or an index)"""
+    name: str
+    type: str
+    table: str
+    rows: int = 0
+    pages: int = 0
+    leaf_pages: int = 0
+    overflow_pages: int = 0
+    payload_bytes: int = 0
+    unused_bytes: int = 0
+    page_bytes: int = 0
+    out_of_order_pages: int = 0
+    estimated: bool = False
+
+    @property
+    def avg_row_bytes(self) -> float:
+        """Average payload per row (or index entry)"""
+        return self.payload_bytes / self.rows if self.rows else 0.0
+
+    @property
+    def unused_percent(self) -> float:
+        """Share of the b-tree's bytes that are free space inside its pages"""
+        return 100.0 * self.unused_bytes / self.page_bytes if self.page_bytes else 0.0
+
+    @property
+    def fragmentation_percent(self) -> float:
+        """Share of leaf pages not directly after the previous leaf in key order"""
+        return 100.0 * self.out_of_order_pages / (self.leaf_pages - 1) if self.leaf_pages > 1 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready record, derived figures included"""
+        record = asdict(self)
+        record['avg_row_bytes'] = round(self.avg_row_bytes, 1)
+        record['unused_percent'] = round(self.unused_percent, 2)
+        record['fragmentation_percent'] = round(self.fragmentation_percent, 2)
+        return record
+
+
+class StorageProfiler:
+    """Profiles the storage of every table and index of a SQLite database"""
+
+    def __init__(self, db_path: str, sample_size: int = 1000, use_dbstat: bool = True):
+        self.db_path = db_path
+        # Rows read per table by the sampling fallback
+        self.sample_size = sample_size
+        self.use_dbstat = use_dbstat
+
+    def profile(self) -> Dict[str, Any]:
+        """Database summary plus one record per b-tree, largest first"""
+        conn = connect_snapshot(self.db_path)
+        try:
+            start = time.perf_counter()
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            objects = self.schema_objects(conn)
+
+            if self.use_dbstat and self.has_dbstat(conn):
+                method = 'dbstat'
+                stats = self.profile_dbstat(conn, objects)
+            else:
+                method = 'sampled'
+                stats = self.profile_sampled(conn, objects, page_size)
+        finally:
+            conn.close()
+
+        stats.sort(key=lambda item: (-item.pages, item.name))
+        return {
+            'database': {
+                'path': os.path.abspath(self.db_path),
+                'file_bytes': os.path.getsize(self.db_path),
+                'page_size': page_size,
+                'page_count': page_count,
+                'freelist_pages': freelist_count,
+                'method': method,
+                'seconds': round(time.perf_counter() - start, 3),
+            },
+            'objects': [item.to_dict() for item in stats],
+        }
+
+    def schema_objects(self, conn: sqlite3.Connection) -> Dict[str, Tuple[str, str]]:
+        """b-tree name -> (type, table) for every table and index (autoindexes included)"""
+        objects = {'sqlite_schema': ('table', 'sqlite_schema')}
+        for name, object_type, table in conn.execute(
+                "SELECT name, type, tbl_name FROM sqlite_master WHERE type IN ('table', 'index') AND rootpage > 0"):
+            objects[name] = (object_type, table)
+        return objects
+
+    def has_dbstat(self, conn: sqlite3.Connection) -> bool:
+        """Whether this SQLite build has the dbstat virtual table"""
+        try:
+            conn.execute("SELECT 1 FROM dbstat LIMIT 1").fetchall()
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def profile_dbstat(self, conn: sqlite3.Connection,
+                       objects: Dict[str, Tuple[str, str]]) -> List[ObjectStats]:
+        """Exact figures from one pass over dbstat (pages come per b-tree, in key order)"""
+        stats: Dict[str, ObjectStats] = {}
+        # Interior cells are entries only in index-shaped b-trees (those with interior payload)
+        interior_cells: Dict[str, int] = {}
+        interior_payload: Dict[str, int] = {}
+        previous_leaf: Dict[str, int] = {}
+
+        rows = conn.execute("SELECT name, pageno, pagetype, ncell, payload, unused, pgsize FROM dbstat")
+        for name, pageno, pagetype, ncell, payload, unused, pgsize in rows:
+            item = stats.get(name)
+            if item is None:
+                object_type, table = objects.get(name, ('table', name))
+                item = stats[name] = ObjectStats(name, object_type, table)
+            item.pages += 1
+            item.payload_bytes += payload
+            item.unused_bytes += unused
+            item.page_bytes += pgsize
+            if pagetype == 'leaf':
+                item.leaf_pages += 1
+                item.rows += ncell
+                last = previous_leaf.get(name)
+                if last is not None and pageno != last + 1:
+                    item.out_of_order_pages += 1
+                previous_leaf[name] = pageno
+            elif pagetype == 'overflow':
+                item.overflow_pages += 1
+            else:
+                interior_cells[name] = interior_cells.get(name, 0) + ncell
+                interior_payload[name] = interior_payload.get(name, 0) + payload
+
+        for name, item in stats.items():
+            if interior_payload.get(name):
+                item.rows += interior_cells[name]
+        return list(stats.values())
+
+    def profile_sampled(self, conn: sqlite3.Connection, objects: Dict[str, Tuple[str, str]],
+                        page_size: int) -> List[ObjectStats]:
+        """Estimates from row counts and the record size of up to sample_size rows per table"""
+        stats = []
+        for name, (object_type, table) in sorted(objects.items()):
+            if object_type != 'table' or name == 'sqlite_schema':
+                continue
+            quoted = '"' + name.replace('"', '""') + '"'
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_xinfo({quoted})")]
+            rows = conn.execute(f"SELECT count(*) FROM {quoted}").fetchone()[0]
+            sizes = self._sample_sizes(conn, quoted, columns)
+            stats.append(self._estimate(name, 'table', table, rows, sizes, page_size))
+
+            for index_name, index_columns in self._indexes(conn, quoted):
+                # Index entries also carry the rowid
+                index_sizes = self._sample_sizes(conn, quoted, index_columns) + [('rowid', 4.0)]
+                stats.append(self._estimate(index_name, 'index', name, rows, index_sizes, page_size))
+        return stats
+
+    def _indexes(self, conn: sqlite3.Connection, quoted: str) -> List[Tuple[str, List[str]]]:
+        """(index name, key columns) of a table; expression columns are skipped"""
+        indexes = []
+        for _, index_name, *_ in conn.execute(f"PRAGMA index_list({quoted})").fetchall():
+            quoted_index = '"' + index_name.replace('"', '""') + '"'
+            columns = [row[2] for row in conn.execute(f"PRAGMA index_info({quoted_index})") if row[2] is not None]
+            indexes.append((index_name, columns))
+        return indexes
+
+    def _sample_sizes(self, conn: sqlite3.Connection, quoted: str,
+                      columns: List[str]) -> List[Tuple[str, float]]:
+        """(column, average stored bytes) over a sample of rows spread across the rowid range"""
+        if not columns:
+            return []
+        size_of = ', '.join(f"avg({RECORD_BYTES.format(f'c{i}')})" for i in range(len(columns)))
+        selected = ', '.join(f'"{column.replace(chr(34), chr(34) * 2)}" AS c{i}' for i, column in enumerate(columns))
+        try:
+            # Every k-th row of the table, so a sample is not just its oldest rows
+            row = conn.execute(
+                f"SELECT {size_of} FROM (SELECT {selected} FROM {quoted} "
+                f"WHERE rowid % max(1, (SELECT count(*) FROM {quoted}) / ?) = 0 LIMIT ?)",
+                (self.sample_size, self.sample_size)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            # WITHOUT ROWID table: take the first rows
+            row = conn.execute(f"SELECT {size_of} FROM (SELECT {selected} FROM {quoted} LIMIT ?)",
+                               (self.sample_size,)).fetchone()
+        return [(column, size or 0.0) for column, size in zip(columns, row)]
+
+    def _estimate(self, name: str, object_type: str, table: str, rows: int,
+                  sizes: List[Tuple[str, float]], page_size: int) -> ObjectStats:
+        """Pages and bytes implied by a row count and an average record size"""
+        row_bytes = sum(size for _, size in sizes) + len(sizes)
+        payload = int(rows * row_bytes)
+        pages = max(1, -(-int(rows * (row_bytes + CELL_OVERHEAD)) // int(page_size * ESTIMATED_FILL)))
+        return ObjectStats(
+            name=name, type=object_type, table=table, rows=rows, pages=pages, leaf_pages=pages,
+            payload_bytes=payload, unused_bytes=max(0, pages * page_size - payload),
+            page_bytes=pages * page_size, estimated=True,
+        )
+
+
+def format_report(profile: Dict[str, Any], sort_key: str = 'pages', limit: Optional[int] = None) -> str:
+    """Text report, one line per b-tree sorted by sort_key (largest first), plus database totals"""
+    database = profile['database']
+    objects = sorted(profile['objects'], key=lambda item: (-item[sort_key], item['name']))
+    if limit:
+        objects = objects[:limit]
+    total_pages = database['page_count'] or 1
+    mb = 1024 * 1024
+
+    lines = [
+        f"{'name':<32} {'type':<6} {'rows':>11} {'pages':>9} {'% file':>7} {'payload MB':>11} "
+        f"{'overflow':>9} {'avg row B':>10} {'unused %':>9} {'frag %':>7}",
+    ]
+    for item in objects:
+        lines.append(
+            f"{item['name'][:32]:<32} {item['type']:<6} {item['rows']:>11} {item['pages']:>9} "
+            f"{100.0 * item['pages'] / total_pages:>6.1f}% {item['payload_bytes'] / mb:>11.2f} "
+            f"{item['overflow_pages']:>9} {item['avg_row_bytes']:>10.1f} "
+            f"{item['unused_percent']:>9.1f} {item['fragmentation_percent']:>7.1f}"
+        )
+    lines.append("")
+    lines.append(f"File: {database['file_bytes'] / mb:.2f} MB, {database['page_count']} pages of "
+                 f"{database['page_size']} bytes, {database['freelist_pages']} free "
+                 f"({100.0 * database['freelist_pages'] / total_pages:.1f}%)")
+    if database['method'] == 'sampled':
+        lines.append("Figures are estimates: rows are exact, sizes come from sampled rows")
+    return '\n'.join(lines)
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(
+        description="Report per-table and per-index storage of a SQLite database",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Uses the dbstat virtual table when the SQLite build has it (exact, one pass
+over the pages), otherwise estimates from sampled rows.
+
+Examples:
+  # Largest tables and indexes first
+  %(prog)s -d db.sqlite
+
+  # Most fragmented first, and the full profile as JSON
+  %(prog)s -d db.sqlite --sort fragmentation_percent --json profile.json
+        """
+    )
+    parser.add_argument('--database', '-d', default='db.sqlite', help='SQLite database (default: db.sqlite)')
+    parser.add_argument('--json', '-j', help="Write the profile as JSON to this path ('-' for stdout only)")
+    parser.add_argument('--sort', choices=SORT_KEYS, default='pages', help='Report order (default: pages)')
+    parser.add_argument('--limit', type=int, help='Only the first N lines of the report')
+    parser.add_argument('--sample', action='store_true', help='Estimate from sampled rows even if dbstat exists')
+    parser.add_argument('--sample-size', type=int, default=1000, help='Rows sampled per table (default: 1000)')
+
+    instrumentation.add_arguments(parser)
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.database):
+        print(f"❌ Error: Database file not found: {args.database}")
+        return 1
+
+    try:
+        profiler = StorageProfiler(args.database, args.sample_size, use_dbstat=not args.sample)
+        with instrumentation.instrumented('storage_profile', args):
+            with phase('introspect'):
+                profile = profiler.profile()
+            instrumentation.count('objects', len(profile['objects']))
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    if args.json == '-':
+        print(json.dumps(profile, indent=2))
+        return 0
+
+    print("📊 SQLite Storage Profile")
+    print("=" * 30)
+    print(f"Database: {profile['database']['path']}")
+    print(f"Method: {profile['database']['method']} ({profile['database']['seconds']:.2f}s)")
+    print()
+    print(format_report(profile, args.sort, args.limit))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, indent=2)
+        print(f"\n📄 {os.path.abspath(args.json)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Schema Watch
+Long-running watcher for the db.sqlite -> db.sql -> db.hcl / sea-orm.rs chain
+Regenerates only the downstream artifacts of what changed, and only the
+tables that changed (via the per-table fragment cache), in one process
+"""
+
+import contextlib
+import hashlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from db_to_ddl import SQLiteToDDLGenerator
+from sqlite_snapshot import snapshot_uri
+from ddl_to_hcl import DDLToHCLConverter
+from ddl_to_seaorm import DDLToSeaORMGenerator
+import instrumentation
+
+
+# Seconds to wait before retrying a failed regeneration
+RETRY_INTERVAL = 1.0
+
+
+class SchemaWatcher:
+    """Polls db.sqlite (PRAGMA schema_version) and db.sql (mtime, then hash) and regenerates on change"""
+
+    def __init__(self, directory: str, interval: float = 0.05, debounce: float = 0.05,
+                 cache_dir: Optional[str] = None, schema_name: str = "main"):
+        self.db_path = os.path.join(directory, "db.sqlite")
+        self.ddl_path = os.path.join(directory, "db.sql")
+        self.hcl_path = os.path.join(directory, "db.hcl")
+        self.seaorm_path = os.path.join(directory, "sea-orm.rs")
+        self.interval = interval
+        self.debounce = debounce
+        self.cache_dir = cache_dir or os.path.join(directory, ".schema_cache")
+        self.schema_name = schema_name
+
+        self.hcl_converter = DDLToHCLConverter()
+        self.seaorm_generator = DDLToSeaORMGenerator()
+
+        # Last seen state of each input
+        self.schema_version: Optional[int] = None
+        self.ddl_stat: Optional[Tuple[int, int]] = None
+        self.ddl_hash: Optional[str] = None
+        # State as of the last successful regeneration, restored when one fails so it is retried
+        self.built = self._state()
+
+    def read_schema_version(self) -> Optional[int]:
+        """Current schema_version of db.sqlite (bumped by every DDL change), None if unreadable"""
+        if not os.path.exists(self.db_path):
+            return None
+        try:
+            conn = sqlite3.connect(snapshot_uri(self.db_path), uri=True)
+            try:
+                return conn.execute("PRAGMA schema_version").fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+
+    def _state(self) -> Tuple[Optional[int], Optional[Tuple[int, int]], Optional[str]]:
+        """Last seen state of the inputs"""
+        return self.schema_version, self.ddl_stat, self.ddl_hash
+
+    def ddl_changed(self) -> bool:
+        """Check db.sql by mtime/size first and confirm by content hash"""
+        try:
+            stat = os.stat(self.ddl_path)
+        except OSError:
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self.ddl_stat:
+            return False
+        self.ddl_stat = signature
+
+        digest = self._hash_file(self.ddl_path)
+        if digest == self.ddl_hash:
+            return False
+        self.ddl_hash = digest
+        return True
+
+    def _hash_file(self, path: str) -> str:
+        """SHA-256 of a file's content"""
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def poll(self) -> Set[str]:
+        """Return the inputs that changed since the last poll ('db' and/or 'ddl')"""
+        changes = set()
+        version = self.read_schema_version()
+        if version is not None and version != self.schema_version:
+            self.schema_version = version
+            changes.add('db')
+        if self.ddl_changed():
+            changes.add('ddl')
+        return changes
+
+    def regenerate(self, changes: Set[str]) -> Dict[str, str]:
+        """Regenerate everything downstream of the changed inputs; returns per-artifact cache summaries"""
+        report = {}
+
+        if 'db' in changes:
+            if not self._export_ddl():
+                # Same DDL as before (e.g. a dropped and re-created identical table)
+                changes = changes - {'db'}
+            else:
+                changes = changes | {'ddl'}
+                report['db.sql'] = 'exported'
+
+        if 'ddl' in changes:
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.hcl_converter.convert_file(self.ddl_path, self.hcl_path, self.schema_name, self.cache_dir)
+                self.seaorm_generator.convert_file(self.ddl_path, self.seaorm_path, self.cache_dir)
+            for name, converter in (('db.hcl', self.hcl_converter), ('sea-orm.rs', self.seaorm_generator)):
+                report[name] = converter.last_cache.summary() if converter.last_cache else 'generated'
+
+        return report
+
+    def _export_ddl(self) -> bool:
+        """Write db.sql from db.sqlite atomically; returns False when the content is unchanged"""
+        generator = SQLiteToDDLGenerator(self.db_path, self.ddl_path, snapshot=True)
+        conn = generator.connect_to_database()
+        try:
+            ddl = io.StringIO()
+            generator.write_ddl(conn, ddl, verbose=False)
+        finally:
+            conn.close()
+
+        content = ddl.getvalue().encode('utf-8')
+        digest = hashlib.sha256(content).hexdigest()
+        if digest == self.ddl_hash:
+            return False
+
+        # A temporary file of its own, so a concurrent export never writes into ours
+        directory = os.path.dirname(self.ddl_path) or '.'
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.ddl_path) + '.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            # mkstemp creates the file private; db.sql keeps its mode (or a regular file's)
+            try:
+                mode = os.stat(self.ddl_path).st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, self.ddl_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        # Remember our own write so it is not picked up as an edit
+        stat = os.stat(self.ddl_path)
+        self.ddl_stat = (stat.st_mtime_ns, stat.st_size)
+        self.ddl_hash = digest
+        return True
+
+    def run(self, initial: bool = True) -> None:
+        """Watch until interrupted"""
+        # Prime the state so only later edits trigger (optionally generating once up front)
+        changes = self.poll()
+        if initial and changes:
+            self._run_once(changes)
+        else:
+            self.built = self._state()
+
+        while True:
+            time.sleep(self.interval)
+            changes = self.poll()
+            if not changes:
+                continue
+
+            # Debounce: wait for a quiet window so bursts of writes regenerate once
+            while True:
+                time.sleep(self.debounce)
+                more = self.poll()
+                if not more:
+                    break
+                changes |= more
+
+            if not self._run_once(changes):
+                time.sleep(RETRY_INTERVAL)
+
+    def _run_once(self, changes: Set[str]) -> bool:
+        """Regenerate and print a one-line report; returns False (and forgets the changes were seen) on failure"""
+        start = time.perf_counter()
+        try:
+            report = self.regenerate(changes)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            # The next poll sees the same changes again and retries
+            self.schema_version, self.ddl_stat, self.ddl_hash = self.built
+            return False
+        self.built = self._state()
+        elapsed = (time.perf_counter() - start) * 1000
+        if not report:
+            return True
+        details = '; '.join(f"{name}: {summary}" for name, summary in report.items())
+        print(f"🔁 {', '.join(sorted(changes))} changed -> {details} ({elapsed:.1f} ms)")
+        return True
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(
+        description="Watch db.sqlite and db.sql and regenerate db.sql, db.hcl and sea-orm.rs on change",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Chain:
+  db.sqlite (PRAGMA schema_version) -> db.sql -> db.hcl, sea-orm.rs
+  db.sql edited by hand              ->           db.hcl, sea-orm.rs
+
+Examples:
+  # Watch the script directory
+  %(prog)s
+
+  # Another directory, slower polling
+  %(prog)s --dir /path/to/database/sqlite --interval 0.2
+        """
+    )
+    parser.add_argument('--dir', '-d', help='Directory holding db.sqlite/db.sql (default: script directory)')
+    parser.add_argument('--interval', type=float, default=0.05, help='Poll interval in seconds (default: 0.05)')
+    parser.add_argument('--debounce', type=float, default=0.05, help='Quiet window before regenerating (default: 0.05)')
+    parser.add_argument('--cache-dir', '-c', help='Fragment cache directory (default: <dir>/.schema_cache)')
+    parser.add_argument('--schema', '-s', default='main', help='HCL schema name (default: main)')
+    parser.add_argument('--no-initial', action='store_true', help='Do not regenerate once at startup')
+
+    instrumentation.add_arguments(parser)
+
+    args = parser.parse_args()
+
+    directory = args.dir or os.path.dirname(os.path.abspath(__file__))
+
+    print("👀 Schema Watch")
+    print("=" * 40)
+    print(f"Directory: {os.path.abspath(directory)}")
+    print(f"Interval: {args.interval}s, debounce: {args.debounce}s")
+    print("Press Ctrl+C to stop")
+    print()
+
+    watcher = SchemaWatcher(directory, args.interval, args.debounce, args.cache_dir, args.schema)
+    try:
+        # Metrics cover every regeneration and are written when the watch stops
+        with instrumentation.instrumented('watch', args):
+            watcher.run(initial=not args.no_initial)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())